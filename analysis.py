@@ -0,0 +1,215 @@
+"""
+Post-game analysis of recorded deals with the double-dummy solver.
+
+For every card played in a deal, the analysis compares the points the team of the player
+could have scored with perfect play from that position onward to the points it can score
+after the card that was actually played, assuming perfect play afterwards. The difference is
+the loss of the card; a perfect card loses nothing.
+
+Points are those of `solver`: card points plus the last-trick bonus, without roem.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, NamedTuple, Optional, Sequence
+
+from bitboard import SUITS, card_index, cards_to_mask, index_card, mask_to_cards, suit_index, winning_position
+from models import Card, Deal, Player, RuleSet, Suit, Trick
+from position import POSITION_SIZE, Position, decode_position, encode_position
+from scoring import LAST_TRICK_BONUS, mask_points
+from solver import Solver
+
+
+class RecordedDeal(NamedTuple):
+    """A deal as it was played: the hands at the start and every card in the order it was played."""
+
+    hands: List[List[Card]]
+    trump_suit: Suit
+    bidder_index: int
+    rules: RuleSet
+    plays: List[Card]
+
+
+class MoveAnalysis(NamedTuple):
+    """The analysis of a single played card, in points for the team of the player that played it."""
+
+    player_index: int
+    card: Card
+    # The points with perfect play from the position before the card was played.
+    best: int
+    # The points with perfect play after the card that was actually played.
+    actual: int
+
+    @property
+    def loss(self) -> int:
+        return self.best - self.actual
+
+
+def record_deal(tricks: Sequence[Trick]) -> RecordedDeal:
+    """
+    Record a deal of which all tricks have been played, e.g. by `game.play_deal`.
+
+    :param tricks: The tricks of the deal, in order.
+    :return: The recorded deal.
+    """
+    deal = tricks[0].deal
+    assert deal.trump_suit is not None, "The trump suit of the deal must be known"
+
+    hands: List[List[Card]] = [[], [], [], []]
+    plays = []
+    for trick in tricks:
+        for offset in range(4):
+            player_index = (trick.leading_player_index + offset) % 4
+            card = trick.played_cards[player_index]
+            assert card is not None, "All tricks must be complete"
+            hands[player_index].append(card)
+            plays.append(card)
+
+    return RecordedDeal(
+        hands=hands, trump_suit=deal.trump_suit, bidder_index=deal.bidder_index, rules=deal.rules, plays=plays
+    )
+
+
+def replay(recorded: RecordedDeal) -> List[Trick]:
+    """
+    Replay a recorded deal with the rules in `models`. The bidder leads the first trick,
+    after which every trick is led by the player that won the previous one.
+
+    :param recorded: The recorded deal.
+    :return: The played tricks, in order.
+    :raises AssertionError: If a card is not legal to play, or if not all cards are played.
+    """
+    players = [Player(name=str(index)) for index in range(4)]
+    for player, hand in zip(players, recorded.hands):
+        player.hand = {card.intern() for card in hand}
+    deal = Deal(
+        players=players, bidder_index=recorded.bidder_index, trump_suit=recorded.trump_suit, rules=recorded.rules
+    )
+
+    tricks: List[Trick] = []
+    trick = Trick(deal=deal, leading_player_index=recorded.bidder_index)
+    for card in recorded.plays:
+        trick.play(card.intern())
+        if None not in trick.played_cards:
+            tricks.append(trick)
+            winning_index = trick.winning_card_index
+            assert winning_index is not None
+            trick = Trick(deal=deal, leading_player_index=winning_index)
+
+    assert not any(player.hand for player in players), "All cards of the deal must be played"
+
+    return tricks
+
+
+def analyze(recorded: RecordedDeal) -> List[MoveAnalysis]:
+    """
+    Analyze every card of a recorded deal.
+
+    The deal is solved incrementally: a single solver is used for all positions, so that every
+    position reuses the transposition table and move ordering tables of the positions before it.
+    The points after a played card are those of the next position, so only one search is needed
+    per card.
+
+    :param recorded: The recorded deal. Its plays are validated with `Trick.play`.
+    :return: The analysis of every played card, in the order in which they were played.
+    """
+    replay(recorded)
+
+    trump_suit = suit_index(recorded.trump_suit)
+    solver = Solver(trump_suit, recorded.rules)
+    hands = [cards_to_mask(hand) for hand in recorded.hands]
+    leader = recorded.bidder_index
+    trick: List[int] = []
+
+    # For every position: the player to play, the points of team 0 with perfect play, and all remaining points.
+    player_indices: List[int] = []
+    values: List[int] = []
+    totals: List[int] = []
+    # For every card: the points team 0 scored with the trick that the card completed, if any.
+    gains: List[int] = []
+    for card in recorded.plays:
+        values.append(solver.solve(hands, leader, trick))
+        remaining = hands[0] | hands[1] | hands[2] | hands[3]
+        for played in trick:
+            remaining |= 1 << played
+        totals.append(mask_points(remaining, trump_suit) + LAST_TRICK_BONUS)
+
+        player_index = (leader + len(trick)) % 4
+        player_indices.append(player_index)
+        index = card_index(card)
+        hands[player_index] ^= 1 << index
+        trick.append(index)
+
+        gained = 0
+        if len(trick) == 4:
+            winner = (leader + winning_position(trick, trump_suit)) % 4
+            if winner % 2 == 0:
+                gained = mask_points(sum(1 << played for played in trick), trump_suit)
+                gained += LAST_TRICK_BONUS if not any(hands) else 0
+            leader, trick = winner, []
+        gains.append(gained)
+    values.append(0)
+
+    analyses = []
+    for number, (player_index, card) in enumerate(zip(player_indices, recorded.plays)):
+        best, actual = values[number], gains[number] + values[number + 1]
+        if player_index % 2 == 1:
+            best, actual = totals[number] - best, totals[number] - actual
+        analyses.append(MoveAnalysis(player_index=player_index, card=card, best=best, actual=actual))
+
+    return analyses
+
+
+def encode_recorded_deal(recorded: RecordedDeal) -> bytes:
+    """
+    Encode a recorded deal compactly: its starting position (see `position`), followed by the
+    index of every played card as a single byte.
+
+    :param recorded: The recorded deal.
+    :return: The encoded deal.
+    """
+    hand_0, hand_1, hand_2, hand_3 = [cards_to_mask(hand) for hand in recorded.hands]
+    start = Position(
+        hands=(hand_0, hand_1, hand_2, hand_3),
+        trick=(),
+        leader=recorded.bidder_index,
+        trump_suit=suit_index(recorded.trump_suit),
+        rules=recorded.rules,
+        trick_number=0,
+        points=(0, 0),
+    )
+
+    return encode_position(start) + bytes(card_index(card) for card in recorded.plays)
+
+
+def decode_recorded_deal(data: bytes) -> RecordedDeal:
+    """Decode a recorded deal. This is the inverse of `encode_recorded_deal`."""
+    start = decode_position(data)
+
+    return RecordedDeal(
+        hands=[sorted(mask_to_cards(hand), key=card_index) for hand in start.hands],
+        trump_suit=SUITS[start.trump_suit],
+        bidder_index=start.leader,
+        rules=start.rules,
+        plays=[index_card(index) for index in data[POSITION_SIZE:]],
+    )
+
+
+def _analyze_encoded(data: bytes) -> List[MoveAnalysis]:
+    return analyze(decode_recorded_deal(data))
+
+
+def analyze_deals(recorded_deals: Iterable[RecordedDeal], workers: Optional[int] = None) -> List[List[MoveAnalysis]]:
+    """
+    Analyze many recorded deals in a process pool.
+
+    :param recorded_deals: The recorded deals.
+    :param workers: The number of worker processes. Defaults to the number of CPUs.
+    :return: The analysis of every deal, in the order of the given deals.
+    """
+    workers = workers if workers is not None else os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Deals are sent to the workers in their compact encoding rather than as pickled objects.
+        return list(executor.map(_analyze_encoded, [encode_recorded_deal(recorded) for recorded in recorded_deals]))
@@ -0,0 +1,250 @@
+"""
+Benchmarks of the hot paths of the rules engine.
+
+Run `python benchmark.py` to measure all benchmarks and compare them to the stored baseline.
+The process exits with status 1 if any benchmark is slower than the baseline by more than
+the configured threshold. Use `--save-baseline` to store the current results as the new baseline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from bitboard import cards_to_mask, suit_index
+from game import new_deal, play_deal, random_policy
+from models import Card, Deal, Deck, Player, Rank, RuleSet, Suit, Trick
+from playout import HeuristicPlayoutPolicy, PlayoutPolicy, RandomPlayoutPolicy, playout
+
+Operation = Callable[[], object]
+Results = Dict[str, Dict[str, float]]
+
+DEFAULT_BASELINE = "benchmark-baseline.json"
+
+
+def _trick(rules: RuleSet, led: List[Card], hand: List[Card], trump_suit: Suit = Suit.HEARTS) -> Trick:
+    """Create a trick in which the given cards were led, with the given hand for the player to play."""
+    players = [Player(name=str(index)) for index in range(4)]
+    for player, card in zip(players, led):
+        player.hand = {card}
+    players[len(led)].hand = set(hand)
+
+    trick = Trick(
+        deal=Deal(players=players, bidder_index=0, trump_suit=trump_suit, rules=rules), leading_player_index=0
+    )
+    for card in led:
+        trick.play(card)
+
+    return trick
+
+
+_HAND = [
+    Card(suit=Suit.SPADES, rank=Rank.KING),
+    Card(suit=Suit.SPADES, rank=Rank.SEVEN),
+    Card(suit=Suit.HEARTS, rank=Rank.NINE),
+    Card(suit=Suit.HEARTS, rank=Rank.EIGHT),
+    Card(suit=Suit.CLUBS, rank=Rank.ACE),
+    Card(suit=Suit.CLUBS, rank=Rank.TEN),
+    Card(suit=Suit.DIAMONDS, rank=Rank.QUEEN),
+    Card(suit=Suit.DIAMONDS, rank=Rank.JACK),
+]
+_VOID_IN_SPADES = [card for card in _HAND if card.suit != Suit.SPADES]
+_VOID_IN_HEARTS = [card for card in _HAND if card.suit != Suit.HEARTS]
+_ACE_OF_SPADES = Card(suit=Suit.SPADES, rank=Rank.ACE)
+_TEN_OF_HEARTS = Card(suit=Suit.HEARTS, rank=Rank.TEN)
+_QUEEN_OF_SPADES = Card(suit=Suit.SPADES, rank=Rank.QUEEN)
+_SEVEN_OF_CLUBS = Card(suit=Suit.CLUBS, rank=Rank.SEVEN)
+
+
+def _legal_cards(trick: Trick) -> Operation:
+    return lambda: trick.legal_cards
+
+
+def _compare_cards() -> Operation:
+    trick = _trick(RuleSet.ROTTERDAM, [_ACE_OF_SPADES], _HAND)
+    card = Card(suit=Suit.SPADES, rank=Rank.KING)
+
+    return lambda: trick.compare_cards(card, _TEN_OF_HEARTS)
+
+
+def _winning_card_index() -> Operation:
+    trick = _trick(RuleSet.ROTTERDAM, [_ACE_OF_SPADES, _TEN_OF_HEARTS, _QUEEN_OF_SPADES], _HAND)
+
+    return lambda: trick.winning_card_index
+
+
+def _shuffle_and_deal() -> Operation:
+    def operation() -> None:
+        deck = Deck()
+        deck.shuffle(seed=1)
+        deck.deal([Player(name=str(index)) for index in range(4)])
+
+    return operation
+
+
+def _create_position() -> Operation:
+    # The peak memory of this benchmark is the memory held by a single position.
+    return lambda: Trick(deal=new_deal(seed=1, trump_suit=Suit.HEARTS), leading_player_index=0)
+
+
+def _full_deal(rules: RuleSet) -> Operation:
+    def operation() -> None:
+        deal = new_deal(seed=1, trump_suit=Suit.HEARTS, rules=rules)
+        play_deal(deal, random_policy(random.Random(1)))
+
+    return operation
+
+
+def _playout(rules: RuleSet, policy: PlayoutPolicy) -> Operation:
+    deal = new_deal(seed=1, trump_suit=Suit.HEARTS, rules=rules)
+    hands = [cards_to_mask(player.hand) for player in deal.players]
+    trump_suit = suit_index(Suit.HEARTS)
+
+    def operation() -> None:
+        playout(hands, 0, (), trump_suit, rules, policy)
+
+    return operation
+
+
+def _rule_set_benchmarks(rules: RuleSet) -> Dict[str, Callable[[], Operation]]:
+    name = rules.value.lower()
+
+    return {
+        f"legal_cards_{name}_leading": lambda: _legal_cards(_trick(rules, [], _HAND)),
+        f"legal_cards_{name}_following": lambda: _legal_cards(_trick(rules, [_ACE_OF_SPADES], _HAND)),
+        f"legal_cards_{name}_overtrump": lambda: _legal_cards(
+            _trick(rules, [_ACE_OF_SPADES, _TEN_OF_HEARTS], _VOID_IN_SPADES)
+        ),
+        f"legal_cards_{name}_teammate_winning": lambda: _legal_cards(
+            _trick(rules, [_TEN_OF_HEARTS, _SEVEN_OF_CLUBS], _VOID_IN_HEARTS, trump_suit=Suit.SPADES)
+        ),
+        f"full_deal_{name}": lambda: _full_deal(rules),
+        f"playout_heuristic_{name}": lambda: _playout(rules, HeuristicPlayoutPolicy()),
+        f"playout_random_{name}": lambda: _playout(rules, RandomPlayoutPolicy(random.Random(1))),
+    }
+
+
+# Every benchmark is a setup function that returns the operation to measure.
+BENCHMARKS: Dict[str, Callable[[], Operation]] = {
+    "compare_cards": _compare_cards,
+    "winning_card_index": _winning_card_index,
+    "shuffle_and_deal": _shuffle_and_deal,
+    "create_position": _create_position,
+    **_rule_set_benchmarks(RuleSet.ROTTERDAM),
+    **_rule_set_benchmarks(RuleSet.AMSTERDAM),
+}
+
+
+def measure(operation: Operation, min_time: float) -> Dict[str, float]:
+    """
+    Measure the speed and memory use of an operation.
+
+    :param operation: The operation.
+    :param min_time: The minimum time in seconds to spend on measuring the speed.
+    :return: The operations per second, and the peak memory allocated by a single operation in bytes.
+    """
+    iterations, elapsed = 1, 0.0
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            operation()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        iterations *= 2 if elapsed == 0 else max(2, min(10, int(1.2 * min_time / elapsed)))
+
+    tracemalloc.start()
+    baseline_memory = tracemalloc.get_traced_memory()[0]
+    operation()
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {"ops_per_sec": iterations / elapsed, "peak_bytes": peak_memory - baseline_memory}
+
+
+def run(names: Optional[List[str]] = None, min_time: float = 0.5) -> Results:
+    """
+    Run benchmarks.
+
+    :param names: The names of the benchmarks to run. If unspecified, all benchmarks are run.
+    :param min_time: The minimum time in seconds to spend on each benchmark.
+    :return: The results keyed by benchmark name.
+    """
+    return {name: measure(BENCHMARKS[name](), min_time) for name in (names if names is not None else BENCHMARKS)}
+
+
+def regressions(results: Results, baseline: Results, threshold: float) -> List[str]:
+    """
+    Find the benchmarks that are slower than the baseline by more than the threshold.
+    Benchmarks that are absent from the baseline are ignored.
+
+    :param results: The current results.
+    :param baseline: The baseline results.
+    :param threshold: The allowed relative slowdown, e.g. 0.1 for 10%.
+    :return: A description of every regression.
+    """
+    messages = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        expected = baseline[name]["ops_per_sec"]
+        if result["ops_per_sec"] < (1 - threshold) * expected:
+            slowdown = 1 - result["ops_per_sec"] / expected
+            messages.append(
+                f"{name}: {result['ops_per_sec']:.0f} ops/sec is {slowdown:.1%} slower than {expected:.0f} ops/sec"
+            )
+
+    return messages
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", help="The benchmarks to run; all of them if none are given.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="The path of the baseline results.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline.")
+    parser.add_argument("--output", help="Write the results as JSON to this path.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="The allowed relative slowdown.")
+    parser.add_argument("--min-time", type=float, default=0.5, help="The minimum seconds per benchmark.")
+    options = parser.parse_args(arguments)
+
+    unknown = [name for name in options.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(unknown)}")
+
+    results = run(options.names or None, options.min_time)
+    for name, result in results.items():
+        print(f"{name:45} {result['ops_per_sec']:>14.1f} ops/sec {result['peak_bytes']:>10.0f} bytes")
+
+    document = {"python": platform.python_version(), "results": results}
+    if options.output:
+        with open(options.output, "w") as file:
+            json.dump(document, file, indent=2)
+
+    if options.save_baseline:
+        with open(options.baseline, "w") as file:
+            json.dump(document, file, indent=2)
+        return 0
+
+    try:
+        with open(options.baseline) as file:
+            baseline = json.load(file)["results"]
+    except FileNotFoundError:
+        print(f"No baseline found at {options.baseline}; run with --save-baseline to create one.")
+        return 0
+
+    messages = regressions(results, baseline, options.threshold)
+    for message in messages:
+        print(f"Regression: {message}")
+
+    return 1 if messages else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Integer bitmask representation of cards and hands.
+
+Every card is identified by its index in 0..31 (see `Card.ordinal`): the suit determines the
+block of eight bits (clubs, hearts, diamonds, spades, in the order of `Suit`) and the rank
+determines the bit within that block (seven up to ace, in the order of `Rank`). This matches
+the order of a freshly created `Deck`. A hand, a trick or any other collection of cards is
+then a single 32-bit integer, which is what the fast engines in this repository operate on.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, List, Set, Tuple
+
+from models import CARDS, Card, Rank, Suit, Trick
+
+# Position of every rank in the natural order (seven up to ace); this is also its bit within a suit block.
+RANKS: List[Rank] = list(Rank)
+SUITS: List[Suit] = list(Suit)
+
+# For every rank bit, the strength of that rank in a non-trump suit and in the trump suit respectively.
+PLAIN_ORDER: List[int] = [Rank.order()[rank] for rank in RANKS]
+TRUMP_ORDER: List[int] = [Rank.order_trump()[rank] for rank in RANKS]
+
+FULL_SUIT = 0xFF
+FULL_DECK = 0xFFFFFFFF
+
+# The suit block of every suit index, e.g. `SUIT_MASKS[0]` holds all clubs.
+SUIT_MASKS: List[int] = [FULL_SUIT << (8 * suit_index) for suit_index in range(4)]
+
+# For every rank bit, the bits within a suit block of the ranks that beat it in the trump suit
+# and in any other suit respectively.
+HIGHER_TRUMPS: List[int] = [
+    sum(1 << other for other in range(8) if TRUMP_ORDER[other] > TRUMP_ORDER[rank_index]) for rank_index in range(8)
+]
+HIGHER_PLAIN: List[int] = [
+    sum(1 << other for other in range(8) if PLAIN_ORDER[other] > PLAIN_ORDER[rank_index]) for rank_index in range(8)
+]
+
+
+def card_index(card: Card) -> int:
+    """
+    Get the index (0..31) of a card.
+
+    :param card: The card.
+    :return: The index of the card; its bit in a mask is `1 << index`.
+    """
+    return card.ordinal
+
+
+def index_card(index: int) -> Card:
+    """
+    Get the card belonging to an index. This is the inverse of `card_index`.
+
+    :param index: The index of the card, in 0..31.
+    :return: The shared instance of the card.
+    """
+    return CARDS[index]
+
+
+def suit_index(suit: Suit) -> int:
+    """Get the index (0..3) of a suit, i.e. the block of eight bits it occupies in a mask."""
+    return suit.value - 1
+
+
+def cards_to_mask(cards: Iterable[Card]) -> int:
+    """
+    Convert a collection of cards to a bitmask.
+
+    :param cards: The cards, e.g. the hand of a player.
+    :return: The mask with the bit of every given card set.
+    """
+    mask = 0
+    for card in cards:
+        mask |= 1 << card_index(card)
+
+    return mask
+
+
+def mask_to_cards(mask: int) -> Set[Card]:
+    """
+    Convert a bitmask back to a set of cards. This is the inverse of `cards_to_mask`.
+
+    :param mask: The mask.
+    :return: The set of cards whose bits are set in the mask.
+    """
+    cards: Set[Card] = set()
+    while mask:
+        lowest = mask & -mask
+        cards.add(index_card(lowest.bit_length() - 1))
+        mask ^= lowest
+
+    return cards
+
+
+def _strength(index: int, led_suit: int, trump_suit: int) -> int:
+    """The strength of a card in a trick: trumps beat the led suit, which beats all other suits."""
+    if index >> 3 == trump_suit:
+        return 16 + TRUMP_ORDER[index & 7]
+    if index >> 3 == led_suit:
+        return 8 + PLAIN_ORDER[index & 7]
+
+    return 0
+
+
+# The strength of every card, indexed by the trump suit, the led suit and the card index.
+# A card beats another card in a trick if and only if its strength is higher.
+STRENGTHS: List[List[List[int]]] = [
+    [[_strength(index, led_suit, trump_suit) for index in range(32)] for led_suit in range(4)]
+    for trump_suit in range(4)
+]
+
+
+def winning_position(cards: List[int], trump_suit: int) -> int:
+    """
+    Find the card that currently wins a trick.
+
+    :param cards: The indices of the cards played to the trick, in the order in which they were played.
+        At least one card must have been played.
+    :param trump_suit: The suit index of the trump suit.
+    :return: The position of the winning card in `cards`.
+    """
+    strengths = STRENGTHS[trump_suit][cards[0] >> 3]
+    winner = 0
+    for position in range(1, len(cards)):
+        if strengths[cards[position]] > strengths[cards[winner]]:
+            winner = position
+
+    return winner
+
+
+def legal_mask(
+    hand: int, led_suit: int, trump_suit: int, winning_card: int, teammate_winning: bool, amsterdam: bool
+) -> int:
+    """
+    Determine the legal cards of the player to play, like `Trick.legal_cards`.
+
+    :param hand: The hand of the player to play.
+    :param led_suit: The suit index that was led, or -1 if the player is leading.
+    :param trump_suit: The suit index of the trump suit.
+    :param winning_card: The card index of the card currently winning the trick, or -1 if none was played.
+    :param teammate_winning: Whether the teammate of the player is currently winning the trick.
+    :param amsterdam: Whether the Amsterdam rules apply; otherwise, the Rotterdam rules apply.
+    :return: The mask of legal cards.
+    """
+    if led_suit < 0:
+        return hand
+
+    trump_cards = hand & SUIT_MASKS[trump_suit]
+    if winning_card >= 0 and winning_card >> 3 == trump_suit:
+        higher_trump_cards = trump_cards & (HIGHER_TRUMPS[winning_card & 7] << (8 * trump_suit))
+    else:
+        higher_trump_cards = trump_cards
+
+    follow_suit_cards = hand & SUIT_MASKS[led_suit]
+    if follow_suit_cards:
+        if led_suit == trump_suit and higher_trump_cards:
+            return higher_trump_cards
+        return follow_suit_cards
+
+    non_trump_cards = hand ^ trump_cards
+    if amsterdam and teammate_winning:
+        return (higher_trump_cards | non_trump_cards) or hand
+    if higher_trump_cards:
+        return higher_trump_cards
+
+    return non_trump_cards or hand
+
+
+def position_from_trick(trick: Trick) -> Tuple[List[int], int, List[int]]:
+    """
+    Convert a trick in progress to hand masks and card indices, e.g. the arguments of `solver.Solver.solve`.
+
+    :param trick: The trick.
+    :return: The hand masks, the leading player and the cards played to the trick in order.
+    """
+    hands = [cards_to_mask(player.hand) for player in trick.deal.players]
+    cards = []
+    for offset in range(4):
+        card = trick.played_cards[(trick.leading_player_index + offset) % 4]
+        if card is None:
+            break
+        cards.append(card_index(card))
+
+    return hands, trick.leading_player_index, cards
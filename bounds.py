@@ -0,0 +1,81 @@
+"""
+Cheap bounds on the points a team can still score, used by the solver to stop searching a
+position whose outcome is already decided.
+
+All bounds are taken at the start of a trick and are sound: a team scores at least its lower
+bound, whatever the other players do, so the other team scores at most the remaining points
+minus that lower bound. The bounds are based on the master trumps, i.e. the trumps that rank
+above every remaining trump of the other team (in the order of `Rank.order_trump`).
+"""
+
+from __future__ import annotations
+
+from typing import List, Sequence, Tuple
+
+from bitboard import RANKS, SUIT_MASKS, TRUMP_ORDER
+from scoring import LAST_TRICK_BONUS, TRUMP_POINTS_TABLE, mask_points
+
+# The rank bits of the trump suit from the highest trump to the lowest.
+TRUMP_BITS_DESCENDING: List[int] = sorted(range(len(RANKS)), key=lambda bit: TRUMP_ORDER[bit], reverse=True)
+
+
+def master_trumps(team_trumps: int, remaining_trumps: int) -> int:
+    """
+    Find the trumps of a team that rank above every trump of the other team.
+
+    :param team_trumps: The byte of the trump suit held by the team.
+    :param remaining_trumps: The byte of the trump suit held by all players.
+    :return: The byte of the master trumps of the team.
+    """
+    masters = 0
+    for bit in TRUMP_BITS_DESCENDING:
+        if not remaining_trumps >> bit & 1:
+            continue
+        if not team_trumps >> bit & 1:
+            break
+        masters |= 1 << bit
+
+    return masters
+
+
+def lower_bound(hands: Sequence[int], team: int, trump_suit: int) -> int:
+    """
+    Determine a lower bound on the points a team scores from the start of a trick onward.
+
+    Every trick in which a master trump is played is won by the team, so the team scores at
+    least the points of its master trumps. If the team holds all remaining trumps and one of its
+    players holds nothing but trumps, that player trumps or follows with a trump in every trick
+    and the team wins all remaining tricks.
+
+    :param hands: The masks of the hands of the four players.
+    :param team: The team (0 for players 0 and 2, 1 for players 1 and 3).
+    :param trump_suit: The suit index of the trump suit.
+    :return: The lower bound, including the last-trick bonus if the team is certain to win it.
+    """
+    trump_mask = SUIT_MASKS[trump_suit]
+    team_hand = hands[team] | hands[team + 2]
+    remaining = team_hand | hands[1 - team] | hands[3 - team]
+    if not remaining & trump_mask:
+        return 0
+
+    if not remaining & trump_mask & ~team_hand and (
+        (hands[team] and not hands[team] & ~trump_mask) or (hands[team + 2] and not hands[team + 2] & ~trump_mask)
+    ):
+        return mask_points(remaining, trump_suit) + LAST_TRICK_BONUS
+
+    shift = 8 * trump_suit
+    return TRUMP_POINTS_TABLE[master_trumps(team_hand >> shift & 0xFF, remaining >> shift & 0xFF)]
+
+
+def score_bounds(hands: Sequence[int], trump_suit: int) -> Tuple[int, int]:
+    """
+    Determine bounds on the points team 0 scores from the start of a trick onward.
+
+    :param hands: The masks of the hands of the four players.
+    :param trump_suit: The suit index of the trump suit.
+    :return: The lower and the upper bound.
+    """
+    remaining = hands[0] | hands[1] | hands[2] | hands[3]
+    total = mask_points(remaining, trump_suit) + LAST_TRICK_BONUS if remaining else 0
+
+    return lower_bound(hands, 0, trump_suit), total - lower_bound(hands, 1, trump_suit)
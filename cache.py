@@ -0,0 +1,197 @@
+"""
+A bounded least-recently-used cache for the results of evaluating positions.
+
+Results are keyed by a canonical hash of the position (see `position_key`), so that the same
+position reached in different ways, e.g. after rewinding a deal, is only evaluated once. The
+cache holds at most a configured number of bytes in memory; the least recently used results are
+evicted first. Evicted results can be spilled to a database on disk, from which they are read
+back on a later miss instead of being evaluated again.
+
+Hits, misses and evictions are counted on the cache, and reported through `instrumentation`.
+"""
+
+from __future__ import annotations
+
+import dbm
+import hashlib
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+import instrumentation
+from position import Position, encode_position
+
+# An estimate of the memory held by a cache entry besides its value: the key and the dictionary entry.
+ENTRY_BYTES = 128
+
+
+def position_key(position: Position, include_score: bool = False) -> bytes:
+    """
+    Get the canonical hash of a position.
+
+    The best play and the points still to be scored do not depend on the points scored so far or
+    on the number of the trick, so by default these are left out: positions that differ only in
+    them have the same key.
+
+    :param position: The position.
+    :param include_score: Whether the trick number and the points so far are part of the key.
+    :return: A 16-byte hash.
+    """
+    if not include_score:
+        position = position._replace(trick_number=0, points=(0, 0))
+
+    return hashlib.blake2b(encode_position(position), digest_size=16).digest()
+
+
+class CacheStatistics(object):
+    """Counters of a cache."""
+
+    hits: int
+    misses: int
+    evictions: int
+    # Misses in memory that were found on disk; these are also counted as hits.
+    spill_hits: int
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.spill_hits = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"CacheStatistics(hits={self.hits}, misses={self.misses}, evictions={self.evictions}, "
+            f"spill_hits={self.spill_hits})"
+        )
+
+
+class ResultCache(object):
+    """
+    A least-recently-used cache of bounded size in memory, with an optional spill to disk.
+    It can be shared between threads.
+    """
+
+    max_bytes: int
+    size: int
+    statistics: CacheStatistics
+
+    def __init__(self, max_bytes: int, spill_path: Optional[str] = None, sizeof: Callable[[Any], int] = sys.getsizeof):
+        """
+        Initialize a cache.
+
+        :param max_bytes: The maximum memory held by the cache in bytes, estimated with `sizeof`.
+        :param spill_path: The path of a database to write evicted results to, or None to discard them.
+            Results in an existing database are used. Spilled results must be picklable.
+        :param sizeof: Estimates the memory held by a result in bytes.
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.statistics = CacheStatistics()
+        self._sizeof = sizeof
+        self._entries: OrderedDict[bytes, Tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._spill = dbm.open(spill_path, "c") if spill_path is not None else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: bytes) -> Optional[Any]:
+        """
+        Look up a result.
+
+        :param key: The key of the position, see `position_key`.
+        :return: The result, or None if it is not in the cache.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.statistics.hits += 1
+                instrumentation.count("cache_hits")
+                return entry[0]
+
+            if self._spill is not None and key in self._spill:
+                value = pickle.loads(self._spill[key])
+                self.statistics.hits += 1
+                self.statistics.spill_hits += 1
+                instrumentation.count("cache_hits")
+                instrumentation.count("cache_spill_hits")
+                self._insert(key, value)
+                return value
+
+            self.statistics.misses += 1
+            instrumentation.count("cache_misses")
+            return None
+
+    def put(self, key: bytes, value: Any) -> None:
+        """
+        Store a result, evicting the least recently used results if the cache is full.
+        A result that is larger than the cache by itself is not stored.
+
+        :param key: The key of the position, see `position_key`.
+        :param value: The result. It must not be None.
+        """
+        with self._lock:
+            self._insert(key, value)
+
+    def get_or_compute(self, key: bytes, compute: Callable[[], Any]) -> Any:
+        """
+        Look up a result, computing and storing it on a miss.
+
+        :param key: The key of the position, see `position_key`.
+        :param compute: Computes the result.
+        :return: The result.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+
+        return value
+
+    def clear(self) -> None:
+        """Remove all results from memory. Spilled results are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def close(self) -> None:
+        """Spill all results in memory, if spilling, and close the database."""
+        with self._lock:
+            if self._spill is not None:
+                for key, (value, _) in self._entries.items():
+                    self._spill[key] = pickle.dumps(value)
+                self._spill.close()
+                self._spill = None
+
+    def __enter__(self) -> ResultCache:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _insert(self, key: bytes, value: Any) -> None:
+        size = ENTRY_BYTES + self._sizeof(value)
+        if size > self.max_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= previous[1]
+        self._entries[key] = (value, size)
+        self.size += size
+
+        while self.size > self.max_bytes:
+            evicted_key, (evicted, evicted_size) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+            self.statistics.evictions += 1
+            instrumentation.count("cache_evictions")
+            if self._spill is not None:
+                self._spill[evicted_key] = pickle.dumps(evicted)
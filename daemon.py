@@ -0,0 +1,365 @@
+"""
+A long-running local daemon that answers queries about positions, and a client for it.
+
+Starting a Python process for every query costs far more than answering it, so the daemon
+keeps a process warm: lookup tables are built once, solvers keep their transposition tables
+between queries and best moves are kept in a bounded cache (see `cache`). It listens on a Unix
+socket and speaks newline-delimited JSON: every line sent to the daemon is a request, which is
+answered by exactly one line.
+
+A request is a single query, or a batch of queries under the key "queries":
+
+    {"id": 1, "op": "legal", "hands": [["JH"], ["AS"], ["8S"], []], "trump": "H", "leader": 3, "trick": ["7C"]}
+    {"id": 2, "queries": [{"op": "winner", ...}, {"op": "best_move", ...}]}
+
+A position consists of the hands of the four players ("hands"), the trump suit ("trump"), the rule set
+("rules", defaults to Rotterdam), the player that led the current trick ("leader") and the cards played to
+it so far in order ("trick"); played cards are no longer in the hands, so the players that played to the
+trick hold one card fewer than the others. Cards are written as their rank followed by their suit, e.g.
+"10H" or "JS". The operations are:
+
+ - "legal": the legal cards of the player to play;
+ - "winner": the player and the card currently winning the trick;
+ - "best_move": a best card for the player to play, and the points its team then scores (see `solver`).
+
+A response holds the "result" of a single query or the "results" of a batch, the "id" of the request if it
+had one, and the time it took to answer in microseconds ("latency_us"). A query that cannot be answered
+results in an object with an "error" message instead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import instrumentation
+from bitboard import card_index, index_card, suit_index, winning_position
+from cache import ResultCache, position_key
+from models import RuleSet, Suit, format_card, parse_card
+from position import Position
+from solver import Solver
+
+DEFAULT_SOCKET = "/tmp/klaverjassen.sock"
+OPERATIONS: List[str] = ["legal", "winner", "best_move"]
+
+Query = Dict[str, Any]
+
+
+def parse_position(query: Query) -> Position:
+    """
+    Parse the position of a query.
+
+    :param query: The query.
+    :return: The position, of the first trick and without points.
+    :raises ValueError: If the query does not hold a valid position.
+    """
+    hands = query.get("hands")
+    if not isinstance(hands, list) or len(hands) != 4:
+        raise ValueError("A position must have four hands")
+    masks = [0, 0, 0, 0]
+    seen = 0
+    for seat, hand in enumerate(hands):
+        cards = [card_index(parse_card(name)) for name in hand]
+        masks[seat] = _add_cards(0, cards)
+        seen = _add_cards(seen, cards)
+
+    trump = Suit.suits().get(str(query.get("trump", "")).upper())
+    if trump is None:
+        raise ValueError(f"Unknown trump suit: {query.get('trump')!r}")
+    rules = RuleSet(query.get("rules", RuleSet.ROTTERDAM.value))
+
+    leader = query.get("leader", 0)
+    if type(leader) is not int or not 0 <= leader < 4:
+        raise ValueError(f"Unknown leading player: {leader!r}")
+    trick = [card_index(parse_card(name)) for name in query.get("trick", [])]
+    if len(trick) > 3:
+        raise ValueError("A trick in progress holds at most three cards")
+    seen = _add_cards(seen, trick)
+
+    # The players that played to the trick hold one card fewer than the players still to play.
+    size = bin(masks[(leader + len(trick)) % 4]).count("1")
+    if not size:
+        raise ValueError("The player to play has no cards")
+    for offset in range(4):
+        expected = size - 1 if offset < len(trick) else size
+        if bin(masks[(leader + offset) % 4]).count("1") != expected:
+            raise ValueError(f"Player {(leader + offset) % 4} must hold {expected} cards")
+
+    return Position(
+        hands=(masks[0], masks[1], masks[2], masks[3]),
+        trick=tuple(trick),
+        leader=leader,
+        trump_suit=suit_index(trump),
+        rules=rules,
+        trick_number=0,
+        points=(0, 0),
+    )
+
+
+def _add_cards(mask: int, cards: List[int]) -> int:
+    """Add cards to a mask of the cards seen so far, checking that none of them was seen before."""
+    for card in cards:
+        if mask >> card & 1:
+            raise ValueError(f"The card {format_card(index_card(card))} occurs more than once")
+        mask |= 1 << card
+
+    return mask
+
+
+class PositionServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Serves queries on a Unix socket, each connection in its own thread. A solver is kept per
+    trump suit and rule set; it is used by one thread at a time. Best moves are cached by position.
+    """
+
+    daemon_threads = True
+    max_transpositions: int
+    cache: ResultCache
+
+    def __init__(
+        self,
+        path: str,
+        max_transpositions: int = 2_000_000,
+        cache_bytes: int = 64 * 1024 * 1024,
+        cache_spill_path: Optional[str] = None,
+    ):
+        """
+        Start listening on a socket. A stale socket file at the path is removed first.
+
+        :param path: The path of the socket.
+        :param max_transpositions: The number of entries at which the transposition table of
+            a solver is cleared, to bound the memory use of the daemon.
+        :param cache_bytes: The maximum memory held by the cache of best moves.
+        :param cache_spill_path: The path of a database to spill evicted best moves to; see `cache.ResultCache`.
+        """
+        if os.path.exists(path):
+            os.remove(path)
+
+        self.max_transpositions = max_transpositions
+        self.cache = ResultCache(cache_bytes, cache_spill_path)
+        self._solvers: Dict[Tuple[int, RuleSet], Tuple[Solver, threading.Lock]] = {}
+        self._solvers_lock = threading.Lock()
+        super().__init__(path, _Handler)
+
+    def solver(self, trump_suit: int, rules: RuleSet) -> Tuple[Solver, threading.Lock]:
+        """Get the warm solver for a trump suit and rule set, and the lock that guards it."""
+        with self._solvers_lock:
+            if (trump_suit, rules) not in self._solvers:
+                self._solvers[trump_suit, rules] = (Solver(trump_suit, rules), threading.Lock())
+
+            return self._solvers[trump_suit, rules]
+
+    def answer(self, query: Query) -> Dict[str, Any]:
+        """
+        Answer a single query.
+
+        :param query: The query.
+        :return: The result, or an object with an error message.
+        """
+        if not isinstance(query, dict):
+            return {"error": "A query must be a JSON object"}
+        operation = query.get("op")
+        if operation not in OPERATIONS:
+            return {"error": f"Unknown operation: {operation!r}"}
+
+        try:
+            position = parse_position(query)
+        except (ValueError, TypeError) as error:
+            return {"error": str(error)}
+
+        if operation == "winner":
+            if not position.trick:
+                return {"error": "No card has been played to the trick"}
+            winner = winning_position(list(position.trick), position.trump_suit)
+            return {"player": (position.leader + winner) % 4, "card": format_card(index_card(position.trick[winner]))}
+
+        if operation == "best_move":
+            key = position_key(position)
+            result: Optional[Dict[str, Any]] = self.cache.get(key)
+            if result is None:
+                result = self._best_move(position)
+                self.cache.put(key, result)
+            return result
+
+        solver, _ = self.solver(position.trump_suit, position.rules)
+        moves = solver.legal_moves(position.hands, position.leader, position.trick)
+        return {"legal": [format_card(index_card(index)) for index in range(32) if moves >> index & 1]}
+
+    def server_close(self) -> None:
+        """Stop listening, and close the cache."""
+        super().server_close()
+        self.cache.close()
+
+    def _best_move(self, position: Position) -> Dict[str, Any]:
+        solver, lock = self.solver(position.trump_suit, position.rules)
+        with lock:
+            if len(solver.transpositions) > self.max_transpositions:
+                solver.transpositions.clear()
+            card, points = solver.best_move(position.hands, position.leader, position.trick)
+
+        return {"card": format_card(index_card(card)), "points": points}
+
+    def respond(self, line: bytes) -> Dict[str, Any]:
+        """
+        Answer a request.
+
+        :param line: The request, as a line of JSON.
+        :return: The response.
+        """
+        start = time.perf_counter()
+        response: Dict[str, Any]
+        try:
+            request = json.loads(line)
+        except ValueError as error:
+            request, response = {}, {"error": f"Invalid JSON: {error}"}
+        else:
+            if not isinstance(request, dict):
+                request, response = {}, {"error": "A request must be a JSON object"}
+            elif "queries" in request:
+                queries = request["queries"]
+                if not isinstance(queries, list) or not all(isinstance(query, dict) for query in queries):
+                    response = {"error": "The queries must be a list of JSON objects"}
+                else:
+                    response = {"results": [self.answer(query) for query in queries]}
+            else:
+                response = {"result": self.answer(request)}
+
+        if "id" in request:
+            response["id"] = request["id"]
+        response["latency_us"] = int((time.perf_counter() - start) * 1_000_000)
+        instrumentation.count("daemon_requests")
+
+        return response
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: PositionServer
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            self.wfile.write(json.dumps(self.server.respond(line)).encode() + b"\n")
+            self.wfile.flush()
+
+
+class DaemonClient(object):
+    """
+    A client of the daemon. It keeps a single connection open; use it as a context manager
+    or call `close` when done. A client must not be shared between threads.
+    """
+
+    path: str
+    # The latency reported by the daemon for the last request, in microseconds.
+    latency_us: int
+
+    def __init__(self, path: str = DEFAULT_SOCKET, timeout: Optional[float] = None):
+        """
+        Connect to the daemon.
+
+        :param path: The path of the socket of the daemon.
+        :param timeout: The number of seconds to wait for a response, or None to wait indefinitely.
+        """
+        self.path = path
+        self.latency_us = 0
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(path)
+        self._file = self._socket.makefile("rwb")
+
+    def request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send a raw request and wait for its response.
+
+        :param request: The request.
+        :return: The response.
+        """
+        self._file.write(json.dumps(request).encode() + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("The daemon closed the connection")
+
+        response: Dict[str, Any] = json.loads(line)
+        self.latency_us = response.get("latency_us", 0)
+
+        return response
+
+    def query(self, op: str, **position: Any) -> Dict[str, Any]:
+        """
+        Answer a single query, e.g. `client.query("legal", hands=..., trump="H", leader=0, trick=["AS"])`.
+
+        :param op: The operation.
+        :param position: The position; see the documentation of this module.
+        :return: The result.
+        :raises ValueError: If the daemon could not answer the query.
+        """
+        response = self.request({"op": op, **position})
+        if "error" in response:
+            raise ValueError(response["error"])
+
+        return _result(response["result"])
+
+    def batch(self, queries: List[Query]) -> List[Dict[str, Any]]:
+        """
+        Answer a batch of queries in a single request.
+
+        :param queries: The queries, each with its operation under "op".
+        :return: The results, in the order of the queries.
+        :raises ValueError: If the daemon could not answer any of the queries.
+        """
+        response = self.request({"queries": queries})
+        if "error" in response:
+            raise ValueError(response["error"])
+
+        return [_result(result) for result in response["results"]]
+
+    def close(self) -> None:
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self) -> DaemonClient:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def _result(result: Dict[str, Any]) -> Dict[str, Any]:
+    if "error" in result:
+        raise ValueError(result["error"])
+
+    return result
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="The path of the Unix socket to listen on.")
+    parser.add_argument(
+        "--max-transpositions", type=int, default=2_000_000, help="The size at which a solver's table is cleared."
+    )
+    parser.add_argument("--cache-bytes", type=int, default=64 * 1024 * 1024, help="The size of the result cache.")
+    parser.add_argument("--cache-spill", help="The path of a database to spill evicted cache entries to.")
+    options = parser.parse_args(arguments)
+
+    with PositionServer(options.socket, options.max_transpositions, options.cache_bytes, options.cache_spill) as server:
+        print(f"Listening on {options.socket}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(options.socket)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
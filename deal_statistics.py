@@ -0,0 +1,355 @@
+"""
+Statistics of the distribution of dealt hands, for tuning rules and auditing the fairness of dealing.
+
+Deals are generated in bulk as arrays of hand masks in the layout of `bitboard`, either by
+shuffling in NumPy (`random_hands`), which deals uniformly at random like `Deck.shuffle` and
+`Deck.deal` do, or by calling `Deck` itself (`deck_hands`) when the exact outcomes of seeds
+matter. All statistics are computed on whole arrays at once with table lookups per suit byte,
+and accumulated into histograms batch by batch, so memory use does not grow with the number of
+deals.
+
+The statistics are:
+
+ - `trump_length`: the number of trumps in a hand;
+ - `roem`: the roem held in a hand, counted with the tables of `scoring`, and how often every
+   kind of roem is held;
+ - `suit_split`: how the eight cards of a suit are split over the four hands, e.g. "4-2-1-1".
+
+Probabilities are reported with Wilson score confidence intervals, and the number of deals per
+second that were generated and analysed.
+
+Run `python deal_statistics.py --deals 1000000` to print the statistics.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from bitboard import cards_to_mask
+from models import Deck, Player, Suit
+from scoring import (
+    FOUR_OF_A_KIND_BITS,
+    FOUR_OF_A_KIND_ROEM_TABLE,
+    JACK_BIT,
+    SEQUENCE_ROEM_TABLE,
+    STUK_BITS,
+    STUK_ROEM,
+    sequence_lengths,
+)
+
+IntArray = npt.NDArray[np.int64]
+
+# The number of set bits of every byte.
+_POPCOUNT_TABLE: IntArray = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.int64)
+_SEQUENCE_ROEM_TABLE: IntArray = np.array(SEQUENCE_ROEM_TABLE, dtype=np.int64)
+_FOUR_OF_A_KIND_ROEM_TABLE: IntArray = np.array(FOUR_OF_A_KIND_ROEM_TABLE, dtype=np.int64)
+
+ROEM_KINDS = ["three_card_sequence", "four_card_sequence", "four_of_a_kind", "four_jacks", "stuk"]
+
+
+# Whether a suit byte holds a sequence of three cards, and of four or more cards, that scores roem.
+_THREE_CARD_SEQUENCE_TABLE: npt.NDArray[np.bool_] = np.array(
+    [3 in sequence_lengths(byte) for byte in range(256)], dtype=np.bool_
+)
+_FOUR_CARD_SEQUENCE_TABLE: npt.NDArray[np.bool_] = np.array(
+    [any(length >= 4 for length in sequence_lengths(byte)) for byte in range(256)], dtype=np.bool_
+)
+
+# The splits of the eight cards of a suit over four hands, as the numbers of cards from most to fewest.
+SUIT_SPLITS: List[Tuple[int, int, int, int]] = sorted(
+    (
+        (a, b, c, 8 - a - b - c)
+        for a in range(9)
+        for b in range(a + 1)
+        for c in range(b + 1)
+        if 0 <= 8 - a - b - c <= c and a + b + c <= 8
+    ),
+    reverse=True,
+)
+# Maps the code of a split, the numbers of cards as the digits of a number in base 9, to its index in `SUIT_SPLITS`.
+_SPLIT_INDEX: IntArray = np.full(9**4, -1, dtype=np.int64)
+for _index, _split in enumerate(SUIT_SPLITS):
+    _SPLIT_INDEX[((_split[0] * 9 + _split[1]) * 9 + _split[2]) * 9 + _split[3]] = _index
+
+
+def wilson_interval(successes: int, trials: int, z: float = 1.96) -> Tuple[float, float]:
+    """
+    Get the Wilson score confidence interval of a probability.
+
+    :param successes: The number of trials in which the event occurred.
+    :param trials: The number of trials.
+    :param z: The quantile of the standard normal distribution; 1.96 for a 95% interval.
+    :return: The lower and upper bound of the interval.
+    """
+    if not trials:
+        return 0.0, 1.0
+
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def suit_bytes(masks: npt.ArrayLike) -> IntArray:
+    """
+    Split hand masks into the bytes of their suits.
+
+    :param masks: An array of hand masks of any shape.
+    :return: An array with one more axis of size 4, holding the byte of every suit index.
+    """
+    masks = np.asarray(masks, dtype=np.int64)
+    return (masks[..., None] >> np.array([0, 8, 16, 24], dtype=np.int64)) & 0xFF
+
+
+def popcount(masks: npt.ArrayLike) -> IntArray:
+    """
+    Count the cards in hand masks.
+
+    :param masks: An array of hand masks of any shape.
+    :return: An array of the same shape holding the number of set bits of every mask.
+    """
+    return _POPCOUNT_TABLE[suit_bytes(masks)].sum(axis=-1)
+
+
+def hand_roem(masks: npt.ArrayLike, trump_suit: int) -> IntArray:
+    """
+    Get the roem in hands, like `scoring.mask_roem` does for a single mask.
+
+    :param masks: An array of hand masks of any shape.
+    :param trump_suit: The suit index of the trump suit.
+    :return: An array of the same shape holding the roem of every hand.
+    """
+    suits = suit_bytes(masks)
+    roem = _SEQUENCE_ROEM_TABLE[suits].sum(axis=-1)
+    roem += _FOUR_OF_A_KIND_ROEM_TABLE[suits[..., 0] & suits[..., 1] & suits[..., 2] & suits[..., 3]]
+    roem += STUK_ROEM * (suits[..., trump_suit] & STUK_BITS == STUK_BITS)
+
+    return roem
+
+
+def random_hands(rng: np.random.Generator, deals: int) -> IntArray:
+    """
+    Deal random hands: every deal is a uniformly random split of the deck into four hands of eight cards.
+
+    :param rng: The random number generator to draw from.
+    :param deals: The number of deals.
+    :return: An array of shape (deals, 4) holding the hand masks of every deal.
+    """
+    order = np.argsort(rng.random((deals, 32)), axis=1).reshape(deals, 4, 8)
+    return (np.int64(1) << order).sum(axis=2)
+
+
+def deck_hands(seeds: Iterable[int]) -> IntArray:
+    """
+    Deal hands with `Deck.shuffle` and `Deck.deal`, like `game.new_deal` does.
+
+    :param seeds: The seeds of the deals.
+    :return: An array of shape (deals, 4) holding the hand masks of every deal.
+    """
+    hands = []
+    for seed in seeds:
+        players = [Player(name=str(index)) for index in range(4)]
+        deck = Deck()
+        deck.shuffle(seed=seed)
+        deck.deal(players)
+        hands.append([cards_to_mask(player.hand) for player in players])
+
+    return np.array(hands, dtype=np.int64).reshape(-1, 4)
+
+
+class Histogram(object):
+    """A histogram of non-negative integers that is updated with arrays of values."""
+
+    counts: IntArray
+
+    def __init__(self, size: int = 0) -> None:
+        """
+        :param size: The initial number of bins; bins are added as larger values are seen.
+        """
+        self.counts = np.zeros(size, dtype=np.int64)
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def add(self, values: npt.ArrayLike) -> None:
+        """
+        Count values.
+
+        :param values: An array of non-negative integers.
+        """
+        counts = np.bincount(np.asarray(values, dtype=np.int64).ravel(), minlength=len(self.counts))
+        counts[: len(self.counts)] += self.counts
+        self.counts = counts
+
+    def probability(self, value: int) -> float:
+        """The fraction of the values that are equal to a value."""
+        total = self.total
+        return self.count(value) / total if total else 0.0
+
+    def interval(self, value: int, z: float = 1.96) -> Tuple[float, float]:
+        """The Wilson score confidence interval of the probability of a value; see `wilson_interval`."""
+        return wilson_interval(self.count(value), self.total, z)
+
+    def count(self, value: int) -> int:
+        return int(self.counts[value]) if value < len(self.counts) else 0
+
+    def values(self) -> List[int]:
+        """The values that were seen, in increasing order."""
+        return [int(value) for value in np.flatnonzero(self.counts)]
+
+
+class DealStatistics(object):
+    """Accumulates the statistics of batches of deals."""
+
+    trump_suit: int
+    deals: int
+    seconds: float
+    # The number of trumps per hand.
+    trump_length: Histogram
+    # The roem per hand.
+    roem: Histogram
+    # The number of hands that hold every kind of roem in `ROEM_KINDS`.
+    roem_kinds: Dict[str, int]
+    # The index in `SUIT_SPLITS` of the split of every suit of every deal.
+    suit_split: Histogram
+
+    def __init__(self, trump_suit: int):
+        """
+        :param trump_suit: The suit index of the trump suit.
+        """
+        self.trump_suit = trump_suit
+        self.deals = 0
+        self.seconds = 0.0
+        self.trump_length = Histogram(9)
+        self.roem = Histogram()
+        self.roem_kinds = {kind: 0 for kind in ROEM_KINDS}
+        self.suit_split = Histogram(len(SUIT_SPLITS))
+
+    @property
+    def hands(self) -> int:
+        return 4 * self.deals
+
+    @property
+    def deals_per_second(self) -> float:
+        return self.deals / self.seconds if self.seconds else 0.0
+
+    def add(self, hands: npt.ArrayLike) -> None:
+        """
+        Count a batch of deals.
+
+        :param hands: An array of shape (deals, 4) holding the hand masks of every deal.
+        """
+        start = time.perf_counter()
+        hands = np.asarray(hands, dtype=np.int64)
+        suits = suit_bytes(hands)
+        lengths = _POPCOUNT_TABLE[suits]
+
+        self.trump_length.add(lengths[..., self.trump_suit])
+        self.roem.add(hand_roem(hands, self.trump_suit))
+
+        all_suits = suits[..., 0] & suits[..., 1] & suits[..., 2] & suits[..., 3]
+        kinds = {
+            "three_card_sequence": _THREE_CARD_SEQUENCE_TABLE[suits].any(axis=-1),
+            "four_card_sequence": _FOUR_CARD_SEQUENCE_TABLE[suits].any(axis=-1),
+            "four_of_a_kind": (all_suits & FOUR_OF_A_KIND_BITS) != 0,
+            "four_jacks": (all_suits & JACK_BIT) != 0,
+            "stuk": suits[..., self.trump_suit] & STUK_BITS == STUK_BITS,
+        }
+        for kind, held in kinds.items():
+            self.roem_kinds[kind] += int(held.sum())
+
+        # Sort the numbers of cards of every suit over the hands, from most to fewest.
+        splits = -np.sort(-lengths, axis=1)
+        codes = ((splits[:, 0] * 9 + splits[:, 1]) * 9 + splits[:, 2]) * 9 + splits[:, 3]
+        self.suit_split.add(_SPLIT_INDEX[codes])
+
+        self.deals += len(hands)
+        self.seconds += time.perf_counter() - start
+
+    def roem_kind_interval(self, kind: str, z: float = 1.96) -> Tuple[float, float]:
+        """The Wilson score confidence interval of the probability that a hand holds a kind of roem."""
+        return wilson_interval(self.roem_kinds[kind], self.hands, z)
+
+
+def collect(
+    deals: int,
+    trump_suit: int,
+    seed: int = 0,
+    batch_size: int = 100000,
+    source: str = "numpy",
+) -> DealStatistics:
+    """
+    Generate deals and collect their statistics.
+
+    :param deals: The number of deals.
+    :param trump_suit: The suit index of the trump suit.
+    :param seed: The seed of the random number generator, or of the first deal if dealing with `Deck`.
+    :param batch_size: The number of deals generated and counted at once.
+    :param source: "numpy" to deal with `random_hands`, or "deck" to deal with `deck_hands`.
+    :return: The statistics. Their time includes generating the deals.
+    """
+    assert source in ["numpy", "deck"], f"Unknown source of deals: {source}"
+
+    statistics = DealStatistics(trump_suit)
+    rng = np.random.default_rng(seed)
+    while statistics.deals < deals:
+        count = min(batch_size, deals - statistics.deals)
+        start = time.perf_counter()
+        if source == "numpy":
+            hands = random_hands(rng, count)
+        else:
+            hands = deck_hands(range(seed + statistics.deals, seed + statistics.deals + count))
+        statistics.seconds += time.perf_counter() - start
+        statistics.add(hands)
+
+    return statistics
+
+
+def format_split(split: Tuple[int, int, int, int]) -> str:
+    return "-".join(str(amount) for amount in split)
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--deals", type=int, default=1000000, help="The number of deals to generate.")
+    parser.add_argument("--seed", type=int, default=0, help="The seed of the random number generator.")
+    parser.add_argument("--batch-size", type=int, default=100000, help="The number of deals counted at once.")
+    parser.add_argument("--trump", choices=list(Suit.suits()), default="H", help="The trump suit.")
+    parser.add_argument("--source", choices=["numpy", "deck"], default="numpy", help="How to deal the cards.")
+    options = parser.parse_args(arguments)
+
+    trump_suit = Suit.suits()[options.trump].value - 1
+    statistics = collect(options.deals, trump_suit, options.seed, options.batch_size, options.source)
+
+    def row(label: str, successes: int, trials: int) -> str:
+        low, high = wilson_interval(successes, trials)
+        return f"  {label:22} {successes / trials:>9.5f}  [{low:.5f}, {high:.5f}]"
+
+    print(f"{statistics.deals} deals in {statistics.seconds:.2f}s: {statistics.deals_per_second:.0f} deals/sec")
+    print("Trump length per hand:")
+    for length in statistics.trump_length.values():
+        print(row(str(length), statistics.trump_length.count(length), statistics.hands))
+    print("Roem per hand:")
+    for roem in statistics.roem.values():
+        print(row(str(roem), statistics.roem.count(roem), statistics.hands))
+    for kind in ROEM_KINDS:
+        print(row(kind, statistics.roem_kinds[kind], statistics.hands))
+    print("Suit splits:")
+    for index in statistics.suit_split.values():
+        print(row(format_split(SUIT_SPLITS[index]), statistics.suit_split.count(index), statistics.suit_split.total))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
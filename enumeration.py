@@ -0,0 +1,266 @@
+"""
+Enumeration of the deals that are consistent with what a single player has seen.
+
+A player knows their own hand and every card played so far. Played cards also reveal what the
+other players do not hold: a player that does not follow suit holds no card of the led suit, and
+a player that does not (over)trump when the rules demand it holds no card that would have been
+legal instead. `infer_exclusions` collects these facts from the tricks.
+
+A `DealEnumerator` counts the distributions of the unseen cards over the other players that
+respect the numbers of cards in their hands and the exclusions. Cards that may go to the same
+players are interchangeable for counting, so the count follows combinatorially from the numbers
+of such cards, without listing any distribution. Distributions are then listed lazily, or sampled
+uniformly at random, so that a caller can choose between exact enumeration and sampling based on
+the count.
+
+Hands are given as masks in the layout of `bitboard`.
+"""
+
+from __future__ import annotations
+
+import itertools
+import random
+from functools import lru_cache
+from math import factorial
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from bitboard import FULL_DECK, HIGHER_TRUMPS, SUIT_MASKS, card_index, cards_to_mask, suit_index, winning_position
+from models import RuleSet, Trick
+
+Hands = Tuple[int, int, int, int]
+
+
+def infer_exclusions(tricks: Sequence[Trick]) -> List[int]:
+    """
+    Infer the cards that every player cannot hold, from the cards they played.
+
+    :param tricks: The tricks played so far in a deal, in order, possibly ending with a trick in progress.
+    :return: For every player, the mask of cards that the player is known not to hold.
+    """
+    excluded = [0, 0, 0, 0]
+    if not tricks:
+        return excluded
+
+    deal = tricks[0].deal
+    assert deal.trump_suit is not None, "The trump suit of the deal must be known"
+    trump_suit = suit_index(deal.trump_suit)
+    trumps = SUIT_MASKS[trump_suit]
+    amsterdam = deal.rules == RuleSet.AMSTERDAM
+
+    for trick in tricks:
+        cards: List[int] = []
+        winner = 0
+        for offset in range(4):
+            seat = (trick.leading_player_index + offset) % 4
+            card = trick.played_cards[seat]
+            if card is None:
+                break
+
+            index = card_index(card)
+            if cards:
+                led_suit = cards[0] >> 3
+                winning_card = cards[winner]
+                if winning_card >> 3 == trump_suit:
+                    higher_trumps = HIGHER_TRUMPS[winning_card & 7] << (8 * trump_suit)
+                else:
+                    higher_trumps = trumps
+                teammate_winning = (trick.leading_player_index + winner) % 4 == (seat + 2) % 4
+
+                if index >> 3 != led_suit:
+                    # The player could not follow suit.
+                    excluded[seat] |= SUIT_MASKS[led_suit]
+                    if not (amsterdam and teammate_winning) or index >> 3 == trump_suit:
+                        if not higher_trumps >> index & 1:
+                            # Not overtrumping is only allowed without a higher trump.
+                            excluded[seat] |= higher_trumps
+                        if index >> 3 == trump_suit and not higher_trumps >> index & 1:
+                            # Undertrumping is only allowed with nothing but lower trumps.
+                            excluded[seat] |= FULL_DECK ^ trumps
+                elif led_suit == trump_suit and not higher_trumps >> index & 1:
+                    # Following trump without overtrumping is only allowed without a higher trump.
+                    excluded[seat] |= higher_trumps
+
+            cards.append(index)
+            winner = winning_position(cards, trump_suit)
+
+    return excluded
+
+
+class DealEnumerator(object):
+    """
+    Counts, lists and samples the distributions of unseen cards over players.
+
+    The unseen cards are split into groups of cards that may go to the same players. The count
+    is the sum, over every way of splitting the size of every group among its players, of the
+    product of the multinomial coefficients of these splits.
+    """
+
+    known: Hands
+    sizes: Tuple[int, int, int, int]
+    # The groups of interchangeable cards: the seats that may hold them, and the mask of the cards.
+    groups: List[Tuple[Tuple[int, ...], int]]
+    count: int
+
+    def __init__(self, known: Sequence[int], unseen: int, sizes: Sequence[int], excluded: Sequence[int]):
+        """
+        Initialize an enumerator.
+
+        :param known: For every player, the mask of the cards that are known to be in their hand.
+        :param unseen: The mask of the cards to distribute.
+        :param sizes: For every player, the number of unseen cards to give to them.
+        :param excluded: For every player, the mask of cards they cannot hold.
+        """
+        assert sum(sizes) == bin(unseen).count("1"), "The number of unseen cards must match the hand sizes"
+
+        self.known = (known[0], known[1], known[2], known[3])
+        self.sizes = (sizes[0], sizes[1], sizes[2], sizes[3])
+
+        masks: Dict[Tuple[int, ...], int] = {}
+        for index in range(32):
+            if unseen >> index & 1:
+                seats = tuple(seat for seat in range(4) if sizes[seat] and not excluded[seat] >> index & 1)
+                masks[seats] = masks.get(seats, 0) | 1 << index
+        self.groups = sorted(masks.items())
+
+        # Counts the ways to distribute the groups from a given one onward, given the cards each player still needs.
+        self._ways = lru_cache(maxsize=None)(self._count_ways)
+        self.count = self._ways(0, self.sizes)
+
+    @staticmethod
+    def from_tricks(tricks: Sequence[Trick], seat: int, cards: int = FULL_DECK) -> DealEnumerator:
+        """
+        Create the enumerator of the deals that a player considers possible.
+
+        :param tricks: The tricks played so far in a deal, in order, possibly ending with a trick in progress.
+            The trump suit of the deal must be known.
+        :param seat: The player whose view to take; only their hand is looked at.
+        :param cards: The mask of the cards that were dealt; the full deck unless playing with shorter hands.
+        :return: The enumerator. The known cards are the hand of the player.
+        """
+        deal = tricks[0].deal
+        played_counts = [0, 0, 0, 0]
+        played = 0
+        for trick in tricks:
+            for player_index, card in enumerate(trick.played_cards):
+                if card is not None:
+                    played_counts[player_index] += 1
+                    played |= 1 << card_index(card)
+
+        hand = cards_to_mask(deal.players[seat].hand)
+        hand_size = bin(hand).count("1") + played_counts[seat]
+        sizes = [0 if player_index == seat else hand_size - played_counts[player_index] for player_index in range(4)]
+        known = [hand if player_index == seat else 0 for player_index in range(4)]
+
+        return DealEnumerator(known, cards & ~played & ~hand, sizes, infer_exclusions(tricks))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Hands]:
+        """List every distribution, lazily; each as the hands of all players including their known cards."""
+        yield from self._distribute(0, self.sizes, self.known)
+
+    def sample(self, rng: random.Random) -> Hands:
+        """
+        Draw a distribution uniformly at random.
+
+        :param rng: The random number generator to draw from.
+        :return: The hands of all players, including their known cards.
+        """
+        assert self.count, "There is no consistent distribution"
+
+        hands = list(self.known)
+        needed = self.sizes
+        for number, (seats, mask) in enumerate(self.groups):
+            cards = [index for index in range(32) if mask >> index & 1]
+            # Choose the split of the group with a probability proportional to the number of distributions with it.
+            splits = list(self._splits(len(cards), seats, needed))
+            weights = [
+                _multinomial(len(cards), split) * self._ways(number + 1, _subtract(needed, seats, split))
+                for split in splits
+            ]
+            split = rng.choices(splits, weights=weights)[0]
+            needed = _subtract(needed, seats, split)
+
+            rng.shuffle(cards)
+            start = 0
+            for seat, size in zip(seats, split):
+                for index in cards[start : start + size]:
+                    hands[seat] |= 1 << index
+                start += size
+
+        return hands[0], hands[1], hands[2], hands[3]
+
+    def _count_ways(self, number: int, needed: Tuple[int, int, int, int]) -> int:
+        if number == len(self.groups):
+            return int(not any(needed))
+
+        seats, mask = self.groups[number]
+        size = bin(mask).count("1")
+        return sum(
+            _multinomial(size, split) * self._ways(number + 1, _subtract(needed, seats, split))
+            for split in self._splits(size, seats, needed)
+        )
+
+    def _distribute(self, number: int, needed: Tuple[int, int, int, int], hands: Hands) -> Iterator[Hands]:
+        if number == len(self.groups):
+            yield hands
+            return
+
+        seats, mask = self.groups[number]
+        cards = [index for index in range(32) if mask >> index & 1]
+        for split in self._splits(len(cards), seats, needed):
+            remaining = _subtract(needed, seats, split)
+            if not self._ways(number + 1, remaining):
+                continue
+            for assignment in _assignments(cards, split):
+                dealt = list(hands)
+                for seat, part in zip(seats, assignment):
+                    dealt[seat] |= part
+                yield from self._distribute(number + 1, remaining, (dealt[0], dealt[1], dealt[2], dealt[3]))
+
+    @staticmethod
+    def _splits(size: int, seats: Tuple[int, ...], needed: Tuple[int, int, int, int]) -> Iterator[Tuple[int, ...]]:
+        """The ways to split a number of cards among seats, giving no seat more than it needs."""
+        if not seats:
+            if size == 0:
+                yield ()
+            return
+
+        first, rest = seats[0], seats[1:]
+        for amount in range(min(size, needed[first]) + 1):
+            for split in DealEnumerator._splits(size - amount, rest, needed):
+                yield (amount,) + split
+
+
+def _subtract(
+    needed: Tuple[int, int, int, int], seats: Tuple[int, ...], split: Tuple[int, ...]
+) -> Tuple[int, int, int, int]:
+    remaining = list(needed)
+    for seat, amount in zip(seats, split):
+        remaining[seat] -= amount
+
+    return remaining[0], remaining[1], remaining[2], remaining[3]
+
+
+def _multinomial(size: int, split: Tuple[int, ...]) -> int:
+    result = factorial(size)
+    for amount in split:
+        result //= factorial(amount)
+
+    return result
+
+
+def _assignments(cards: List[int], split: Tuple[int, ...]) -> Iterator[Tuple[int, ...]]:
+    """List every way to give the cards to seats in the amounts of the split, as masks per seat."""
+    if not split:
+        yield ()
+        return
+
+    for chosen in itertools.combinations(cards, split[0]):
+        mask = 0
+        for index in chosen:
+            mask |= 1 << index
+        rest = [index for index in cards if not mask >> index & 1]
+        for assignment in _assignments(rest, split[1:]):
+            yield (mask,) + assignment
@@ -0,0 +1,222 @@
+"""
+Encoding of positions into fixed-size feature vectors for machine learning pipelines.
+
+A position is always encoded from the perspective of the player that is to play: seats are
+given relative to that player (0 is the player itself, 1 the next player, 2 the teammate
+and 3 the player before it). The layout of a feature vector is:
+
+    HAND         32  The cards in the hand of the player to play.
+    PLAYED    4x 32  The cards played in earlier tricks, per relative seat.
+    TRICK     4x 32  The cards played in the current trick, per relative seat.
+    TRUMP         4  One-hot encoding of the trump suit.
+    LEADER        4  One-hot encoding of the relative seat that led the current trick.
+    BIDDER        1  1 if the team of the player to play is the bidding team.
+    RULES         1  1 if the Amsterdam rules apply, 0 for Rotterdam.
+
+Cards are encoded with the index layout of `bitboard`.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from bitboard import card_index, cards_to_mask, suit_index
+from models import Card, RuleSet, Suit, Trick
+
+FloatArray = npt.NDArray[np.float32]
+
+HAND = slice(0, 32)
+PLAYED = slice(32, 160)
+TRICK = slice(160, 288)
+TRUMP = slice(288, 292)
+LEADER = slice(292, 296)
+BIDDER = 296
+RULES = 297
+
+FEATURE_SIZE = 298
+
+_BITS = np.arange(32, dtype=np.int64)
+_SEATS = np.arange(4, dtype=np.int64)
+
+
+def encode_position(
+    hand: Iterable[Card],
+    played: Sequence[Iterable[Card]],
+    trick_cards: Sequence[Optional[Card]],
+    trump_suit: Suit,
+    leading_player_index: int,
+    bidder_index: int,
+    rules: RuleSet,
+    player_index: int,
+    out: Optional[FloatArray] = None,
+) -> FloatArray:
+    """
+    Encode a single position into a feature vector.
+
+    :param hand: The hand of the player to play.
+    :param played: For every seat, the cards that seat played in earlier tricks of the deal.
+    :param trick_cards: The cards in the current trick per seat, as in `Trick.played_cards`.
+    :param trump_suit: The trump suit.
+    :param leading_player_index: The seat that led the current trick.
+    :param bidder_index: The seat of the bidding player.
+    :param rules: The rule set of the deal.
+    :param player_index: The seat of the player to play; the encoding is relative to this seat.
+    :param out: An optional array of shape (FEATURE_SIZE,) to write the features into.
+    :return: The feature vector; this is `out` if it was given.
+    """
+    if out is None:
+        out = np.zeros(FEATURE_SIZE, dtype=np.float32)
+    else:
+        out[:] = 0
+
+    out[HAND] = (cards_to_mask(hand) >> _BITS) & 1
+    for relative_seat in range(4):
+        seat = (player_index + relative_seat) % 4
+        card = trick_cards[seat]
+        offset = 32 * relative_seat
+
+        out[PLAYED.start + offset : PLAYED.start + offset + 32] = (cards_to_mask(played[seat]) >> _BITS) & 1
+        if card is not None:
+            out[TRICK.start + offset + card_index(card)] = 1
+
+    out[TRUMP.start + suit_index(trump_suit)] = 1
+    out[LEADER.start + (leading_player_index - player_index) % 4] = 1
+    out[BIDDER] = (bidder_index - player_index) % 2 == 0
+    out[RULES] = rules == RuleSet.AMSTERDAM
+
+    return out
+
+
+def encode_trick(trick: Trick, played: Sequence[Iterable[Card]], out: Optional[FloatArray] = None) -> FloatArray:
+    """
+    Encode the position of the player that is to play in a trick in progress.
+
+    :param trick: The trick. The trump suit of its deal must be known.
+    :param played: For every seat, the cards that seat played in earlier tricks of the deal.
+    :param out: An optional array of shape (FEATURE_SIZE,) to write the features into.
+    :return: The feature vector; this is `out` if it was given.
+    """
+    assert trick.deal.trump_suit is not None, "The trump suit of the deal must be known"
+    player_index = trick.player_index_to_play
+
+    return encode_position(
+        hand=trick.deal.players[player_index].hand,
+        played=played,
+        trick_cards=trick.played_cards,
+        trump_suit=trick.deal.trump_suit,
+        leading_player_index=trick.leading_player_index,
+        bidder_index=trick.deal.bidder_index,
+        rules=trick.deal.rules,
+        player_index=player_index,
+        out=out,
+    )
+
+
+class FeatureEncoder(object):
+    """
+    Encodes batches of positions given as integer arrays, without allocating memory per batch.
+    All intermediate buffers are allocated once, for the largest batch the encoder accepts.
+    """
+
+    capacity: int
+
+    def __init__(self, capacity: int):
+        """
+        Initialize an encoder.
+
+        :param capacity: The largest number of positions that can be encoded in a single batch.
+        """
+        self.capacity = capacity
+
+        self._rows = np.arange(capacity, dtype=np.int64) * 4
+        self._index = np.empty(capacity, dtype=np.int64)
+        self._gathered = np.empty(capacity, dtype=np.int64)
+        self._valid = np.empty(capacity, dtype=np.bool_)
+        self._bits = np.empty((capacity, 32), dtype=np.int64)
+        self._one_hot = np.empty((capacity, 4), dtype=np.bool_)
+
+    def encode_batch(
+        self,
+        out: FloatArray,
+        hands: npt.NDArray[np.int64],
+        played: npt.NDArray[np.int64],
+        trick_cards: npt.NDArray[np.int64],
+        trump_suits: npt.NDArray[np.int64],
+        leading_player_indices: npt.NDArray[np.int64],
+        bidder_indices: npt.NDArray[np.int64],
+        player_indices: npt.NDArray[np.int64],
+        amsterdam: npt.NDArray[np.bool_],
+    ) -> FloatArray:
+        """
+        Encode a batch of N positions into a preallocated output buffer.
+        All seat arguments are absolute; they are made relative to `player_indices` while encoding.
+
+        :param out: The output buffer of shape (N, FEATURE_SIZE).
+        :param hands: The hand masks of the players to play, shape (N,).
+        :param played: The masks of cards played in earlier tricks per seat, shape (N, 4). Must be C-contiguous.
+        :param trick_cards: The card index played per seat in the current trick or -1, shape (N, 4).
+            Must be C-contiguous.
+        :param trump_suits: The suit index of the trump suit, shape (N,).
+        :param leading_player_indices: The seat that led the current trick, shape (N,).
+        :param bidder_indices: The seat of the bidding player, shape (N,).
+        :param player_indices: The seat of the player to play, shape (N,).
+        :param amsterdam: Whether the Amsterdam rules apply, shape (N,).
+        :return: The output buffer.
+        """
+        size = len(hands)
+        assert size <= self.capacity, f"Batch of {size} positions exceeds the capacity of {self.capacity}"
+        assert out.shape == (size, FEATURE_SIZE), f"Invalid output shape: {out.shape}"
+
+        rows = self._rows[:size]
+        index = self._index[:size]
+        gathered = self._gathered[:size]
+        valid = self._valid[:size]
+        bits = self._bits[:size]
+        one_hot = self._one_hot[:size]
+        flat_played = played.reshape(-1)
+        flat_trick = trick_cards.reshape(-1)
+
+        self._unpack(hands, bits, out[:, HAND])
+        for relative_seat in range(4):
+            # The flat index of the absolute seat belonging to this relative seat, for every row.
+            np.add(player_indices, relative_seat, out=index)
+            np.remainder(index, 4, out=index)
+            np.add(index, rows, out=index)
+            offset = 32 * relative_seat
+
+            np.take(flat_played, index, out=gathered)
+            self._unpack(gathered, bits, out[:, PLAYED.start + offset : PLAYED.start + offset + 32])
+
+            # Turn the card index into a mask, taking care that -1 (no card) becomes an empty mask.
+            np.take(flat_trick, index, out=gathered)
+            np.greater_equal(gathered, 0, out=valid)
+            np.maximum(gathered, 0, out=gathered)
+            np.left_shift(1, gathered, out=gathered)
+            np.multiply(gathered, valid, out=gathered)
+            self._unpack(gathered, bits, out[:, TRICK.start + offset : TRICK.start + offset + 32])
+
+        np.equal(trump_suits[:, None], _SEATS, out=one_hot)
+        out[:, TRUMP] = one_hot
+
+        np.subtract(leading_player_indices, player_indices, out=index)
+        np.remainder(index, 4, out=index)
+        np.equal(index[:, None], _SEATS, out=one_hot)
+        out[:, LEADER] = one_hot
+
+        np.subtract(bidder_indices, player_indices, out=index)
+        np.remainder(index, 2, out=index)
+        np.equal(index, 0, out=valid)
+        out[:, BIDDER] = valid
+        out[:, RULES] = amsterdam
+
+        return out
+
+    @staticmethod
+    def _unpack(masks: npt.NDArray[np.int64], bits: npt.NDArray[np.int64], out: FloatArray) -> None:
+        """Write the 32 bits of every mask into the columns of `out`, using `bits` as scratch space."""
+        np.right_shift(masks[:, None], _BITS, out=bits)
+        np.bitwise_and(bits, 1, out=bits)
+        out[:] = bits
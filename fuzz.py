@@ -0,0 +1,404 @@
+"""
+Differential fuzzing of the fast rules engines against the reference implementation in `models`.
+
+Random positions are generated for every rule set: the hand of the player to play and the cards
+played to the trick so far. Every check computes the same answer twice, once with `Trick` (the
+reference) and once with a fast engine, and reports the positions on which they differ. A
+differing position is shrunk to a minimal one that still differs, by removing cards and
+simplifying the trick, so that it can be turned into a unit test directly.
+
+The checks are:
+
+ - `legal_mask`: `bitboard.legal_mask` against `Trick.legal_cards`;
+ - `legal_masks`: `vectorized.legal_masks`, over a whole batch, against `Trick.legal_cards`;
+ - `compare_cards`: `bitboard.STRENGTHS` against `Trick.compare_cards`, for every pair of cards in
+   the trick and the hand;
+ - `winning_position`: `bitboard.winning_position` against `Trick.winning_card_index`.
+
+Both implementations are timed on the same positions, so the speedup of every fast engine is
+reported along with its correctness. Building the `Trick` objects is not part of the timings.
+
+Run `python fuzz.py --cases 1000000` to fuzz; the process exits with status 1 on any mismatch.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bitboard import STRENGTHS, cards_to_mask, index_card, legal_mask, winning_position
+from models import Deal, Player, RuleSet, Suit, Trick, format_card
+from vectorized import legal_masks
+
+
+class FuzzCase(NamedTuple):
+    # The hand of the player to play, as a mask.
+    hand: int
+    # The indices of the cards played to the trick so far, in order; at most three.
+    trick: Tuple[int, ...]
+    leader: int
+    trump_suit: int
+    rules: RuleSet
+
+
+class Check(NamedTuple):
+    # Computes the answers for a batch of cases with the reference implementation, given the cases and their tricks.
+    reference: Callable[[Sequence[FuzzCase], Sequence[Trick]], List[object]]
+    # Computes the answers for a batch of cases with the fast engine.
+    fast: Callable[[Sequence[FuzzCase]], List[object]]
+
+
+class Mismatch(NamedTuple):
+    check: str
+    # The shrunk case.
+    case: FuzzCase
+    expected: object
+    actual: object
+
+
+class CheckStatistics(object):
+    """The time spent on a check by both implementations, on the same cases."""
+
+    cases: int
+    reference_seconds: float
+    fast_seconds: float
+
+    def __init__(self) -> None:
+        self.cases = 0
+        self.reference_seconds = 0.0
+        self.fast_seconds = 0.0
+
+    @property
+    def speedup(self) -> float:
+        return self.reference_seconds / self.fast_seconds if self.fast_seconds else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"CheckStatistics(cases={self.cases}, reference_seconds={self.reference_seconds:.3f}, "
+            f"fast_seconds={self.fast_seconds:.3f})"
+        )
+
+
+class FuzzReport(object):
+    """The outcome of a fuzzing run."""
+
+    cases: int
+    # The first mismatch of every check that had any, shrunk.
+    mismatches: List[Mismatch]
+    # The number of mismatching cases per check, before shrinking.
+    mismatch_counts: Dict[str, int]
+    statistics: Dict[str, CheckStatistics]
+
+    def __init__(self, checks: Sequence[str]) -> None:
+        self.cases = 0
+        self.mismatches = []
+        self.mismatch_counts = {name: 0 for name in checks}
+        self.statistics = {name: CheckStatistics() for name in checks}
+
+
+def make_trick(case: FuzzCase) -> Trick:
+    """
+    Create the reference trick of a case. Only the player to play holds cards.
+
+    :param case: The case.
+    :return: The trick.
+    """
+    players = [Player(name=str(index)) for index in range(4)]
+    players[(case.leader + len(case.trick)) % 4].hand = {
+        index_card(index) for index in range(32) if case.hand >> index & 1
+    }
+
+    deal = Deal(players=players, bidder_index=0, trump_suit=list(Suit)[case.trump_suit], rules=case.rules)
+    trick = Trick(deal=deal, leading_player_index=case.leader)
+    for offset, card in enumerate(case.trick):
+        trick.played_cards[(case.leader + offset) % 4] = index_card(card)
+
+    return trick
+
+
+def random_case(rng: random.Random, rules: RuleSet) -> FuzzCase:
+    """
+    Generate a random case.
+
+    :param rng: The random number generator to draw from.
+    :param rules: The rule set of the case.
+    :return: The case, with a hand of 1 to 8 cards and a trick of 0 to 3 cards.
+    """
+    length = rng.randrange(4)
+    cards = rng.sample(range(32), length + rng.randint(1, 8))
+    hand = 0
+    for index in cards[length:]:
+        hand |= 1 << index
+
+    return FuzzCase(
+        hand=hand, trick=tuple(cards[:length]), leader=rng.randrange(4), trump_suit=rng.randrange(4), rules=rules
+    )
+
+
+def _reference_legal(cases: Sequence[FuzzCase], tricks: Sequence[Trick]) -> List[object]:
+    return [cards_to_mask(trick.legal_cards) for trick in tricks]
+
+
+def _fast_legal(cases: Sequence[FuzzCase]) -> List[object]:
+    results: List[object] = []
+    for case in cases:
+        if case.trick:
+            winner = winning_position(list(case.trick), case.trump_suit)
+            results.append(
+                legal_mask(
+                    case.hand,
+                    case.trick[0] >> 3,
+                    case.trump_suit,
+                    case.trick[winner],
+                    winner == len(case.trick) - 2,
+                    case.rules == RuleSet.AMSTERDAM,
+                )
+            )
+        else:
+            results.append(case.hand)
+
+    return results
+
+
+def _fast_batch_legal(cases: Sequence[FuzzCase]) -> List[object]:
+    results: List[object] = [0] * len(cases)
+    for rules in RuleSet:
+        positions = [number for number, case in enumerate(cases) if case.rules == rules]
+        if not positions:
+            continue
+
+        led_suits, winning_cards, teammate_winning = [], [], []
+        for number in positions:
+            trick = cases[number].trick
+            winner = winning_position(list(trick), cases[number].trump_suit) if trick else -1
+            led_suits.append(trick[0] >> 3 if trick else -1)
+            winning_cards.append(trick[winner] if trick else -1)
+            teammate_winning.append(bool(trick) and winner == len(trick) - 2)
+
+        legal = legal_masks(
+            [cases[number].hand for number in positions],
+            led_suits,
+            [cases[number].trump_suit for number in positions],
+            winning_cards,
+            teammate_winning,
+            rules,
+        )
+        masks = (legal.astype(np.int64) << np.arange(32, dtype=np.int64)).sum(axis=1)
+        for number, mask in zip(positions, masks.tolist()):
+            results[number] = mask
+
+    return results
+
+
+def _pairs(case: FuzzCase) -> List[Tuple[int, int]]:
+    """The pairs of cards to compare in a case: all pairs of cards in the trick and the hand, if any card was led."""
+    if not case.trick:
+        return []
+
+    cards = list(case.trick) + [index for index in range(32) if case.hand >> index & 1]
+    return [(first, second) for number, first in enumerate(cards) for second in cards[number + 1 :]]
+
+
+def _reference_compare(cases: Sequence[FuzzCase], tricks: Sequence[Trick]) -> List[object]:
+    return [
+        tuple(trick.compare_cards(index_card(first), index_card(second)) for first, second in _pairs(case))
+        for case, trick in zip(cases, tricks)
+    ]
+
+
+def _fast_compare(cases: Sequence[FuzzCase]) -> List[object]:
+    results: List[object] = []
+    for case in cases:
+        strengths = STRENGTHS[case.trump_suit][case.trick[0] >> 3] if case.trick else []
+        # -1 if the first card is stronger, 1 if the second is and 0 if they are equal, like `Trick.compare_cards`.
+        results.append(
+            tuple(
+                (strengths[second] > strengths[first]) - (strengths[first] > strengths[second])
+                for first, second in _pairs(case)
+            )
+        )
+
+    return results
+
+
+def _reference_winner(cases: Sequence[FuzzCase], tricks: Sequence[Trick]) -> List[object]:
+    results: List[object] = []
+    for trick in tricks:
+        winning_index = trick.winning_card_index
+        results.append(-1 if winning_index is None else (winning_index - trick.leading_player_index) % 4)
+
+    return results
+
+
+def _fast_winner(cases: Sequence[FuzzCase]) -> List[object]:
+    return [winning_position(list(case.trick), case.trump_suit) if case.trick else -1 for case in cases]
+
+
+CHECKS: Dict[str, Check] = {
+    "legal_mask": Check(_reference_legal, _fast_legal),
+    "legal_masks": Check(_reference_legal, _fast_batch_legal),
+    "compare_cards": Check(_reference_compare, _fast_compare),
+    "winning_position": Check(_reference_winner, _fast_winner),
+}
+
+
+def mismatches(check: Check, case: FuzzCase) -> bool:
+    """
+    Determine whether the implementations of a check differ on a case.
+
+    :param check: The check.
+    :param case: The case.
+    :return: Whether the answers differ.
+    """
+    return check.reference([case], [make_trick(case)]) != check.fast([case])
+
+
+def _simplifications(case: FuzzCase) -> List[FuzzCase]:
+    """The cases that are one step simpler than a case, roughly from the largest step to the smallest."""
+    candidates = []
+    if case.trick:
+        candidates.append(case._replace(trick=case.trick[:-1]))
+    for index in range(32):
+        if case.hand >> index & 1 and case.hand & ~(1 << index):
+            candidates.append(case._replace(hand=case.hand & ~(1 << index)))
+    if case.leader:
+        candidates.append(case._replace(leader=0))
+    if case.rules != RuleSet.ROTTERDAM:
+        candidates.append(case._replace(rules=RuleSet.ROTTERDAM))
+
+    # Lower cards of the same suit, and suits moved down, keeping all cards distinct.
+    cards = list(case.trick) + [index for index in range(32) if case.hand >> index & 1]
+    for number, card in enumerate(case.trick):
+        for lower in range(card & ~7, card):
+            if lower not in cards:
+                candidates.append(case._replace(trick=case.trick[:number] + (lower,) + case.trick[number + 1 :]))
+    for card in cards[len(case.trick) :]:
+        for lower in range(card & ~7, card):
+            if lower not in cards:
+                candidates.append(case._replace(hand=case.hand & ~(1 << card) | 1 << lower))
+    for trump_suit in range(case.trump_suit):
+        candidates.append(case._replace(trump_suit=trump_suit))
+
+    return candidates
+
+
+def shrink(case: FuzzCase, fails: Callable[[FuzzCase], bool]) -> FuzzCase:
+    """
+    Shrink a failing case: repeatedly replace it by a simpler case that still fails, until there is none.
+
+    :param case: The failing case.
+    :param fails: Determines whether a case fails.
+    :return: A failing case of which no simplification fails.
+    """
+    assert fails(case), "Only a failing case can be shrunk"
+
+    shrunk = True
+    while shrunk:
+        shrunk = False
+        for candidate in _simplifications(case):
+            if fails(candidate):
+                case, shrunk = candidate, True
+                break
+
+    return case
+
+
+def fuzz(
+    cases: int,
+    seed: int = 0,
+    batch_size: int = 10000,
+    checks: Optional[Dict[str, Check]] = None,
+) -> FuzzReport:
+    """
+    Fuzz the fast engines.
+
+    :param cases: The number of cases to generate, spread evenly over the rule sets.
+    :param seed: The seed of the random number generator.
+    :param batch_size: The number of cases generated and checked at once.
+    :param checks: The checks to run by name; all of `CHECKS` if not given.
+    :return: The report.
+    """
+    checks = CHECKS if checks is None else checks
+    rng = random.Random(seed)
+    rule_sets = list(RuleSet)
+    report = FuzzReport(list(checks))
+
+    while report.cases < cases:
+        count = min(batch_size, cases - report.cases)
+        batch = [random_case(rng, rule_sets[(report.cases + number) % len(rule_sets)]) for number in range(count)]
+        tricks = [make_trick(case) for case in batch]
+        report.cases += count
+
+        for name, check in checks.items():
+            statistics = report.statistics[name]
+            start = time.perf_counter()
+            expected = check.reference(batch, tricks)
+            statistics.reference_seconds += time.perf_counter() - start
+            start = time.perf_counter()
+            actual = check.fast(batch)
+            statistics.fast_seconds += time.perf_counter() - start
+            statistics.cases += count
+
+            for case, expected_answer, actual_answer in zip(batch, expected, actual):
+                if expected_answer == actual_answer:
+                    continue
+
+                report.mismatch_counts[name] += 1
+                if report.mismatch_counts[name] == 1:
+                    shrunk = shrink(case, lambda candidate: mismatches(check, candidate))
+                    report.mismatches.append(
+                        Mismatch(
+                            check=name,
+                            case=shrunk,
+                            expected=check.reference([shrunk], [make_trick(shrunk)])[0],
+                            actual=check.fast([shrunk])[0],
+                        )
+                    )
+
+    return report
+
+
+def format_case(case: FuzzCase) -> str:
+    """Describe a case in the card notation of `models`."""
+    hand = " ".join(format_card(index_card(index)) for index in range(32) if case.hand >> index & 1)
+    trick = " ".join(format_card(index_card(index)) for index in case.trick) or "-"
+
+    return (
+        f"rules={case.rules.value} trump={list(Suit)[case.trump_suit].name} leader={case.leader} "
+        f"trick=[{trick}] hand=[{hand}]"
+    )
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=100000, help="The number of cases to generate.")
+    parser.add_argument("--seed", type=int, default=0, help="The seed of the random number generator.")
+    parser.add_argument("--batch-size", type=int, default=10000, help="The number of cases checked at once.")
+    parser.add_argument(
+        "--check", action="append", choices=list(CHECKS), help="A check to run; all of them if none are given."
+    )
+    options = parser.parse_args(arguments)
+
+    checks = {name: CHECKS[name] for name in options.check} if options.check else CHECKS
+    report = fuzz(options.cases, options.seed, options.batch_size, checks)
+
+    for name, statistics in report.statistics.items():
+        print(
+            f"{name:20} {report.mismatch_counts[name]:>8} mismatches "
+            f"{statistics.cases / statistics.reference_seconds:>14.0f} reference/sec "
+            f"{statistics.cases / statistics.fast_seconds:>14.0f} fast/sec {statistics.speedup:>8.1f}x"
+        )
+    for mismatch in report.mismatches:
+        print(f"Mismatch in {mismatch.check}: {format_case(mismatch.case)}")
+        print(f"    expected {mismatch.expected!r}, got {mismatch.actual!r}")
+
+    return 1 if report.mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
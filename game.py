@@ -0,0 +1,81 @@
+"""
+Playing out complete deals with the rules in `models`.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Callable, List, Optional
+
+from bitboard import card_index
+from models import Card, Deal, Deck, Player, RuleSet, Suit, Trick
+
+# A policy chooses the card to play for the player whose turn it is in the given trick.
+Policy = Callable[[Trick], Card]
+# A policy factory creates the policy for a single deal from a seeded RNG.
+PolicyFactory = Callable[[random.Random], Policy]
+
+
+def random_policy(rng: random.Random) -> Policy:
+    """
+    Create a policy that plays a uniformly random legal card.
+
+    :param rng: The random number generator to draw from.
+    :return: The policy.
+    """
+
+    def policy(trick: Trick) -> Card:
+        return rng.choice(sorted(trick.legal_cards, key=card_index))
+
+    return policy
+
+
+def new_deal(
+    seed: int, bidder_index: int = 0, trump_suit: Optional[Suit] = None, rules: RuleSet = RuleSet.ROTTERDAM
+) -> Deal:
+    """
+    Shuffle a full deck with the given seed and deal it among four new players.
+
+    :param seed: The seed for shuffling the deck.
+    :param bidder_index: The index of the bidding player.
+    :param trump_suit: The trump suit, if it is already known.
+    :param rules: The rule set of the deal.
+    :return: The deal, of which no trick has been played yet.
+    """
+    players = [Player(name=str(index)) for index in range(4)]
+    deck = Deck()
+    deck.shuffle(seed=seed)
+    deck.deal(players)
+
+    return Deal(players=players, bidder_index=bidder_index, trump_suit=trump_suit, rules=rules)
+
+
+def play_deal(deal: Deal, policy: Policy, observer: Optional[Callable[[Trick, Card], None]] = None) -> List[Trick]:
+    """
+    Play all remaining cards of a deal. The bidder leads the first trick, after which
+    every trick is led by the player that won the previous one.
+
+    :param deal: The deal. Its trump suit must be known.
+    :param policy: The policy that decides which card every player plays.
+    :param observer: An optional callback that is called with the trick and the chosen card
+        just before every card is played.
+    :return: The played tricks, in order.
+    """
+    assert deal.trump_suit is not None, "The trump suit of the deal must be known"
+
+    tricks: List[Trick] = []
+    leading_player_index = deal.bidder_index
+    while any(player.hand for player in deal.players):
+        trick = Trick(deal=deal, leading_player_index=leading_player_index)
+        for _ in range(4):
+            card = policy(trick)
+            if observer is not None:
+                observer(trick, card)
+            trick.play(card)
+
+        tricks.append(trick)
+        winning_index = trick.winning_card_index
+        assert winning_index is not None
+        leading_player_index = winning_index
+
+    return tricks
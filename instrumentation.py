@@ -0,0 +1,198 @@
+"""
+Opt-in instrumentation of the rules engine.
+
+When enabled, calls to the hot paths of `models.Trick` are counted and timed, and completed
+tricks and deals are counted. Other modules can report events such as cache hits through
+`count`. Instrumentation is disabled by default; the methods of `Trick` are then the original,
+unwrapped functions, so that there is no overhead at all. Only `count` costs a single check.
+
+Times are inclusive: the time spent in `legal_cards` includes its calls to `winning_card_index`.
+Counters are updated under a lock, so that they stay exact when several threads use the rules
+engine, like the clients of `daemon` do.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, DefaultDict, Dict, List, Optional, Tuple
+
+from models import Trick
+
+# The instrumented functions of `Trick`, by attribute name.
+FUNCTIONS: List[str] = ["legal_cards", "compare_cards", "winning_card_index", "play"]
+
+_enabled = False
+_originals: Dict[str, Any] = {}
+_calls: DefaultDict[str, int] = defaultdict(int)
+_seconds: DefaultDict[str, float] = defaultdict(float)
+_events: DefaultDict[str, int] = defaultdict(int)
+# Guards all counters and timers.
+_lock = threading.Lock()
+
+
+def _timed(name: str, function: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a function so that its calls are counted and timed under the given name."""
+
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            with _lock:
+                _calls[name] += 1
+                _seconds[name] += elapsed
+
+    return wrapper
+
+
+def _play(trick: Trick, card: Any) -> None:
+    """Play a card like `Trick.play`, counting the tricks and deals that are completed by it."""
+    _originals["play"](trick, card)
+
+    if None not in trick.played_cards:
+        count("tricks_completed")
+        if not any(player.hand for player in trick.deal.players):
+            count("deals_completed")
+
+
+def enable() -> None:
+    """Start counting and timing calls. Counters are not reset; see `reset`."""
+    global _enabled
+    if _enabled:
+        return
+
+    for name in FUNCTIONS:
+        original = Trick.__dict__[name]
+        _originals[name] = original
+        if isinstance(original, property):
+            assert original.fget is not None
+            setattr(Trick, name, property(_timed(name, original.fget)))
+        elif name == "play":
+            setattr(Trick, name, _timed(name, _play))
+        else:
+            setattr(Trick, name, _timed(name, original))
+
+    _enabled = True
+
+
+def disable() -> None:
+    """Stop counting and timing, restoring the original functions."""
+    global _enabled
+    if not _enabled:
+        return
+
+    for name in FUNCTIONS:
+        setattr(Trick, name, _originals.pop(name))
+    _enabled = False
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def count(event: str, amount: int = 1) -> None:
+    """
+    Count an event, such as a cache hit. Does nothing while instrumentation is disabled.
+
+    :param event: The name of the event.
+    :param amount: The number of times the event occurred.
+    """
+    if _enabled:
+        with _lock:
+            _events[event] += amount
+
+
+def reset() -> None:
+    """Reset all counters and timers to zero."""
+    with _lock:
+        _calls.clear()
+        _seconds.clear()
+        _events.clear()
+
+
+def snapshot() -> Dict[str, Dict[str, float]]:
+    """
+    Get a copy of the current counters and timers.
+
+    :return: A dictionary with the call counts ("calls") and the total seconds ("seconds") per
+        instrumented function, and the counts of all other events ("events").
+    """
+    with _lock:
+        return {
+            "calls": {name: float(_calls[name]) for name in FUNCTIONS},
+            "seconds": {name: _seconds[name] for name in FUNCTIONS},
+            "events": {name: float(value) for name, value in sorted(_events.items())},
+        }
+
+
+def prometheus_text(values: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+    """
+    Format counters and timers in the Prometheus text exposition format.
+
+    :param values: A result of `snapshot`. If unspecified, a new snapshot is taken.
+    :return: The formatted metrics.
+    """
+    values = values if values is not None else snapshot()
+    metrics: List[Tuple[str, str, str, Dict[str, float]]] = [
+        ("klaverjassen_calls_total", "Calls to the rules engine.", "function", values["calls"]),
+        ("klaverjassen_call_seconds_total", "Seconds spent in the rules engine.", "function", values["seconds"]),
+        ("klaverjassen_events_total", "Events in the rules engine.", "event", values["events"]),
+    ]
+
+    lines = []
+    for metric, description, label, samples in metrics:
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} counter")
+        for name, value in samples.items():
+            lines.append(f'{metric}{{{label}="{name}"}} {value:g}')
+
+    return "\n".join(lines) + "\n"
+
+
+def dump(path: str) -> None:
+    """
+    Write the current metrics in the Prometheus text format to a file. The file is replaced
+    atomically, so that a reader (e.g. a node exporter) never sees a partially written file.
+
+    :param path: The path of the file.
+    """
+    with open(path + ".tmp", "w") as file:
+        file.write(prometheus_text())
+    os.replace(path + ".tmp", path)
+
+
+class PeriodicDump(object):
+    """
+    Dumps the metrics to a file at a fixed interval in a background thread, until stopped.
+    The metrics are dumped one final time when stopping.
+    """
+
+    path: str
+    interval: float
+
+    def __init__(self, path: str, interval: float = 10.0):
+        """
+        Start dumping.
+
+        :param path: The path of the file to write the metrics to.
+        :param interval: The number of seconds between dumps.
+        """
+        self.path = path
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            dump(self.path)
+
+    def stop(self) -> None:
+        """Stop dumping, after writing the metrics a final time."""
+        self._stopped.set()
+        self._thread.join()
+        dump(self.path)
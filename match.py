@@ -0,0 +1,232 @@
+"""
+A match of 16 deals, with checkpoints so that an interrupted match can be resumed.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import struct
+from typing import Callable, List, Optional, Tuple
+
+from bitboard import cards_to_mask
+from game import PolicyFactory, play_deal, random_policy
+from models import RULE_SET_CODES, Deal, Deck, Player, RuleSet, Suit
+from scoring import TRUMP_POINTS_TABLE, DealScore, score_deal
+
+# A trump policy chooses the trump suit for the bidder, given the bidder's hand.
+TrumpPolicy = Callable[[Player], Suit]
+
+_MAGIC = b"KJM"
+_VERSION = 2
+_HEADER = struct.Struct("<3sBqBBB")
+_NAME_LENGTH = struct.Struct("<B")
+# The limits of what a checkpoint can hold: a signed 64-bit seed and names of at most 255 bytes in UTF-8.
+_SEED_RANGE = range(-(1 << 63), 1 << 63)
+_MAX_NAME_BYTES = 255
+_DEAL_SCORE = struct.Struct("<HHHHB")
+
+
+def strongest_suit(player: Player) -> Suit:
+    """
+    A trump policy that picks the suit in which the player's cards are worth the most as trumps.
+    Ties are broken in the order of `Suit`.
+
+    :param player: The bidding player, holding a full hand.
+    :return: The trump suit.
+    """
+    mask = cards_to_mask(player.hand)
+
+    return max(Suit, key=lambda suit: TRUMP_POINTS_TABLE[mask >> (8 * (suit.value - 1)) & 0xFF])
+
+
+class Match(object):
+    """
+    A Match consists of 16 deals. The dealer rotates with every deal, and the player after
+    the dealer is the bidder, who picks the trump suit and leads the first trick.
+    The scores of both teams accumulate over the deals.
+
+    Every deal is shuffled and played with randomness derived from the match seed and the
+    number of the deal only. Resuming a match from a checkpoint therefore yields exactly the
+    same result as playing it in one go.
+    """
+
+    DEALS = 16
+
+    players: List[Player]
+    seed: int
+    rules: RuleSet
+    first_dealer_index: int
+    policy_factory: PolicyFactory
+    trump_policy: TrumpPolicy
+    scores: List[DealScore]
+
+    def __init__(
+        self,
+        players: List[Player],
+        seed: int,
+        rules: RuleSet = RuleSet.ROTTERDAM,
+        first_dealer_index: int = 0,
+        policy_factory: PolicyFactory = random_policy,
+        trump_policy: TrumpPolicy = strongest_suit,
+    ):
+        """
+        Initializes a match.
+
+        :param players: The four players, in the order in which they are seated. Their names must be
+            at most 255 bytes long in UTF-8.
+        :param seed: The seed from which all randomness in the match is derived. It must fit in a signed
+            64-bit integer.
+        :param rules: The rule set of all deals.
+        :param first_dealer_index: The index of the player that deals the first deal.
+        :param policy_factory: Creates the policy with which all players play a deal.
+        :param trump_policy: Chooses the trump suit for the bidder.
+        :raises ValueError: If the seed or a name of a player cannot be stored in a checkpoint.
+        """
+        assert len(players) == 4, f"Invalid amount of players: {len(players)}"
+        assert 0 <= first_dealer_index < 4, f"Invalid dealer index: {first_dealer_index}"
+        if seed not in _SEED_RANGE:
+            raise ValueError(f"The seed does not fit in a signed 64-bit integer: {seed}")
+        for player in players:
+            if len(player.name.encode("utf-8")) > _MAX_NAME_BYTES:
+                raise ValueError(f"The name of a player is longer than {_MAX_NAME_BYTES} bytes: {player.name!r}")
+
+        self.players = players
+        self.seed = seed
+        self.rules = rules
+        self.first_dealer_index = first_dealer_index
+        self.policy_factory = policy_factory
+        self.trump_policy = trump_policy
+        self.scores = []
+
+    @property
+    def dealer_index(self) -> int:
+        """The index of the player that deals the next deal."""
+        return (self.first_dealer_index + len(self.scores)) % 4
+
+    @property
+    def bidder_index(self) -> int:
+        """The index of the player that bids in the next deal."""
+        return (self.dealer_index + 1) % 4
+
+    @property
+    def finished(self) -> bool:
+        return len(self.scores) == self.DEALS
+
+    @property
+    def totals(self) -> Tuple[int, int]:
+        """The cumulative scores of team 0 (players 0 and 2) and team 1 (players 1 and 3)."""
+        return sum(score.total(0) for score in self.scores), sum(score.total(1) for score in self.scores)
+
+    def play_deal(self) -> DealScore:
+        """
+        Shuffle, deal and play the next deal of the match.
+
+        :return: The score of the deal.
+        """
+        assert not self.finished, "The match is already finished"
+
+        deal_seed = self.seed * self.DEALS + len(self.scores)
+        rng = random.Random(deal_seed)
+
+        # The cards are dealt starting with the player after the dealer.
+        deck = Deck()
+        deck.shuffle(seed=deal_seed)
+        for player in self.players:
+            player.hand = set()
+        deck.deal([self.players[(self.dealer_index + offset) % 4] for offset in range(1, 5)])
+
+        deal = Deal(
+            players=self.players,
+            bidder_index=self.bidder_index,
+            trump_suit=self.trump_policy(self.players[self.bidder_index]),
+            rules=self.rules,
+        )
+        score = score_deal(deal, play_deal(deal, self.policy_factory(rng)))
+        self.scores.append(score)
+
+        return score
+
+    def play(self, checkpoint: Optional[str] = None, deals: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Play the remaining deals of the match.
+
+        :param checkpoint: If given, the match is saved to this path after every deal.
+        :param deals: If given, stop after playing at most this many deals.
+        :return: The cumulative scores of both teams.
+        """
+        played = 0
+        while not self.finished and (deals is None or played < deals):
+            self.play_deal()
+            played += 1
+            if checkpoint is not None:
+                self.save(checkpoint)
+
+        return self.totals
+
+    def save(self, path: str) -> None:
+        """
+        Save the state of the match to a compact binary file. The file is replaced atomically,
+        so that an interruption while saving leaves the previous checkpoint intact.
+
+        :param path: The path of the checkpoint.
+        """
+        data = bytearray(
+            _HEADER.pack(
+                _MAGIC,
+                _VERSION,
+                self.seed,
+                RULE_SET_CODES.index(self.rules),
+                self.first_dealer_index,
+                len(self.scores),
+            )
+        )
+        for player in self.players:
+            name = player.name.encode("utf-8")
+            data += _NAME_LENGTH.pack(len(name)) + name
+        for score in self.scores:
+            data += _DEAL_SCORE.pack(*score.points, *score.roem, score.nat | score.pit << 1)
+
+        with open(path + ".tmp", "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(
+        cls, path: str, policy_factory: PolicyFactory = random_policy, trump_policy: TrumpPolicy = strongest_suit
+    ) -> Match:
+        """
+        Load a match from a checkpoint, so that it can be resumed with `play`.
+        The policies are not part of the checkpoint and must be given again.
+
+        :param path: The path of the checkpoint.
+        :param policy_factory: Creates the policy with which all players play a deal.
+        :param trump_policy: Chooses the trump suit for the bidder.
+        :return: The match.
+        """
+        with open(path, "rb") as file:
+            data = file.read()
+
+        magic, version, seed, rules, first_dealer_index, deals = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a match checkpoint of version {_VERSION}")
+
+        offset = _HEADER.size
+        players = []
+        for _ in range(4):
+            (length,) = _NAME_LENGTH.unpack_from(data, offset)
+            offset += _NAME_LENGTH.size
+            players.append(Player(name=data[offset : offset + length].decode("utf-8")))
+            offset += length
+
+        match = cls(players, seed, RULE_SET_CODES[rules], first_dealer_index, policy_factory, trump_policy)
+        for _ in range(deals):
+            points_0, points_1, roem_0, roem_1, flags = _DEAL_SCORE.unpack_from(data, offset)
+            offset += _DEAL_SCORE.size
+            match.scores.append(
+                DealScore(points=(points_0, points_1), roem=(roem_0, roem_1), nat=bool(flags & 1), pit=bool(flags & 2))
+            )
+
+        return match
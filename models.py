@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import random
 from enum import Enum
-from typing import NamedTuple, List, Optional, Set, Dict, Any
+from typing import NamedTuple, List, Optional, Set, Dict, Any, Tuple, Callable
 
 
 class Rank(Enum):
@@ -76,10 +76,66 @@ class Card(NamedTuple):
     suit: Suit
     rank: Rank
 
+    @property
+    def ordinal(self) -> int:
+        """
+        The ordinal of this card in 0..31: the suits occupy consecutive blocks of eight in the order
+        of `Suit`, and within a block the ranks are in the order of `Rank`. See `CARDS`.
+        """
+        return 8 * (self.suit.value - 1) + self.rank.value - Rank.SEVEN.value
+
+    def intern(self) -> Card:
+        """
+        Get the shared instance of this card from `CARDS`. Collections holding only shared
+        instances need no memory for the cards themselves.
+        """
+        return CARDS[self.ordinal]
+
+
+# All 32 cards of a piquet deck as shared instances, such that `CARDS[card.ordinal] == card`.
+CARDS: Tuple[Card, ...] = tuple(Card(suit=suit, rank=rank) for suit in Suit for rank in Rank)
+
+# The notation of cards: the rank followed by the suit letter, e.g. "10H" for the ten of hearts.
+RANK_NAMES: Dict[Rank, str] = {
+    Rank.SEVEN: "7",
+    Rank.EIGHT: "8",
+    Rank.NINE: "9",
+    Rank.TEN: "10",
+    Rank.JACK: "J",
+    Rank.QUEEN: "Q",
+    Rank.KING: "K",
+    Rank.ACE: "A",
+}
+SUIT_NAMES: Dict[Suit, str] = {suit: name for name, suit in Suit.suits().items()}
+_RANKS_BY_NAME: Dict[str, Rank] = {name: rank for rank, name in RANK_NAMES.items()}
+
+
+def parse_card(name: str) -> Card:
+    """
+    Parse the notation of a card, e.g. "10H" for the ten of hearts.
+
+    :param name: The rank followed by the suit letter of the card.
+    :return: The shared instance of the card.
+    :raises ValueError: If the notation is not that of a card.
+    """
+    rank, suit = _RANKS_BY_NAME.get(name[:-1].upper()), Suit.suits().get(name[-1:].upper())
+    if rank is None or suit is None:
+        raise ValueError(f"Unknown card: {name!r}")
+
+    return Card(suit=suit, rank=rank).intern()
+
+
+def format_card(card: Card) -> str:
+    """Get the notation of a card, e.g. "10H" for the ten of hearts. This is the inverse of `parse_card`."""
+    return RANK_NAMES[card.rank] + SUIT_NAMES[card.suit]
+
 
 class Player(object):
+    __slots__ = ("hand", "name", "seat")
+
     hand: Set[Card]
     name: str
+    seat: Optional[int]
 
     def __init__(self, hand: Set[Card] = None, name: str = None):
         """
@@ -92,10 +148,17 @@ class Player(object):
         self.hand = hand if hand is not None else set()
         self.name = name if name is not None else self.generate_name()
 
+        # The index of the player in the Deal it was last seated in. This is set by the Deal.
+        self.seat = None
+
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, Player):
             return False
 
+        # Players seated at different positions are never the same player.
+        if self.seat is not None and other.seat is not None and self.seat != other.seat:
+            return False
+
         return self.name == other.name and self.hand == other.hand
 
     @staticmethod
@@ -141,7 +204,7 @@ class Deck(object):
         """
 
         # Default the card collection to a full deck if none are specified.
-        self.cards = [Card(suit=suit, rank=rank) for suit in Suit for rank in Rank] if cards is None else cards
+        self.cards = list(CARDS) if cards is None else cards
 
     def shuffle(self, seed: int = None) -> None:
         """
@@ -184,11 +247,17 @@ class RuleSet(Enum):
     ROTTERDAM = "Rotterdam"
 
 
+# The rule sets by the code with which binary formats store them, such as `position` and the checkpoints of `match`.
+RULE_SET_CODES: List[RuleSet] = [RuleSet.ROTTERDAM, RuleSet.AMSTERDAM]
+
+
 class Deal(object):
+    __slots__ = ("players", "bidder_index", "trump_suit", "_rules", "legality")
+
     players: List[Player]
     bidder_index: int
     trump_suit: Optional[Suit]
-    rules: RuleSet
+    legality: LegalityRule
 
     def __init__(
         self, players: List[Player], bidder_index: int, trump_suit: Suit = None, rules: RuleSet = RuleSet.ROTTERDAM
@@ -212,6 +281,19 @@ class Deal(object):
         self.trump_suit = trump_suit
         self.rules = rules
 
+        for seat, player in enumerate(players):
+            player.seat = seat
+
+    @property
+    def rules(self) -> RuleSet:
+        return self._rules
+
+    @rules.setter
+    def rules(self, rules: RuleSet) -> None:
+        # Select the legality rule once, so that determining legal cards need not inspect the rule set.
+        self._rules = rules
+        self.legality = LEGALITY_RULES[rules]
+
     def initialize(self) -> None:
         """
         Begins the Deal. If no trump suit was yet selected, this will prompt to the bidder to select a suit.
@@ -223,12 +305,32 @@ class Deal(object):
             self.trump_suit = Suit.suits()[user_input]
 
     def get_teammate_index(self, player: Player) -> int:
+        """
+        Get the index of the teammate of a player. Players seated in this deal are looked up by their seat;
+        other players are compared to the players of this deal by their name and hand.
+
+        :param player: The player.
+        :return: The index of the teammate in the player list.
+        """
+        if isinstance(player, Player) and player.seat is not None and self.players[player.seat] is player:
+            return self.teammate_index(player.seat)
+
         for index, value in enumerate(self.players):
             if value == player:
-                return (index + 2) % 4
+                return self.teammate_index(index)
 
         raise ValueError("Given player is not in the player list for this deal")
 
+    @staticmethod
+    def teammate_index(index: int) -> int:
+        """Get the index of the teammate of the player at the given index."""
+        return (index + 2) % 4
+
+    @staticmethod
+    def opponent_indices(index: int) -> Tuple[int, int]:
+        """Get the indices of the two opponents of the player at the given index."""
+        return (index + 1) % 4, (index + 3) % 4
+
 
 class Trick(object):
     """
@@ -236,6 +338,8 @@ class Trick(object):
     A Deal essentially contains 8 tricks in total.
     """
 
+    __slots__ = ("leading_player_index", "deal", "played_cards")
+
     leading_player_index: int
     deal: Deal
     played_cards: List[Optional[Card]]
@@ -278,7 +382,7 @@ class Trick(object):
         :return: int
         """
 
-        return self.leading_player_index + len([card for card in self.played_cards if card is not None]) % 4
+        return (self.leading_player_index + len([card for card in self.played_cards if card is not None])) % 4
 
     @property
     def legal_cards(self) -> Set[Card]:
@@ -293,48 +397,8 @@ class Trick(object):
         if self.led_suit is None:
             return hand
 
-        # Determine the cards that follow the led suit or are higher trump cards than those
-        # that are already played (if any; otherwise, all trump cards are logically higher).
-        follow_suit_cards = {card for card in hand if card.suit == self.led_suit}
-        higher_trump_cards = {
-            card
-            for card in hand
-            if card.suit == self.deal.trump_suit
-            and (self.winning_card is None or self.compare_cards(card, self.winning_card) == -1)
-        }
-        non_trump_cards = {card for card in hand if card.suit != self.deal.trump_suit}
-
-        # If the led suit is the trump suit, only higher trumps are allowed (if available).
-        if self.deal.trump_suit == self.led_suit and higher_trump_cards:
-            return higher_trump_cards
-
-        # If the player can follow suit, those cards are the only legal ones.
-        if follow_suit_cards:
-            return follow_suit_cards
-
-        # Suit cannot be followed. We have to determine whether we need to play a higher trump,
-        # or whether the rest of our hand is legal.
-
-        if self.deal.rules == RuleSet.ROTTERDAM and higher_trump_cards:
-            return higher_trump_cards
-
-        if self.deal.rules == RuleSet.AMSTERDAM and (non_trump_cards or higher_trump_cards):
-            # There are either non-trump cards or higher trump cards that we can legally play.
-            # We must decide whether we are forced to play a higher trump (if available).
-            if self.winning_card_index == self.deal.get_teammate_index(self.deal.players[self.player_index_to_play]):
-                # The teammate is currently leading this trick. In Amsterdam games, this means
-                # we do not need to play a higher trump, but non-trump cards are also legel.
-                return higher_trump_cards.union(non_trump_cards)
-            elif higher_trump_cards:
-                return higher_trump_cards
-            else:
-                return non_trump_cards
-
-        # If the player has no higher trump cards, but does have non-trump cards
-        # left in his hand, then those cards are legal to play. If the player, however,
-        # has no such non-trump cards, then the player has only lower trump cards left.
-        # In that scenario all those non-trump cards (i.e. the full hand) is available.
-        return non_trump_cards if non_trump_cards else hand
+        # The remaining decision depends on the rule set of the deal; see `LEGALITY_RULES`.
+        return self.deal.legality(self, hand)
 
     @property
     def winning_card_index(self) -> Optional[int]:
@@ -436,3 +500,94 @@ class Trick(object):
 
         # Add the card to the trick.
         self.played_cards[self.player_index_to_play] = card
+
+
+# A legality rule determines the legal cards from the hand of the player to play in a trick,
+# given that a suit has already been led in that trick.
+LegalityRule = Callable[[Trick, Set[Card]], Set[Card]]
+
+
+def _follow_suit_cards(trick: Trick, hand: Set[Card]) -> Optional[Set[Card]]:
+    """
+    Determine the legal cards if the player can follow suit; this is the same for all rule sets.
+
+    :return: The legal cards, or None if the player cannot follow suit.
+    """
+    follow_suit_cards = {card for card in hand if card.suit == trick.led_suit}
+    if not follow_suit_cards:
+        return None
+
+    # If the led suit is the trump suit, only higher trumps are allowed (if available).
+    if trick.led_suit == trick.deal.trump_suit:
+        return _higher_trump_cards(trick, hand) or follow_suit_cards
+
+    return follow_suit_cards
+
+
+def _higher_trump_cards(trick: Trick, hand: Set[Card]) -> Set[Card]:
+    """
+    Get the trump cards in hand that are higher than the card currently winning the trick
+    (if any; otherwise, all trump cards are logically higher).
+    """
+    winning_card = trick.winning_card
+
+    return {
+        card
+        for card in hand
+        if card.suit == trick.deal.trump_suit
+        and (winning_card is None or trick.compare_cards(card, winning_card) == -1)
+    }
+
+
+def _rotterdam_legal_cards(trick: Trick, hand: Set[Card]) -> Set[Card]:
+    """
+    Rotterdam rules: a player that cannot follow suit must play a higher trump if possible,
+    even if the teammate is currently winning the trick.
+    """
+    follow_suit_cards = _follow_suit_cards(trick, hand)
+    if follow_suit_cards is not None:
+        return follow_suit_cards
+
+    return _overtrump_or_discard(trick, hand)
+
+
+def _overtrump_or_discard(trick: Trick, hand: Set[Card]) -> Set[Card]:
+    """Determine the legal cards of a player that cannot follow suit and must play a higher trump if possible."""
+    higher_trump_cards = _higher_trump_cards(trick, hand)
+    if higher_trump_cards:
+        return higher_trump_cards
+
+    # If the player has no higher trump cards, but does have non-trump cards
+    # left in his hand, then those cards are legal to play. If the player, however,
+    # has no such non-trump cards, then the player has only lower trump cards left.
+    # In that scenario all those non-trump cards (i.e. the full hand) is available.
+    non_trump_cards = {card for card in hand if card.suit != trick.deal.trump_suit}
+    return non_trump_cards if non_trump_cards else hand
+
+
+def _amsterdam_legal_cards(trick: Trick, hand: Set[Card]) -> Set[Card]:
+    """
+    Amsterdam rules: as Rotterdam rules, except that a player that cannot follow suit while the
+    teammate is winning the trick may also play a non-trump card instead of a higher trump.
+    """
+    follow_suit_cards = _follow_suit_cards(trick, hand)
+    if follow_suit_cards is not None:
+        return follow_suit_cards
+
+    if trick.winning_card_index == Deal.teammate_index(trick.player_index_to_play):
+        # The teammate is currently leading this trick. In Amsterdam games, this means
+        # we do not need to play a higher trump, but non-trump cards are also legal.
+        # Lower trump cards are only legal if nothing else is.
+        legal_cards = _higher_trump_cards(trick, hand)
+        legal_cards.update(card for card in hand if card.suit != trick.deal.trump_suit)
+        return legal_cards if legal_cards else hand
+
+    return _overtrump_or_discard(trick, hand)
+
+
+# The legality rule of every rule set. A regional variant is added by adding a member to `RuleSet`
+# and registering its legality rule here; the rule is selected once, when it is assigned to a Deal.
+LEGALITY_RULES: Dict[RuleSet, LegalityRule] = {
+    RuleSet.ROTTERDAM: _rotterdam_legal_cards,
+    RuleSet.AMSTERDAM: _amsterdam_legal_cards,
+}
@@ -0,0 +1,146 @@
+"""
+Move ordering for the solver.
+
+Alpha-beta search prunes the most when the best move is tried first. `MoveOrderer` orders the
+legal cards of a position by, in this order of priority:
+
+ - killer moves: cards that recently caused a cutoff at the same trick and position in the trick;
+ - card heuristics: win a trick with the cheapest card that wins it, discard the cheapest card
+   when the trick cannot be won, give points to a teammate that is sure to win the trick,
+   conserve trumps, and lead cards that are certain to win;
+ - the history table: how often and how deep a card caused a cutoff in the same trick.
+
+Cards are given by their index and hands by their mask, in the layout of `bitboard`.
+"""
+
+from __future__ import annotations
+
+from typing import List
+
+from bitboard import HIGHER_PLAIN, HIGHER_TRUMPS, STRENGTHS
+from scoring import PLAIN_POINTS_TABLE, TRUMP_POINTS_TABLE
+
+KILLERS_PER_SLOT = 2
+
+
+class MoveOrderer(object):
+    """
+    Orders moves for a single trump suit. Killer and history tables persist between searches,
+    so an orderer should be shared by all searches within the same deal.
+    """
+
+    trump_suit: int
+    use_heuristics: bool
+    use_killers: bool
+    use_history: bool
+    points: List[int]
+    killers: List[List[int]]
+    history: List[List[int]]
+
+    def __init__(self, trump_suit: int, heuristics: bool = True, killers: bool = True, history: bool = True):
+        """
+        Initialize an orderer.
+
+        :param trump_suit: The suit index of the trump suit.
+        :param heuristics: Whether to order by card heuristics.
+        :param killers: Whether to try killer moves first.
+        :param history: Whether to order by the history table.
+        """
+        self.trump_suit = trump_suit
+        self.use_heuristics = heuristics
+        self.use_killers = killers
+        self.use_history = history
+        self.points = [
+            (TRUMP_POINTS_TABLE if index >> 3 == trump_suit else PLAIN_POINTS_TABLE)[1 << (index & 7)]
+            for index in range(32)
+        ]
+
+        # Killer moves are kept per slot, i.e. per number of remaining tricks and position in the trick.
+        self.killers = [[] for _ in range(8 * 4 + 4)]
+        # The history table is kept per number of remaining tricks and card.
+        self.history = [[0] * 32 for _ in range(9)]
+
+    def order(
+        self, moves: int, trick: List[int], teammate_winning: bool, outstanding: int, tricks_left: int
+    ) -> List[int]:
+        """
+        Order the legal cards of a position, best first.
+
+        :param moves: The mask of legal cards.
+        :param trick: The cards played to the current trick so far, in order.
+        :param teammate_winning: Whether the teammate of the player to play is winning the trick.
+        :param outstanding: The mask of cards held by the other players.
+        :param tricks_left: The number of tricks left to play, including the current trick.
+        :return: The indices of the legal cards.
+        """
+        cards = []
+        while moves:
+            lowest = moves & -moves
+            cards.append(lowest.bit_length() - 1)
+            moves ^= lowest
+
+        if len(cards) < 2:
+            return cards
+
+        history = self.history[tricks_left]
+        killers = self.killers[4 * tricks_left + len(trick)] if self.use_killers else []
+        scores = {}
+        for card in cards:
+            score = self._heuristic(card, trick, teammate_winning, outstanding) if self.use_heuristics else 0
+            if self.use_history:
+                score = (score << 32) + history[card]
+            if card in killers:
+                score += 1 << 50
+            scores[card] = score
+
+        cards.sort(key=scores.__getitem__, reverse=True)
+
+        return cards
+
+    def record_cutoff(self, card: int, trick_length: int, tricks_left: int) -> None:
+        """
+        Record that a card caused a cutoff.
+
+        :param card: The index of the card.
+        :param trick_length: The number of cards that were played to the trick before the card.
+        :param tricks_left: The number of tricks left to play, including the current trick.
+        """
+        if self.use_killers:
+            killers = self.killers[4 * tricks_left + trick_length]
+            if card not in killers:
+                killers.insert(0, card)
+                del killers[KILLERS_PER_SLOT:]
+
+        if self.use_history:
+            # Cutoffs close to the root of the search prune more, so they weigh heavier.
+            self.history[tricks_left][card] += tricks_left * tricks_left
+
+    def _heuristic(self, card: int, trick: List[int], teammate_winning: bool, outstanding: int) -> int:
+        """Score a card by how promising it is; higher is better."""
+        points = self.points[card]
+        is_trump = card >> 3 == self.trump_suit
+
+        if not trick:
+            # Lead a card that is certain to win the trick, otherwise a cheap card that is not a trump.
+            higher = (HIGHER_TRUMPS if is_trump else HIGHER_PLAIN)[card & 7] << (card & ~7)
+            if not outstanding & higher:
+                return 200 + points
+            return -2 * points - 50 * is_trump
+
+        strengths = STRENGTHS[self.trump_suit][trick[0] >> 3]
+        wins = strengths[card] > max(strengths[played] for played in trick)
+        last = len(trick) == 3
+
+        if teammate_winning:
+            if wins:
+                # Overtaking the teammate is rarely useful.
+                return -100 - strengths[card]
+            # Give points to a teammate that is certain to win; otherwise keep the points.
+            return 100 + points if last else -2 * points - 50 * is_trump
+
+        if wins:
+            # Win with the cheapest card that wins.
+            return 300 - strengths[card] - points * (not last)
+
+        # Discard the cheapest card, conserving trumps.
+        return -2 * points - 50 * is_trump - (card & 7)
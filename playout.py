@@ -0,0 +1,241 @@
+"""
+Fast playouts of deals for Monte Carlo methods.
+
+A playout plays all remaining cards of a position with a simple policy and returns the points
+both teams score. Positions are given as hand masks and card indices in the layout of `bitboard`,
+and the playout loop works on these integers only: no lists, sets or cards are created per move.
+
+Two policies are provided: `HeuristicPlayoutPolicy`, which plays like a sensible beginner, and
+`RandomPlayoutPolicy`, which plays a uniformly random legal card.
+"""
+
+from __future__ import annotations
+
+import random
+from abc import ABC, abstractmethod
+from typing import List, Sequence, Tuple
+
+from bitboard import (
+    HIGHER_PLAIN,
+    HIGHER_TRUMPS,
+    STRENGTHS,
+    SUIT_MASKS,
+    cards_to_mask,
+    index_card,
+    legal_mask,
+    position_from_trick,
+    suit_index,
+    winning_position,
+)
+from game import Policy
+from models import Card, RuleSet, Trick
+from scoring import LAST_TRICK_BONUS, PLAIN_POINTS_TABLE, TRUMP_POINTS_TABLE
+
+# The points of every card, indexed by the trump suit and the card index.
+POINTS: List[List[int]] = [
+    [(TRUMP_POINTS_TABLE if index >> 3 == trump_suit else PLAIN_POINTS_TABLE)[1 << (index & 7)] for index in range(32)]
+    for trump_suit in range(4)
+]
+
+# How much it costs to give away a card, indexed by the trump suit and the card index: trumps are
+# the most valuable, then points, then the strength of the card within its suit.
+DISCARD_COSTS: List[List[int]] = [
+    [
+        1000 * (index >> 3 == trump_suit) + 16 * POINTS[trump_suit][index] + STRENGTHS[trump_suit][index >> 3][index]
+        for index in range(32)
+    ]
+    for trump_suit in range(4)
+]
+
+# For every card index, the mask of the cards of the same suit that beat it if the suit is trump, and otherwise.
+_HIGHER_TRUMP_MASKS: List[int] = [HIGHER_TRUMPS[index & 7] << (index & ~7) for index in range(32)]
+_HIGHER_PLAIN_MASKS: List[int] = [HIGHER_PLAIN[index & 7] << (index & ~7) for index in range(32)]
+
+
+class PlayoutPolicy(ABC):
+    """Chooses the card to play in a playout."""
+
+    @abstractmethod
+    def choose(
+        self, moves: int, hands: List[int], seat: int, trick: List[int], length: int, winner: int, trump_suit: int
+    ) -> int:
+        """
+        Choose a card.
+
+        :param moves: The mask of legal cards of the player to play.
+        :param hands: The masks of the hands of the four players.
+        :param seat: The player to play.
+        :param trick: The card indices played to the current trick; only the first `length` are valid.
+        :param length: The number of cards played to the current trick.
+        :param winner: The position in the trick of the card that currently wins it, if any were played.
+        :param trump_suit: The suit index of the trump suit.
+        :return: The index of the card to play.
+        """
+
+
+class HeuristicPlayoutPolicy(PlayoutPolicy):
+    """
+    Plays by a few rules of thumb:
+
+     - when leading, lead a card that no other player can beat in its suit, or else the cheapest card;
+     - when the teammate is winning the trick, do not overtake it, and give it points as the last player;
+     - otherwise, win the trick with the lowest card that wins it, or else discard the cheapest card.
+    """
+
+    def choose(
+        self, moves: int, hands: List[int], seat: int, trick: List[int], length: int, winner: int, trump_suit: int
+    ) -> int:
+        costs = DISCARD_COSTS[trump_suit]
+
+        if length == 0:
+            outstanding = hands[0] | hands[1] | hands[2] | hands[3]
+            outstanding ^= hands[seat]
+            trumps = SUIT_MASKS[trump_suit]
+            best, best_key = -1, -1
+            cheapest, cheapest_cost = -1, 1 << 30
+            while moves:
+                lowest = moves & -moves
+                moves ^= lowest
+                card = lowest.bit_length() - 1
+                higher = _HIGHER_TRUMP_MASKS[card] if trumps >> card & 1 else _HIGHER_PLAIN_MASKS[card]
+                if not outstanding & higher and costs[card] > best_key:
+                    best, best_key = card, costs[card]
+                if costs[card] < cheapest_cost:
+                    cheapest, cheapest_cost = card, costs[card]
+            return best if best >= 0 else cheapest
+
+        strengths = STRENGTHS[trump_suit][trick[0] >> 3]
+        winning_strength = strengths[trick[winner]]
+        teammate_winning = length >= 2 and winner == length - 2
+
+        # The lowest winning card, the cheapest losing card and the losing card with the most points.
+        lowest_winner, lowest_strength = -1, 1 << 30
+        cheapest, cheapest_cost = -1, 1 << 30
+        richest, richest_points = -1, -1
+        points = POINTS[trump_suit]
+        while moves:
+            lowest = moves & -moves
+            moves ^= lowest
+            card = lowest.bit_length() - 1
+            if strengths[card] > winning_strength:
+                if strengths[card] < lowest_strength:
+                    lowest_winner, lowest_strength = card, strengths[card]
+            else:
+                if costs[card] < cheapest_cost:
+                    cheapest, cheapest_cost = card, costs[card]
+                if points[card] > richest_points and costs[card] < 1000:
+                    richest, richest_points = card, points[card]
+
+        if teammate_winning:
+            if length == 3 and richest >= 0:
+                return richest
+            return cheapest if cheapest >= 0 else lowest_winner
+
+        return lowest_winner if lowest_winner >= 0 else cheapest
+
+
+class RandomPlayoutPolicy(PlayoutPolicy):
+    """Plays a uniformly random legal card."""
+
+    def __init__(self, rng: random.Random):
+        """
+        :param rng: The random number generator to draw from.
+        """
+        self._randrange = rng.randrange
+
+    def choose(
+        self, moves: int, hands: List[int], seat: int, trick: List[int], length: int, winner: int, trump_suit: int
+    ) -> int:
+        for _ in range(self._randrange(bin(moves).count("1"))):
+            moves &= moves - 1
+
+        return (moves & -moves).bit_length() - 1
+
+
+def playout(
+    hands: Sequence[int],
+    leader: int,
+    trick: Sequence[int],
+    trump_suit: int,
+    rules: RuleSet,
+    policy: PlayoutPolicy,
+) -> Tuple[int, int]:
+    """
+    Play all remaining cards of a position.
+
+    :param hands: The masks of the hands of the four players. They are not modified.
+    :param leader: The player that led the current trick.
+    :param trick: The indices of the cards played to the current trick so far, in order.
+    :param trump_suit: The suit index of the trump suit.
+    :param rules: The rule set of the deal.
+    :param policy: The policy with which all players play.
+    :return: The points of team 0 and team 1 from the current trick onward, including the last-trick bonus.
+    """
+    amsterdam = rules == RuleSet.AMSTERDAM
+    choose = policy.choose
+    points = POINTS[trump_suit]
+    strengths_by_led_suit = STRENGTHS[trump_suit]
+
+    remaining = list(hands)
+    cards = [0, 0, 0, 0]
+    length = len(trick)
+    cards[:length] = trick
+    winner = 0
+    if length:
+        strengths = strengths_by_led_suit[cards[0] >> 3]
+        for position in range(1, length):
+            if strengths[cards[position]] > strengths[cards[winner]]:
+                winner = position
+
+    team_points = [0, 0]
+    while True:
+        seat = (leader + length) % 4
+        hand = remaining[seat]
+        if not hand:
+            break
+
+        if length:
+            moves = legal_mask(hand, cards[0] >> 3, trump_suit, cards[winner], winner == length - 2, amsterdam)
+        else:
+            moves = hand
+        card = choose(moves, remaining, seat, cards, length, winner, trump_suit)
+        remaining[seat] = hand ^ (1 << card)
+        cards[length] = card
+
+        if length and strengths_by_led_suit[cards[0] >> 3][card] > strengths_by_led_suit[cards[0] >> 3][cards[winner]]:
+            winner = length
+        length += 1
+
+        if length == 4:
+            leader = (leader + winner) % 4
+            team_points[leader % 2] += points[cards[0]] + points[cards[1]] + points[cards[2]] + points[cards[3]]
+            length, winner = 0, 0
+            if not remaining[leader]:
+                team_points[leader % 2] += LAST_TRICK_BONUS
+
+    return team_points[0], team_points[1]
+
+
+def heuristic_policy(rng: random.Random) -> Policy:
+    """
+    Create a policy for `game.play_deal` that plays like `HeuristicPlayoutPolicy`.
+
+    :param rng: Unused; accepted so that this is a `game.PolicyFactory`.
+    :return: The policy.
+    """
+    choose = HeuristicPlayoutPolicy().choose
+
+    def policy(trick: Trick) -> Card:
+        deal = trick.deal
+        assert deal.trump_suit is not None, "The trump suit of the deal must be known"
+
+        trump_suit = suit_index(deal.trump_suit)
+        hands, leader, cards = position_from_trick(trick)
+        length = len(cards)
+        winner = winning_position(cards, trump_suit) if cards else 0
+        cards.extend([0] * (4 - length))
+        moves = cards_to_mask(trick.legal_cards)
+
+        return index_card(choose(moves, hands, (leader + length) % 4, cards, length, winner, trump_suit))
+
+    return policy
@@ -0,0 +1,161 @@
+"""
+A compact, fixed-size binary encoding of a position, for sending positions between processes
+and for storing them on disk.
+
+A position is what the fast engines operate on: the hand masks of the four players, the cards
+played to the current trick, the leading player of that trick, the trump suit, the rule set, the
+number of the trick and the points both teams have scored so far. It is encoded in
+`POSITION_SIZE` (28) bytes, little-endian:
+
+    offset  size  field
+         0    16  the four hand masks, as unsigned 32-bit integers
+        16     4  the card indices of the current trick in the order played, 0xFF for no card
+        20     1  the leading player of the current trick
+        21     1  the suit index of the trump suit
+        22     1  the rule set, as its index in `models.RULE_SET_CODES`
+        23     1  the number of the current trick, counting from 0
+        24     4  the points of team 0 and team 1 so far, as unsigned 16-bit integers
+
+Decoding reads straight from the given buffer, so it needs no copy of e.g. a memory-mapped file.
+Many positions stored back to back can be viewed as a numpy array of `POSITION_DTYPE` without copying.
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import NamedTuple, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from bitboard import SUITS, index_card, position_from_trick, suit_index
+from models import RULE_SET_CODES, Deal, Player, RuleSet, Trick
+
+_STRUCT = struct.Struct("<4I4sBBBB2H")
+POSITION_SIZE = _STRUCT.size
+
+NO_CARD = 0xFF
+
+POSITION_DTYPE = np.dtype(
+    [
+        ("hands", "<u4", (4,)),
+        ("trick", "u1", (4,)),
+        ("leader", "u1"),
+        ("trump_suit", "u1"),
+        ("rules", "u1"),
+        ("trick_number", "u1"),
+        ("points", "<u2", (2,)),
+    ]
+)
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class Position(NamedTuple):
+    hands: Tuple[int, int, int, int]
+    # The card indices played to the current trick so far, in order.
+    trick: Tuple[int, ...]
+    leader: int
+    trump_suit: int
+    rules: RuleSet
+    trick_number: int
+    points: Tuple[int, int]
+
+
+def encode_position(position: Position) -> bytes:
+    """
+    Encode a position.
+
+    :param position: The position.
+    :return: The `POSITION_SIZE` bytes of the encoded position.
+    """
+    assert len(position.trick) <= 3, "A trick in progress holds at most three cards"
+
+    return _STRUCT.pack(
+        *position.hands,
+        bytes(position.trick) + bytes([NO_CARD] * (4 - len(position.trick))),
+        position.leader,
+        position.trump_suit,
+        RULE_SET_CODES.index(position.rules),
+        position.trick_number,
+        *position.points,
+    )
+
+
+def decode_position(buffer: Buffer, offset: int = 0) -> Position:
+    """
+    Decode a position. This is the inverse of `encode_position`.
+
+    :param buffer: The buffer holding the encoded position.
+    :param offset: The offset of the encoded position in the buffer.
+    :return: The position.
+    """
+    hand_0, hand_1, hand_2, hand_3, trick, leader, trump_suit, rules, trick_number, points_0, points_1 = (
+        _STRUCT.unpack_from(buffer, offset)
+    )
+
+    return Position(
+        hands=(hand_0, hand_1, hand_2, hand_3),
+        trick=tuple(card for card in trick if card != NO_CARD),
+        leader=leader,
+        trump_suit=trump_suit,
+        rules=RULE_SET_CODES[rules],
+        trick_number=trick_number,
+        points=(points_0, points_1),
+    )
+
+
+def decode_positions(buffer: Buffer) -> npt.NDArray[np.void]:
+    """
+    View positions that were encoded back to back as an array, without copying them.
+
+    :param buffer: The buffer holding the encoded positions.
+    :return: The array of `POSITION_DTYPE`, of which the fields are named like those of `Position`.
+    """
+    return np.frombuffer(buffer, dtype=POSITION_DTYPE)
+
+
+def from_trick(trick: Trick, trick_number: int = 0, points: Tuple[int, int] = (0, 0)) -> Position:
+    """
+    Get the position of a trick in progress.
+
+    :param trick: The trick. The trump suit of its deal must be known.
+    :param trick_number: The number of the trick in the deal, counting from 0.
+    :param points: The points both teams have scored in the deal so far.
+    :return: The position.
+    """
+    deal = trick.deal
+    assert deal.trump_suit is not None, "The trump suit of the deal must be known"
+
+    hands, leader, cards = position_from_trick(trick)
+    hand_0, hand_1, hand_2, hand_3 = hands
+
+    return Position(
+        hands=(hand_0, hand_1, hand_2, hand_3),
+        trick=tuple(cards),
+        leader=leader,
+        trump_suit=suit_index(deal.trump_suit),
+        rules=deal.rules,
+        trick_number=trick_number,
+        points=points,
+    )
+
+
+def to_trick(position: Position) -> Trick:
+    """
+    Create the deal and the trick in progress of a position, with new players. The bidder is not
+    part of a position; player 0 is made the bidder.
+
+    :param position: The position.
+    :return: The trick.
+    """
+    players = [Player(name=str(index)) for index in range(4)]
+    for player, hand in zip(players, position.hands):
+        player.hand = {index_card(index) for index in range(32) if hand >> index & 1}
+
+    deal = Deal(players=players, bidder_index=0, trump_suit=SUITS[position.trump_suit], rules=position.rules)
+    trick = Trick(deal=deal, leading_player_index=position.leader)
+    for offset, card in enumerate(position.trick):
+        trick.played_cards[(position.leader + offset) % 4] = index_card(card)
+
+    return trick
@@ -0,0 +1,209 @@
+"""
+Scoring of tricks and deals: card points, roem (meld), the last-trick bonus and the
+"nat" and "pit" outcomes.
+
+Trick points and roem are computed from tables indexed by the cards of a single suit, i.e. by
+one byte of a mask in the layout of `bitboard`. Scoring any trick (or hand) then takes at most
+four lookups per quantity.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+from bitboard import RANKS, cards_to_mask, suit_index
+from models import Card, Deal, Rank, Suit, Trick
+
+PLAIN_POINTS: Dict[Rank, int] = {
+    Rank.SEVEN: 0,
+    Rank.EIGHT: 0,
+    Rank.NINE: 0,
+    Rank.TEN: 10,
+    Rank.JACK: 2,
+    Rank.QUEEN: 3,
+    Rank.KING: 4,
+    Rank.ACE: 11,
+}
+TRUMP_POINTS: Dict[Rank, int] = {
+    Rank.SEVEN: 0,
+    Rank.EIGHT: 0,
+    Rank.NINE: 14,
+    Rank.TEN: 10,
+    Rank.JACK: 20,
+    Rank.QUEEN: 3,
+    Rank.KING: 4,
+    Rank.ACE: 11,
+}
+
+LAST_TRICK_BONUS = 10
+PIT_BONUS = 100
+# The card points of a full deck plus the last-trick bonus.
+TOTAL_POINTS = 162
+
+THREE_CARD_SEQUENCE_ROEM = 20
+FOUR_CARD_SEQUENCE_ROEM = 50
+FOUR_OF_A_KIND_ROEM = 100
+FOUR_JACKS_ROEM = 200
+STUK_ROEM = 20
+
+# The bits of ranks in the byte of a suit.
+JACK_BIT = 1 << RANKS.index(Rank.JACK)
+STUK_BITS = (1 << RANKS.index(Rank.KING)) | (1 << RANKS.index(Rank.QUEEN))
+# The ranks that score `FOUR_OF_A_KIND_ROEM` when held in all four suits; four sevens, eights or nines score nothing.
+FOUR_OF_A_KIND_BITS = sum(1 << RANKS.index(rank) for rank in [Rank.TEN, Rank.QUEEN, Rank.KING, Rank.ACE])
+
+
+def sequence_lengths(suit_cards: int) -> List[int]:
+    """
+    Get the lengths of the sequences that score roem in the cards of a single suit.
+
+    :param suit_cards: The cards of the suit, as the byte of that suit.
+    :return: The lengths of all runs of three or more consecutive ranks, from low to high ranks.
+    """
+    lengths, run = [], 0
+    for rank_bit in range(9):
+        if rank_bit < 8 and suit_cards >> rank_bit & 1:
+            run += 1
+            continue
+        if run >= 3:
+            lengths.append(run)
+        run = 0
+
+    return lengths
+
+
+def _sequence_roem(suit_cards: int) -> int:
+    """Get the roem of all sequences in the cards of a single suit, given as the byte of that suit."""
+    return sum(
+        THREE_CARD_SEQUENCE_ROEM if length == 3 else FOUR_CARD_SEQUENCE_ROEM for length in sequence_lengths(suit_cards)
+    )
+
+
+# Tables indexed by the byte of a single suit.
+PLAIN_POINTS_TABLE: List[int] = [
+    sum(PLAIN_POINTS[rank] for bit, rank in enumerate(RANKS) if byte >> bit & 1) for byte in range(256)
+]
+TRUMP_POINTS_TABLE: List[int] = [
+    sum(TRUMP_POINTS[rank] for bit, rank in enumerate(RANKS) if byte >> bit & 1) for byte in range(256)
+]
+SEQUENCE_ROEM_TABLE: List[int] = [_sequence_roem(byte) for byte in range(256)]
+# Indexed by the byte of ranks of which all four suits are present.
+FOUR_OF_A_KIND_ROEM_TABLE: List[int] = [
+    FOUR_JACKS_ROEM * bool(byte & JACK_BIT) + FOUR_OF_A_KIND_ROEM * bin(byte & FOUR_OF_A_KIND_BITS).count("1")
+    for byte in range(256)
+]
+
+
+def card_points(card: Card, trump_suit: Suit) -> int:
+    """
+    Get the points a card is worth.
+
+    :param card: The card.
+    :param trump_suit: The trump suit.
+    :return: The points of the card.
+    """
+    return (TRUMP_POINTS if card.suit == trump_suit else PLAIN_POINTS)[card.rank]
+
+
+def mask_points(mask: int, trump_index: int) -> int:
+    """
+    Get the total points of a collection of cards.
+
+    :param mask: The cards, as a mask.
+    :param trump_index: The suit index of the trump suit.
+    :return: The sum of the points of the cards.
+    """
+    points = 0
+    for index in range(4):
+        table = TRUMP_POINTS_TABLE if index == trump_index else PLAIN_POINTS_TABLE
+        points += table[mask >> (8 * index) & 0xFF]
+
+    return points
+
+
+def mask_roem(mask: int, trump_index: int) -> int:
+    """
+    Get the roem in a collection of cards: sequences of three or more cards of the same suit,
+    four cards of the same rank, and the king and queen of trumps ("stuk").
+
+    :param mask: The cards, as a mask; typically the four cards of a trick.
+    :param trump_index: The suit index of the trump suit.
+    :return: The total roem.
+    """
+    clubs, hearts, diamonds, spades = mask & 0xFF, mask >> 8 & 0xFF, mask >> 16 & 0xFF, mask >> 24 & 0xFF
+    roem = SEQUENCE_ROEM_TABLE[clubs] + SEQUENCE_ROEM_TABLE[hearts]
+    roem += SEQUENCE_ROEM_TABLE[diamonds] + SEQUENCE_ROEM_TABLE[spades]
+    roem += FOUR_OF_A_KIND_ROEM_TABLE[clubs & hearts & diamonds & spades]
+    if mask >> (8 * trump_index) & STUK_BITS == STUK_BITS:
+        roem += STUK_ROEM
+
+    return roem
+
+
+def trick_score(trick: Trick) -> Tuple[int, int]:
+    """
+    Get the points and the roem of a complete trick. The last-trick bonus is not included.
+
+    :param trick: The trick. The trump suit of its deal must be known.
+    :return: The card points and the roem of the trick.
+    """
+    assert trick.deal.trump_suit is not None, "The trump suit of the deal must be known"
+    mask = cards_to_mask(card for card in trick.played_cards if card is not None)
+    trump_index = suit_index(trick.deal.trump_suit)
+
+    return mask_points(mask, trump_index), mask_roem(mask, trump_index)
+
+
+class DealScore(NamedTuple):
+    """
+    The outcome of a deal. Teams are identified by the seats of their players modulo 2,
+    so team 0 consists of the players at index 0 and 2.
+    """
+
+    points: Tuple[int, int]
+    roem: Tuple[int, int]
+    nat: bool
+    pit: bool
+
+    def total(self, team: int) -> int:
+        """Get the score of a team, i.e. its points plus its roem."""
+        return self.points[team] + self.roem[team]
+
+
+def score_deal(deal: Deal, tricks: Sequence[Trick]) -> DealScore:
+    """
+    Score a completely played deal.
+
+    A team that wins all tricks is "pit" and receives a bonus as roem. The bidding team must
+    score more than half of all points and roem combined; otherwise it is "nat", and the other
+    team receives all points and all roem.
+
+    :param deal: The deal.
+    :param tricks: The eight tricks of the deal, in the order in which they were played.
+    :return: The score of the deal.
+    """
+    points, roem, tricks_won = [0, 0], [0, 0], [0, 0]
+    for trick in tricks:
+        winning_index = trick.winning_card_index
+        assert winning_index is not None, "Every trick must be complete"
+        trick_points, trick_roem = trick_score(trick)
+        points[winning_index % 2] += trick_points
+        roem[winning_index % 2] += trick_roem
+        tricks_won[winning_index % 2] += 1
+
+    last_winning_index = tricks[-1].winning_card_index
+    assert last_winning_index is not None
+    points[last_winning_index % 2] += LAST_TRICK_BONUS
+
+    pit = 0 in tricks_won
+    if pit:
+        roem[tricks_won.index(len(tricks))] += PIT_BONUS
+
+    bidder_team = deal.bidder_index % 2
+    other_team = 1 - bidder_team
+    nat = 2 * (points[bidder_team] + roem[bidder_team]) <= sum(points) + sum(roem)
+    if nat:
+        points[other_team], points[bidder_team] = sum(points), 0
+        roem[other_team], roem[bidder_team] = sum(roem), 0
+
+    return DealScore(points=(points[0], points[1]), roem=(roem[0], roem[1]), nat=nat, pit=pit)
@@ -0,0 +1,233 @@
+"""
+Generation of self-play training data.
+
+Every played card yields one sample consisting of the features of the position (see `features`),
+the legal cards, the chosen card and the final score of the deal (see `scoring`) for the team
+of the player that chose the card. Samples are written to shards of bounded size on disk, as `.npz` files
+holding the arrays `features`, `legal`, `card` and `outcome`.
+
+Deals are played in a process pool. At most a fixed number of tasks is in flight and the
+writer queue is bounded, so memory use stays flat regardless of the number of deals.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import queue
+import random
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, List, Optional, Set
+
+import numpy as np
+import numpy.typing as npt
+
+from bitboard import card_index, cards_to_mask
+from features import FEATURE_SIZE, encode_trick
+from game import PolicyFactory, new_deal, play_deal, random_policy
+from models import Card, RuleSet, Suit, Trick
+from scoring import score_deal
+
+Samples = Dict[str, npt.NDArray[np.generic]]
+
+SAMPLE_BYTES = FEATURE_SIZE * 4 + 32 + 1 + 4
+
+
+def play_samples(
+    seed: int, policy_factory: PolicyFactory = random_policy, rules: RuleSet = RuleSet.ROTTERDAM
+) -> Samples:
+    """
+    Play a single deal and record a sample for each of its cards.
+
+    :param seed: The seed that determines the cards, the bidder, the trump suit and the policy's randomness.
+    :param policy_factory: Creates the policy with which all players play.
+    :param rules: The rule set of the deal.
+    :return: The samples of the deal, as arrays of equal length.
+    """
+    rng = random.Random(seed)
+    deal = new_deal(seed=seed, bidder_index=rng.randint(0, 3), trump_suit=rng.choice(list(Suit)), rules=rules)
+    policy = policy_factory(rng)
+
+    features: List[npt.NDArray[np.float32]] = []
+    legal: List[int] = []
+    cards: List[int] = []
+    players: List[int] = []
+    played: List[Set[Card]] = [set(), set(), set(), set()]
+    current: List[Optional[Trick]] = [None]
+
+    def observe(trick: Trick, card: Card) -> None:
+        # Cards of a trick only count as played in earlier tricks once the next trick has started.
+        previous = current[0]
+        if previous is not None and previous is not trick:
+            for seat, previous_card in enumerate(previous.played_cards):
+                if previous_card is not None:
+                    played[seat].add(previous_card)
+        current[0] = trick
+
+        features.append(encode_trick(trick, played))
+        legal.append(cards_to_mask(trick.legal_cards))
+        cards.append(card_index(card))
+        players.append(trick.player_index_to_play)
+
+    score = score_deal(deal, play_deal(deal, policy, observer=observe))
+
+    return {
+        "features": np.array(features, dtype=np.float32).reshape(-1, FEATURE_SIZE),
+        "legal": ((np.array(legal, dtype=np.int64)[:, None] >> np.arange(32)) & 1).astype(np.bool_),
+        "card": np.array(cards, dtype=np.int8),
+        "outcome": np.array([score.total(player % 2) for player in players], dtype=np.float32),
+    }
+
+
+def _play_task(seeds: List[int], policy_factory: PolicyFactory, rules: RuleSet) -> Samples:
+    """Play a number of deals in a worker process and concatenate their samples."""
+    results = [play_samples(seed, policy_factory, rules) for seed in seeds]
+
+    return {key: np.concatenate([result[key] for result in results]) for key in results[0]}
+
+
+class ShardWriter(object):
+    """
+    Buffers samples and writes them to numbered shard files of at most `max_shard_bytes` each.
+    """
+
+    directory: str
+    samples_per_shard: int
+    paths: List[str]
+
+    def __init__(self, directory: str, max_shard_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize a writer.
+
+        :param directory: The directory to write the shards to. It is created if it does not exist.
+        :param max_shard_bytes: The maximum size of the sample data in a single shard.
+        """
+        assert max_shard_bytes >= SAMPLE_BYTES, "A shard must be able to hold at least one sample"
+
+        self.directory = directory
+        self.samples_per_shard = max_shard_bytes // SAMPLE_BYTES
+        self.paths = []
+        self._buffer: List[Samples] = []
+        self._buffered = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+    def add(self, samples: Samples) -> None:
+        """
+        Add samples, writing out any shards that are complete.
+
+        :param samples: The samples, as arrays of equal length.
+        """
+        self._buffer.append(samples)
+        self._buffered += len(samples["card"])
+
+        while self._buffered >= self.samples_per_shard:
+            self._write(self.samples_per_shard)
+
+    def close(self) -> None:
+        """Write the remaining buffered samples to a final, smaller shard."""
+        if self._buffered:
+            self._write(self._buffered)
+
+    def _write(self, size: int) -> None:
+        """Write the first `size` buffered samples to a new shard."""
+        merged = {key: np.concatenate([samples[key] for samples in self._buffer]) for key in self._buffer[0]}
+        rest = {key: value[size:] for key, value in merged.items()}
+        self._buffer = [rest] if len(rest["card"]) else []
+        self._buffered -= size
+
+        path = os.path.join(self.directory, f"shard-{len(self.paths):05d}.npz")
+        # Write to a temporary file first, so that no partial shard is ever observed under its final name.
+        with open(path + ".tmp", "wb") as file:
+            np.savez(file, **{key: value[:size] for key, value in merged.items()})
+        os.replace(path + ".tmp", path)
+        self.paths.append(path)
+
+
+def generate(
+    directory: str,
+    deals: int,
+    seed: int = 0,
+    policy_factory: PolicyFactory = random_policy,
+    rules: RuleSet = RuleSet.ROTTERDAM,
+    workers: Optional[int] = None,
+    deals_per_task: int = 64,
+    max_shard_bytes: int = 64 * 1024 * 1024,
+    max_pending: Optional[int] = None,
+) -> List[str]:
+    """
+    Generate self-play data for a number of deals and write it to shards.
+    The deal with number `i` is played with seed `seed + i`, so the output does not
+    depend on the number of workers. If a worker fails, the samples of the tasks before it
+    are still written to shards; if writing fails, no more tasks are started. The error is
+    raised in both cases.
+
+    :param directory: The directory to write the shards to.
+    :param deals: The number of deals to play.
+    :param seed: The seed of the first deal.
+    :param policy_factory: Creates the policy with which all players play. It must be picklable,
+        i.e. a module-level function, as it is sent to the worker processes.
+    :param rules: The rule set of all deals.
+    :param workers: The number of worker processes. Defaults to the number of CPUs.
+    :param deals_per_task: The number of deals a worker plays before returning its samples.
+    :param max_shard_bytes: The maximum size of the sample data in a single shard.
+    :param max_pending: The maximum number of tasks in flight, and the size of the writer queue.
+        Defaults to twice the number of workers.
+    :return: The paths of the written shards, in order.
+    """
+    writer = ShardWriter(directory, max_shard_bytes)
+    workers = workers if workers is not None else os.cpu_count() or 1
+    max_pending = max_pending if max_pending is not None else 2 * workers
+    pending: "queue.Queue[Optional[Samples]]" = queue.Queue(maxsize=max_pending)
+    errors: List[BaseException] = []
+
+    def write() -> None:
+        while True:
+            samples = pending.get()
+            if samples is None:
+                return
+            # After a failure, samples are only drained so that the main thread never blocks on the queue.
+            if errors:
+                continue
+            try:
+                writer.add(samples)
+            except BaseException as error:
+                errors.append(error)
+
+    thread = threading.Thread(target=write, daemon=True)
+    thread.start()
+
+    # The seeds of every task are produced lazily, so that memory use does not grow with the number of deals.
+    tasks = (
+        list(range(seed + start, seed + min(start + deals_per_task, deals)))
+        for start in range(0, deals, deals_per_task)
+    )
+    # Results are handed to the writer in task order, so that shards are deterministic.
+    in_flight: Deque[Future[Samples]] = deque()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            try:
+                # Stop submitting tasks as soon as the writer fails.
+                while not errors:
+                    for task in itertools.islice(tasks, max_pending - len(in_flight)):
+                        in_flight.append(pool.submit(_play_task, task, policy_factory, rules))
+                    if not in_flight:
+                        break
+                    pending.put(in_flight.popleft().result())
+            finally:
+                # Tasks that have not started are not needed when stopping early.
+                for future in in_flight:
+                    future.cancel()
+    finally:
+        # Also when a worker fails, the samples received so far are written.
+        pending.put(None)
+        thread.join()
+        if not errors:
+            writer.close()
+
+    if errors:
+        raise errors[0]
+
+    return writer.paths
@@ -0,0 +1,333 @@
+"""
+An exact ("double dummy") solver: given all hands, it determines how many points a team
+scores from the current position onward if all players play perfectly.
+
+Points are card points plus the last-trick bonus; roem is not taken into account. The solver
+runs an alpha-beta search on the bitmask representation of `bitboard`, with a transposition
+table at the start of every trick, move ordering from `ordering` and early termination on the
+quick-trick bounds of `bounds`.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import instrumentation
+from bitboard import STRENGTHS, legal_mask, position_from_trick, suit_index, winning_position
+from bounds import score_bounds
+from models import RuleSet, Trick
+from ordering import MoveOrderer
+from scoring import LAST_TRICK_BONUS, mask_points
+
+# A score higher than any team can achieve, used as the initial search window.
+INFINITY = 1000
+
+
+class SearchStatistics(object):
+    """Counters of a solver, accumulated over all its searches."""
+
+    nodes: int
+    cutoffs: int
+    first_move_cutoffs: int
+    transposition_probes: int
+    transposition_hits: int
+    bound_probes: int
+    bound_cutoffs: int
+
+    def __init__(self) -> None:
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.transposition_probes = 0
+        self.transposition_hits = 0
+        self.bound_probes = 0
+        self.bound_cutoffs = 0
+
+    @property
+    def first_move_cutoff_rate(self) -> float:
+        """The fraction of cutoffs that were caused by the first move tried; higher means better ordering."""
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def bound_cutoff_rate(self) -> float:
+        """The fraction of positions at the start of a trick that were decided by their bounds alone."""
+        return self.bound_cutoffs / self.bound_probes if self.bound_probes else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"SearchStatistics(nodes={self.nodes}, cutoffs={self.cutoffs}, "
+            f"first_move_cutoff_rate={self.first_move_cutoff_rate:.2f}, "
+            f"transposition_hits={self.transposition_hits}/{self.transposition_probes}, "
+            f"bound_cutoffs={self.bound_cutoffs}/{self.bound_probes})"
+        )
+
+
+class Solver(object):
+    """
+    Solves positions of a single deal, i.e. with a fixed trump suit and rule set.
+    The transposition table and the move ordering tables are kept between calls to `solve`,
+    so positions of the same deal are solved faster after the first.
+    """
+
+    trump_suit: int
+    amsterdam: bool
+    use_bounds: bool
+    orderer: Optional[MoveOrderer]
+    statistics: SearchStatistics
+    # Bounds on the score of team 0, keyed by the four hands and the leading player of a trick.
+    transpositions: Dict[Tuple[int, int, int, int, int], Tuple[int, int]]
+
+    def __init__(self, trump_suit: int, rules: RuleSet = RuleSet.ROTTERDAM, ordering: bool = True, bounds: bool = True):
+        """
+        Initialize a solver.
+
+        :param trump_suit: The suit index of the trump suit.
+        :param rules: The rule set of the deal.
+        :param ordering: Whether to order moves; see `ordering.MoveOrderer`. Without ordering,
+            moves are tried in the order of their card index.
+        :param bounds: Whether to stop searching positions that are decided by their bounds; see `bounds`.
+        """
+        self.trump_suit = trump_suit
+        self.amsterdam = rules == RuleSet.AMSTERDAM
+        self.use_bounds = bounds
+        self.orderer = MoveOrderer(trump_suit) if ordering else None
+        self.statistics = SearchStatistics()
+        self.transpositions = {}
+
+    def solve(
+        self,
+        hands: Sequence[int],
+        leading_player_index: int,
+        trick: Sequence[int] = (),
+        team: int = 0,
+        alpha: int = -INFINITY,
+        beta: int = INFINITY,
+    ) -> int:
+        """
+        Determine the points a team scores from the current position onward, including the
+        points of the current trick, if all players play perfectly.
+
+        :param hands: The masks of the hands of the four players.
+        :param leading_player_index: The player that led the current trick.
+        :param trick: The indices of the cards played to the current trick so far, in order.
+        :param team: The team (0 for players 0 and 2, 1 for players 1 and 3) whose points to determine.
+        :param alpha: A lower bound of interest: if the score is at most alpha, a value of at most alpha is returned.
+        :param beta: An upper bound of interest: if the score is at least beta, a value of at least beta is returned.
+        :return: The points of the team.
+        """
+        hits, probes = self.statistics.transposition_hits, self.statistics.transposition_probes
+        bound_cutoffs = self.statistics.bound_cutoffs
+        remaining = sum(hands) | _trick_mask(trick)
+        total = mask_points(remaining, self.trump_suit) + LAST_TRICK_BONUS if remaining else 0
+
+        # A complete trick is scored before searching on from the next trick.
+        search = self._complete_trick if len(trick) == 4 else self._search
+        if team == 0:
+            score = search(list(hands), leading_player_index, list(trick), alpha, beta)
+        else:
+            score = total - search(list(hands), leading_player_index, list(trick), total - beta, total - alpha)
+
+        instrumentation.count("solver_transposition_hits", self.statistics.transposition_hits - hits)
+        instrumentation.count(
+            "solver_transposition_misses",
+            self.statistics.transposition_probes - probes - (self.statistics.transposition_hits - hits),
+        )
+        instrumentation.count("solver_bound_cutoffs", self.statistics.bound_cutoffs - bound_cutoffs)
+
+        return score
+
+    def reaches(
+        self, hands: Sequence[int], leading_player_index: int, trick: Sequence[int], team: int, target: int
+    ) -> bool:
+        """
+        Determine whether a team scores at least a number of points from the current position
+        onward. This is faster than `solve`, since the search stops as soon as the answer is known;
+        e.g. whether the bidding team can still avoid going "nat".
+
+        :param hands: The masks of the hands of the four players.
+        :param leading_player_index: The player that led the current trick.
+        :param trick: The indices of the cards played to the current trick so far, in order.
+        :param team: The team (0 for players 0 and 2, 1 for players 1 and 3).
+        :param target: The number of points.
+        :return: Whether the team scores at least the target with perfect play.
+        """
+        return self.solve(hands, leading_player_index, trick, team, target - 1, target) >= target
+
+    def legal_moves(self, hands: Sequence[int], leading_player_index: int, trick: Sequence[int] = ()) -> int:
+        """
+        Determine the legal cards of the player to play.
+
+        :param hands: The masks of the hands of the four players.
+        :param leading_player_index: The player that led the current trick.
+        :param trick: The indices of the cards played to the current trick so far, in order.
+        :return: The mask of legal cards.
+        """
+        seat = (leading_player_index + len(trick)) % 4
+        if not trick:
+            return hands[seat]
+
+        winner = winning_position(list(trick), self.trump_suit)
+        teammate_winning = (leading_player_index + winner) % 4 == (seat + 2) % 4
+
+        return legal_mask(hands[seat], trick[0] >> 3, self.trump_suit, trick[winner], teammate_winning, self.amsterdam)
+
+    def best_move(self, hands: Sequence[int], leading_player_index: int, trick: Sequence[int] = ()) -> Tuple[int, int]:
+        """
+        Find a best card for the player to play.
+
+        :param hands: The masks of the hands of the four players.
+        :param leading_player_index: The player that led the current trick.
+        :param trick: The indices of the cards played to the current trick so far, in order.
+        :return: The index of a best card, and the points the team of the player scores with it
+            from the current position onward, including the points of the current trick.
+        """
+        seat = (leading_player_index + len(trick)) % 4
+        moves = self.legal_moves(hands, leading_player_index, trick)
+        assert moves, "The player to play has no cards"
+
+        best_card, best = -1, -INFINITY
+        for card in [index for index in range(32) if moves >> index & 1]:
+            child = list(hands)
+            child[seat] ^= 1 << card
+            # Only a card that beats the best card so far needs an exact score.
+            value = self.solve(child, leading_player_index, list(trick) + [card], seat % 2, best, INFINITY)
+            if value > best:
+                best_card, best = card, value
+
+        return best_card, best
+
+    def _search(self, hands: List[int], leader: int, trick: List[int], alpha: int, beta: int) -> int:
+        """
+        Search the position for the score of team 0 from the current trick onward.
+        Team 0 maximizes this score and team 1 minimizes it.
+        """
+        statistics = self.statistics
+        statistics.nodes += 1
+        length = len(trick)
+
+        key: Optional[Tuple[int, int, int, int, int]] = None
+        if length == 0:
+            if not (hands[0] | hands[1] | hands[2] | hands[3]):
+                return 0
+
+            key = (hands[0], hands[1], hands[2], hands[3], leader)
+            statistics.transposition_probes += 1
+            bounds = self.transpositions.get(key)
+            if bounds is not None:
+                lower, upper = bounds
+                if lower >= beta or upper <= alpha or lower == upper:
+                    statistics.transposition_hits += 1
+                    return lower if lower >= beta or lower == upper else upper
+                alpha, beta = max(alpha, lower), min(beta, upper)
+
+            if self.use_bounds:
+                statistics.bound_probes += 1
+                lower, upper = score_bounds(hands, self.trump_suit)
+                if lower >= beta or upper <= alpha or lower == upper:
+                    statistics.bound_cutoffs += 1
+                    return lower if lower >= beta or lower == upper else upper
+
+        seat = (leader + length) % 4
+        hand = hands[seat]
+        tricks_left = bin(hands[leader]).count("1") + (length > 0)
+
+        if length:
+            strengths = STRENGTHS[self.trump_suit][trick[0] >> 3]
+            winner = 0
+            for position in range(1, length):
+                if strengths[trick[position]] > strengths[trick[winner]]:
+                    winner = position
+            teammate_winning = (leader + winner) % 4 == (seat + 2) % 4
+            moves = legal_mask(hand, trick[0] >> 3, self.trump_suit, trick[winner], teammate_winning, self.amsterdam)
+        else:
+            teammate_winning = False
+            moves = hand
+
+        if self.orderer is not None:
+            outstanding = (hands[0] | hands[1] | hands[2] | hands[3]) ^ hand
+            cards = self.orderer.order(moves, trick, teammate_winning, outstanding, tricks_left)
+        else:
+            cards = [index for index in range(32) if moves >> index & 1]
+
+        maximizing = seat % 2 == 0
+        original_alpha, original_beta = alpha, beta
+        best = -INFINITY if maximizing else INFINITY
+        for number, card in enumerate(cards):
+            hands[seat] = hand ^ (1 << card)
+            trick.append(card)
+
+            if length == 3:
+                value = self._complete_trick(hands, leader, trick, alpha, beta)
+            else:
+                value = self._search(hands, leader, trick, alpha, beta)
+
+            trick.pop()
+            hands[seat] = hand
+
+            if maximizing:
+                best = max(best, value)
+                alpha = max(alpha, value)
+            else:
+                best = min(best, value)
+                beta = min(beta, value)
+
+            if alpha >= beta:
+                statistics.cutoffs += 1
+                statistics.first_move_cutoffs += number == 0
+                if self.orderer is not None:
+                    self.orderer.record_cutoff(card, length, tricks_left)
+                break
+
+        if key is not None:
+            lower, upper = self.transpositions.get(key, (-INFINITY, INFINITY))
+            if best <= original_alpha:
+                upper = min(upper, best)
+            elif best >= original_beta:
+                lower = max(lower, best)
+            else:
+                lower = upper = best
+            self.transpositions[key] = (lower, upper)
+
+        return best
+
+    def _complete_trick(self, hands: List[int], leader: int, trick: List[int], alpha: int, beta: int) -> int:
+        """Score a trick to which all four cards were played, and search on from the next trick."""
+        strengths = STRENGTHS[self.trump_suit][trick[0] >> 3]
+        winner = 0
+        for position in range(1, 4):
+            if strengths[trick[position]] > strengths[trick[winner]]:
+                winner = position
+        winner = (leader + winner) % 4
+
+        points = mask_points((1 << trick[0]) | (1 << trick[1]) | (1 << trick[2]) | (1 << trick[3]), self.trump_suit)
+        if not (hands[0] | hands[1] | hands[2] | hands[3]):
+            points += LAST_TRICK_BONUS
+
+        # The points of this trick count for team 0 only if it won the trick.
+        gained = points if winner % 2 == 0 else 0
+
+        return gained + self._search(hands, winner, [], alpha - gained, beta - gained)
+
+
+def _trick_mask(trick: Sequence[int]) -> int:
+    """Get the mask of the cards played to a trick, given as indices."""
+    mask = 0
+    for card in trick:
+        mask |= 1 << card
+
+    return mask
+
+
+def solve_trick(trick: Trick, team: int, ordering: bool = True) -> int:
+    """
+    Determine the points a team scores from a trick in progress onward with perfect play.
+
+    :param trick: The trick. The trump suit of its deal must be known.
+    :param team: The team (0 for players 0 and 2, 1 for players 1 and 3) whose points to determine.
+    :param ordering: Whether to order moves.
+    :return: The points of the team, including those of the trick in progress.
+    """
+    assert trick.deal.trump_suit is not None, "The trump suit of the deal must be known"
+    hands, leader, cards = position_from_trick(trick)
+
+    return Solver(suit_index(trick.deal.trump_suit), trick.deal.rules, ordering).solve(hands, leader, cards, team)
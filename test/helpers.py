@@ -0,0 +1,9 @@
+"""Helpers shared by the test modules."""
+
+from bitboard import card_index
+from models import Card, Rank, Suit
+
+
+def index(suit: Suit, rank: Rank) -> int:
+    """Get the bitboard index of a card."""
+    return card_index(Card(suit=suit, rank=rank))
@@ -0,0 +1,130 @@
+import random
+import unittest
+from typing import List
+
+from analysis import (
+    MoveAnalysis,
+    RecordedDeal,
+    analyze,
+    analyze_deals,
+    decode_recorded_deal,
+    encode_recorded_deal,
+    record_deal,
+    replay,
+)
+from bitboard import card_index, cards_to_mask, legal_mask, suit_index, winning_position
+from game import new_deal, play_deal, random_policy
+from models import Card, Rank, RuleSet, Suit
+from scoring import LAST_TRICK_BONUS, mask_points
+from solver import Solver
+
+
+def short_deal(seed: int, cards_per_hand: int = 3, rules: RuleSet = RuleSet.ROTTERDAM) -> RecordedDeal:
+    """Play a random deal in which every player holds only a few cards."""
+    deal = new_deal(seed=seed, bidder_index=seed % 4, trump_suit=list(Suit)[seed % 4], rules=rules)
+    for player in deal.players:
+        player.hand = set(sorted(player.hand, key=card_index)[:cards_per_hand])
+
+    return record_deal(play_deal(deal, random_policy(random.Random(seed))))
+
+
+def child_values(recorded: RecordedDeal) -> List[List[int]]:
+    """For every played card, the points of the player's team after each of the legal cards, by solving afresh."""
+    trump_suit = suit_index(recorded.trump_suit)
+    hands = [cards_to_mask(hand) for hand in recorded.hands]
+    leader = recorded.bidder_index
+    trick: List[int] = []
+    result = []
+    for card in recorded.plays:
+        seat = (leader + len(trick)) % 4
+        winner = winning_position(trick, trump_suit) if trick else -1
+        moves = legal_mask(
+            hands[seat],
+            trick[0] >> 3 if trick else -1,
+            trump_suit,
+            trick[winner] if trick else -1,
+            bool(trick) and (leader + winner) % 4 == (seat + 2) % 4,
+            recorded.rules == RuleSet.AMSTERDAM,
+        )
+        values = []
+        for move in [index for index in range(32) if moves >> index & 1]:
+            child = list(hands)
+            child[seat] ^= 1 << move
+            if len(trick) < 3:
+                values.append(Solver(trump_suit, recorded.rules).solve(child, leader, trick + [move], seat % 2))
+                continue
+            # The move completes the trick: score it, and solve from the next trick onward.
+            full = trick + [move]
+            trick_winner = (leader + winning_position(full, trump_suit)) % 4
+            points = mask_points(sum(1 << played for played in full), trump_suit)
+            points += LAST_TRICK_BONUS if not any(child) else 0
+            rest = Solver(trump_suit, recorded.rules).solve(child, trick_winner, [], seat % 2)
+            values.append(rest + (points if trick_winner % 2 == seat % 2 else 0))
+        result.append(values)
+
+        hands[seat] ^= 1 << card_index(card)
+        trick.append(card_index(card))
+        if len(trick) == 4:
+            leader, trick = (leader + winning_position(trick, trump_suit)) % 4, []
+
+    return result
+
+
+class AnalysisTestCase(unittest.TestCase):
+    def test_record_and_replay(self) -> None:
+        recorded = short_deal(seed=1)
+        self.assertEqual(12, len(recorded.plays))
+        self.assertEqual([3, 3, 3, 3], [len(hand) for hand in recorded.hands])
+
+        tricks = replay(recorded)
+        self.assertEqual(3, len(tricks))
+        self.assertEqual(recorded.bidder_index, tricks[0].leading_player_index)
+
+    def test_compact_encoding(self) -> None:
+        recorded = short_deal(seed=4)
+        encoded = encode_recorded_deal(recorded)
+
+        self.assertEqual(28 + 12, len(encoded))
+        self.assertEqual(
+            recorded._replace(hands=[sorted(hand, key=card_index) for hand in recorded.hands]),
+            decode_recorded_deal(encoded),
+        )
+
+    def test_illegal_plays_are_rejected(self) -> None:
+        recorded = short_deal(seed=2)
+        plays = list(recorded.plays)
+        plays[0], plays[1] = plays[1], plays[0]
+
+        with self.assertRaises(AssertionError):
+            analyze(recorded._replace(plays=plays))
+        with self.assertRaises(AssertionError):
+            replay(recorded._replace(plays=recorded.plays[:-1]))
+
+    def test_losses_agree_with_solving_every_move(self) -> None:
+        for seed in range(8):
+            recorded = short_deal(seed, rules=list(RuleSet)[seed % 2])
+            analyses = analyze(recorded)
+            self.assertEqual(len(recorded.plays), len(analyses))
+
+            for analysis, values, card in zip(analyses, child_values(recorded), recorded.plays):
+                self.assertEqual(card, analysis.card)
+                self.assertEqual(max(values), analysis.best)
+                self.assertIn(analysis.actual, values)
+                self.assertGreaterEqual(analysis.loss, 0)
+
+    def test_the_last_card_loses_nothing(self) -> None:
+        analyses = analyze(short_deal(seed=3))
+        self.assertEqual(0, analyses[-1].loss)
+
+    def test_loss(self) -> None:
+        analysis = MoveAnalysis(player_index=1, card=Card(suit=Suit.HEARTS, rank=Rank.ACE), best=50, actual=39)
+        self.assertEqual(11, analysis.loss)
+
+    def test_deals_are_analyzed_in_parallel(self) -> None:
+        recorded_deals = [short_deal(seed) for seed in range(4)]
+
+        self.assertEqual([analyze(recorded) for recorded in recorded_deals], analyze_deals(recorded_deals, workers=2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from benchmark import BENCHMARKS, main, regressions, run
+
+
+class BenchmarkTestCase(unittest.TestCase):
+    def test_every_benchmark_can_be_run(self) -> None:
+        results = run(min_time=0.001)
+
+        self.assertEqual(set(BENCHMARKS), set(results))
+        for result in results.values():
+            self.assertGreater(result["ops_per_sec"], 0)
+            self.assertGreaterEqual(result["peak_bytes"], 0)
+
+    def test_only_slowdowns_beyond_the_threshold_are_regressions(self) -> None:
+        baseline = {"fast": {"ops_per_sec": 100.0}, "slow": {"ops_per_sec": 100.0}}
+        results = {
+            "fast": {"ops_per_sec": 95.0},
+            "slow": {"ops_per_sec": 80.0},
+            "new": {"ops_per_sec": 1.0},
+        }
+
+        messages = regressions(results, baseline, threshold=0.1)
+
+        self.assertEqual(1, len(messages))
+        self.assertTrue(messages[0].startswith("slow:"))
+
+    def test_the_exit_status_reflects_regressions_against_the_stored_baseline(self) -> None:
+        with tempfile.TemporaryDirectory() as directory, redirect_stdout(io.StringIO()):
+            path = os.path.join(directory, "baseline.json")
+            output = os.path.join(directory, "results.json")
+            arguments = ["compare_cards", "--min-time", "0.001", "--baseline", path]
+
+            self.assertEqual(0, main(arguments + ["--save-baseline"]))
+            with open(path) as file:
+                document = json.load(file)
+            self.assertEqual(["compare_cards"], list(document["results"]))
+
+            # Pretend the baseline was a lot faster than any machine can be.
+            document["results"]["compare_cards"]["ops_per_sec"] = 1e15
+            with open(path, "w") as file:
+                json.dump(document, file)
+            self.assertEqual(1, main(arguments + ["--output", output]))
+            self.assertEqual(0, main(arguments + ["--threshold", "1"]))
+            self.assertTrue(os.path.exists(output))
+
+
+if __name__ == "__main__":
+    unittest.main()
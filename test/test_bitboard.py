@@ -0,0 +1,82 @@
+import random
+import unittest
+
+from bitboard import (
+    HIGHER_TRUMPS,
+    SUIT_MASKS,
+    card_index,
+    cards_to_mask,
+    index_card,
+    legal_mask,
+    mask_to_cards,
+    winning_position,
+)
+from models import Card, Deal, Deck, Player, Rank, RuleSet, Suit, Trick
+
+
+class BitboardTestCase(unittest.TestCase):
+    def test_card_indices_follow_the_order_of_a_fresh_deck(self) -> None:
+        for index, card in enumerate(Deck().cards):
+            self.assertEqual(index, card_index(card))
+            self.assertEqual(card, index_card(index))
+
+    def test_cards_can_be_converted_to_a_mask_and_back(self) -> None:
+        cards = {
+            Card(suit=Suit.CLUBS, rank=Rank.SEVEN),
+            Card(suit=Suit.HEARTS, rank=Rank.JACK),
+            Card(suit=Suit.SPADES, rank=Rank.ACE),
+        }
+        mask = cards_to_mask(cards)
+
+        self.assertEqual((1 << 0) | (1 << 12) | (1 << 31), mask)
+        self.assertEqual(cards, mask_to_cards(mask))
+        self.assertEqual(set(), mask_to_cards(0))
+
+    def test_suit_masks_contain_exactly_the_cards_of_that_suit(self) -> None:
+        for suit in Suit:
+            self.assertEqual({Card(suit=suit, rank=rank) for rank in Rank}, mask_to_cards(SUIT_MASKS[suit.value - 1]))
+
+    def test_higher_trumps_follow_the_trump_order(self) -> None:
+        # Nothing beats the jack of trumps; only the jack beats the nine.
+        self.assertEqual(0, HIGHER_TRUMPS[Rank.JACK.value - 7])
+        self.assertEqual(1 << (Rank.JACK.value - 7), HIGHER_TRUMPS[Rank.NINE.value - 7])
+        # Everything except the seven beats the seven.
+        self.assertEqual(0xFF ^ 1, HIGHER_TRUMPS[Rank.SEVEN.value - 7])
+
+    def test_the_winning_position_of_a_trick(self) -> None:
+        hearts = Suit.HEARTS.value - 1
+        ace_of_spades, ten_of_spades, seven_of_hearts, ace_of_clubs = 31, 27, 8, 7
+
+        self.assertEqual(0, winning_position([ace_of_spades, ten_of_spades], trump_suit=hearts))
+        self.assertEqual(1, winning_position([ten_of_spades, ace_of_spades, ace_of_clubs], trump_suit=hearts))
+        self.assertEqual(2, winning_position([ace_of_spades, ten_of_spades, seven_of_hearts], trump_suit=hearts))
+        self.assertEqual(0, winning_position([ace_of_clubs], trump_suit=hearts))
+
+    def test_legal_masks_match_the_reference(self) -> None:
+        rng = random.Random(3)
+        for _ in range(2000):
+            rules = rng.choice(list(RuleSet))
+            players = [Player(name=str(index)) for index in range(4)]
+            deck = Deck()
+            deck.shuffle(seed=rng.randint(0, 100000000))
+            deck.deal(players)
+            trump_suit = rng.choice(list(Suit))
+            trick = Trick(Deal(players, 0, trump_suit, rules), leading_player_index=rng.randint(0, 3))
+            for _ in range(rng.randint(0, 3)):
+                trick.play(rng.choice(sorted(trick.legal_cards, key=card_index)))
+
+            player_index = trick.player_index_to_play
+            winning_card = trick.winning_card
+            mask = legal_mask(
+                cards_to_mask(players[player_index].hand),
+                -1 if trick.led_suit is None else trick.led_suit.value - 1,
+                trump_suit.value - 1,
+                -1 if winning_card is None else card_index(winning_card),
+                trick.winning_card_index == (player_index + 2) % 4,
+                rules == RuleSet.AMSTERDAM,
+            )
+            self.assertEqual(trick.legal_cards, mask_to_cards(mask))
+
+
+if __name__ == "__main__":
+    unittest.main()
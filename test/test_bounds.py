@@ -0,0 +1,57 @@
+import random
+import unittest
+
+from bitboard import card_index
+from bounds import lower_bound, master_trumps, score_bounds
+from models import Card, Rank, Suit
+from solver import Solver
+
+
+def mask(*cards: Card) -> int:
+    return sum(1 << card_index(card) for card in cards)
+
+
+class BoundsTestCase(unittest.TestCase):
+    def test_master_trumps(self) -> None:
+        jack, nine, ace, ten = 1 << 4, 1 << 2, 1 << 7, 1 << 3
+        self.assertEqual(jack | nine, master_trumps(jack | nine | ten, jack | nine | ace | ten))
+        # The nine is a master trump once the jack has been played.
+        self.assertEqual(nine, master_trumps(nine | ten, nine | ace | ten))
+        self.assertEqual(0, master_trumps(nine | ace, jack | nine | ace))
+
+    def test_lower_bound_of_master_trumps(self) -> None:
+        hands = [
+            mask(Card(Suit.HEARTS, Rank.JACK), Card(Suit.CLUBS, Rank.ACE)),
+            mask(Card(Suit.HEARTS, Rank.ACE), Card(Suit.CLUBS, Rank.TEN)),
+            mask(Card(Suit.HEARTS, Rank.NINE), Card(Suit.SPADES, Rank.SEVEN)),
+            mask(Card(Suit.SPADES, Rank.ACE), Card(Suit.CLUBS, Rank.KING)),
+        ]
+        self.assertEqual(20 + 14, lower_bound(hands, 0, 1))
+        self.assertEqual(0, lower_bound(hands, 1, 1))
+        # Without trumps, nothing is certain.
+        self.assertEqual(0, lower_bound(hands, 0, 2))
+
+    def test_a_hand_of_trumps_wins_every_trick(self) -> None:
+        hands = [
+            mask(Card(Suit.HEARTS, Rank.SEVEN), Card(Suit.HEARTS, Rank.EIGHT)),
+            mask(Card(Suit.SPADES, Rank.ACE), Card(Suit.CLUBS, Rank.TEN)),
+            mask(Card(Suit.SPADES, Rank.TEN), Card(Suit.DIAMONDS, Rank.SEVEN)),
+            mask(Card(Suit.SPADES, Rank.KING), Card(Suit.CLUBS, Rank.ACE)),
+        ]
+        self.assertEqual((56, 56), score_bounds(hands, 1))
+
+    def test_bounds_contain_the_solution(self) -> None:
+        rng = random.Random(5)
+        for _ in range(200):
+            trump_suit, leader, cards_per_hand = rng.randint(0, 3), rng.randint(0, 3), rng.randint(1, 4)
+            deck = rng.sample(range(32), 4 * cards_per_hand)
+            hands = [sum(1 << card for card in deck[seat::4]) for seat in range(4)]
+
+            lower, upper = score_bounds(hands, trump_suit)
+            value = Solver(trump_suit, bounds=False).solve(hands, leader)
+            self.assertLessEqual(lower, value)
+            self.assertLessEqual(value, upper)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import os
+import random
+import tempfile
+import unittest
+
+import instrumentation
+from cache import ENTRY_BYTES, ResultCache, position_key
+from models import RuleSet
+from position import Position
+
+
+def position(hand: int, points: int = 0) -> Position:
+    return Position(
+        hands=(hand, 2, 4, 8),
+        trick=(),
+        leader=0,
+        trump_suit=1,
+        rules=RuleSet.ROTTERDAM,
+        trick_number=0,
+        points=(points, 0),
+    )
+
+
+class PositionKeyTestCase(unittest.TestCase):
+    def test_keys_of_equal_positions_are_equal(self) -> None:
+        self.assertEqual(position_key(position(16)), position_key(position(16)))
+        self.assertEqual(16, len(position_key(position(16))))
+        self.assertNotEqual(position_key(position(16)), position_key(position(32)))
+
+    def test_the_score_so_far_is_not_part_of_the_key_by_default(self) -> None:
+        self.assertEqual(position_key(position(16, points=0)), position_key(position(16, points=20)))
+        self.assertNotEqual(
+            position_key(position(16, points=0), include_score=True),
+            position_key(position(16, points=20), include_score=True),
+        )
+
+
+class ResultCacheTestCase(unittest.TestCase):
+    def test_hits_and_misses(self) -> None:
+        cache = ResultCache(max_bytes=10_000)
+        self.assertIsNone(cache.get(b"a"))
+        cache.put(b"a", 1)
+
+        self.assertEqual(1, cache.get(b"a"))
+        self.assertEqual(1, cache.statistics.hits)
+        self.assertEqual(1, cache.statistics.misses)
+        self.assertEqual(0.5, cache.statistics.hit_rate)
+
+    def test_least_recently_used_results_are_evicted(self) -> None:
+        cache = ResultCache(max_bytes=3 * ENTRY_BYTES, sizeof=lambda value: 0)
+        for key in [b"a", b"b", b"c"]:
+            cache.put(key, key.decode())
+        cache.get(b"a")
+        cache.put(b"d", "d")
+
+        self.assertEqual(3, len(cache))
+        self.assertEqual(1, cache.statistics.evictions)
+        self.assertIsNone(cache.get(b"b"))
+        self.assertEqual("a", cache.get(b"a"))
+        self.assertEqual("c", cache.get(b"c"))
+
+    def test_memory_is_bounded(self) -> None:
+        rng = random.Random(1)
+        cache = ResultCache(max_bytes=100_000)
+        for _ in range(10_000):
+            cache.put(rng.getrandbits(64).to_bytes(8, "little"), "x" * rng.randint(0, 1000))
+            self.assertLessEqual(cache.size, 100_000)
+
+        self.assertGreater(cache.statistics.evictions, 0)
+
+    def test_results_larger_than_the_cache_are_not_stored(self) -> None:
+        cache = ResultCache(max_bytes=1000)
+        cache.put(b"a", "x" * 2000)
+
+        self.assertEqual(0, len(cache))
+        self.assertEqual(0, cache.size)
+
+    def test_replacing_a_result_updates_the_size(self) -> None:
+        cache = ResultCache(max_bytes=10_000, sizeof=len)
+        cache.put(b"a", "x" * 100)
+        cache.put(b"a", "x" * 10)
+
+        self.assertEqual(ENTRY_BYTES + 10, cache.size)
+
+    def test_get_or_compute(self) -> None:
+        cache = ResultCache(max_bytes=10_000)
+        calls = []
+
+        def compute() -> int:
+            calls.append(1)
+            return 42
+
+        self.assertEqual(42, cache.get_or_compute(b"a", compute))
+        self.assertEqual(42, cache.get_or_compute(b"a", compute))
+        self.assertEqual(1, len(calls))
+
+    def test_spill_to_disk(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "spill")
+            with ResultCache(max_bytes=2 * ENTRY_BYTES, spill_path=path, sizeof=lambda value: 0) as cache:
+                for number in range(5):
+                    cache.put(bytes([number]), (number, "result"))
+                self.assertEqual(3, cache.statistics.evictions)
+
+                # Evicted results are read back from disk.
+                self.assertEqual((0, "result"), cache.get(bytes([0])))
+                self.assertEqual(1, cache.statistics.spill_hits)
+
+            # Results in memory are spilled when closing, so a new cache finds all of them.
+            with ResultCache(max_bytes=10_000, spill_path=path) as cache:
+                self.assertEqual(
+                    [(number, "result") for number in range(5)], [cache.get(bytes([number])) for number in range(5)]
+                )
+
+    def test_events_are_reported(self) -> None:
+        instrumentation.reset()
+        instrumentation.enable()
+        try:
+            cache = ResultCache(max_bytes=ENTRY_BYTES + 100)
+            cache.get(b"a")
+            cache.put(b"a", 1)
+            cache.get(b"a")
+            cache.put(b"b", 2)
+            events = instrumentation.snapshot()["events"]
+        finally:
+            instrumentation.disable()
+            instrumentation.reset()
+
+        self.assertEqual({"cache_hits": 1.0, "cache_misses": 1.0, "cache_evictions": 1.0}, events)
+
+
+if __name__ == "__main__":
+    unittest.main()
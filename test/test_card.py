@@ -0,0 +1,22 @@
+import unittest
+
+from models import CARDS, Card, Rank, Suit, format_card, parse_card
+
+
+class CardNotationTestCase(unittest.TestCase):
+    def test_parse_card(self) -> None:
+        self.assertEqual(Card(suit=Suit.HEARTS, rank=Rank.TEN), parse_card("10H"))
+        self.assertEqual(Card(suit=Suit.SPADES, rank=Rank.JACK), parse_card("js"))
+        self.assertIs(CARDS[0], parse_card("7C"))
+
+        for name in ["", "H", "1H", "JX", "10", "TH"]:
+            with self.assertRaises(ValueError):
+                parse_card(name)
+
+    def test_every_card_can_be_formatted_and_parsed(self) -> None:
+        for card in CARDS:
+            self.assertEqual(card, parse_card(format_card(card)))
+
+
+if __name__ == "__main__":
+    unittest.main()
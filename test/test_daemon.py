@@ -0,0 +1,153 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from typing import Any, Dict, List
+
+from daemon import DaemonClient, PositionServer
+
+HANDS = [["JH", "7S", "AC"], ["AS", "10S", "8H"], ["8S", "KC", "9D"], ["9S", "QC", "7D"]]
+
+
+class DaemonTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "daemon.sock")
+        self.server = PositionServer(self.path)
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+        self.thread.start()
+        self.client = DaemonClient(self.path, timeout=10)
+
+    def tearDown(self) -> None:
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.directory.cleanup()
+
+    def test_legal(self) -> None:
+        result = self.client.query("legal", hands=HANDS, trump="H", leader=1, trick=[])
+        self.assertEqual(["8H", "10S", "AS"], result["legal"])
+
+        # Player 2 must follow suit.
+        hands = [HANDS[0], ["10S", "8H"], HANDS[2], HANDS[3]]
+        result = self.client.query("legal", hands=hands, trump="H", leader=1, trick=["AS"])
+        self.assertEqual(["8S"], result["legal"])
+
+    def test_winner(self) -> None:
+        hands = [HANDS[0], ["10S", "8H"], ["KC", "9D"], ["QC", "7D"]]
+        result = self.client.query("winner", hands=hands, trump="H", leader=1, trick=["AS", "8S", "9S"])
+        self.assertEqual({"player": 1, "card": "AS"}, result)
+
+        # A trump beats the ace of the led suit.
+        hands = [HANDS[0], ["10S", "AS"], ["KC", "9D"], HANDS[3]]
+        result = self.client.query("winner", hands=hands, trump="S", leader=1, trick=["8H", "8S"])
+        self.assertEqual({"player": 2, "card": "8S"}, result)
+
+        with self.assertRaises(ValueError):
+            self.client.query("winner", hands=HANDS, trump="H", leader=0, trick=[])
+
+    def test_best_move(self) -> None:
+        result = self.client.query("best_move", hands=HANDS, trump="H", leader=0, rules="Amsterdam")
+        self.assertIn(result["card"], HANDS[0])
+        self.assertGreaterEqual(result["points"], 0)
+        self.assertGreaterEqual(self.client.latency_us, 0)
+
+        # The answer is the same once the solver is warm.
+        self.assertEqual(result, self.client.query("best_move", hands=HANDS, trump="H", leader=0, rules="Amsterdam"))
+
+    def test_best_moves_are_cached(self) -> None:
+        result = self.client.query("best_move", hands=HANDS, trump="D", leader=3)
+        self.assertEqual(1, self.server.cache.statistics.misses)
+
+        # The order of the cards in a hand does not matter.
+        hands = [list(reversed(hand)) for hand in HANDS]
+        self.assertEqual(result, self.client.query("best_move", hands=hands, trump="D", leader=3))
+        self.assertEqual(1, self.server.cache.statistics.hits)
+
+    def test_batch(self) -> None:
+        position = {"hands": HANDS, "trump": "C", "leader": 0}
+        results = self.client.batch([{"op": "legal", **position}, {"op": "best_move", **position}])
+
+        self.assertEqual(2, len(results))
+        self.assertEqual(["AC", "JH", "7S"], results[0]["legal"])
+        self.assertIn(results[1]["card"], HANDS[0])
+
+    def test_errors(self) -> None:
+        response = self.client.request(
+            {"id": 7, "queries": [{"op": "fold"}, {"op": "legal", "hands": [["JH"]], "trump": "H"}]}
+        )
+        self.assertEqual(7, response["id"])
+        self.assertIn("latency_us", response)
+        self.assertEqual(
+            [{"error": "Unknown operation: 'fold'"}, {"error": "A position must have four hands"}],
+            response["results"],
+        )
+
+        for queries in [5, [{"op": "legal"}, 3], {"op": "legal"}]:
+            response = self.client.request({"id": 8, "queries": queries})
+            self.assertEqual("The queries must be a list of JSON objects", response["error"])
+            self.assertEqual(8, response["id"])
+
+        positions: List[Dict[str, Any]] = [
+            {"hands": [["JH"], ["JH"], ["7S"], ["8S"]], "trump": "H"},
+            {"hands": HANDS, "trump": "X"},
+            {"hands": HANDS, "trump": "H", "rules": "Utrecht"},
+            {"hands": HANDS, "trump": "H", "leader": 4},
+            {"hands": HANDS, "trump": "H", "leader": True},
+            {"hands": HANDS, "trump": "H", "leader": 1.0},
+        ]
+        for position in positions:
+            with self.assertRaises(ValueError):
+                self.client.query("legal", **position)
+
+    def test_hand_sizes_must_match_the_trick(self) -> None:
+        positions: List[Dict[str, Any]] = [
+            {"hands": [["JH"], [], [], []], "trump": "H", "leader": 0},
+            {"hands": [["JH", "7S"], ["AS"], [], ["9S"]], "trump": "H", "leader": 0},
+            # Player 1 played to the trick, but still holds as many cards as the players after it.
+            {
+                "hands": [["JH", "7S"], ["AS", "8H"], ["8S", "KC"], ["9S", "QC"]],
+                "trump": "H",
+                "leader": 1,
+                "trick": ["AC"],
+            },
+        ]
+        for position in positions:
+            for operation in ["legal", "best_move"]:
+                with self.assertRaises(ValueError):
+                    self.client.query(operation, **position)
+
+        hands = [["JH", "7S"], ["AS"], ["8S"], ["9S", "QC"]]
+        result = self.client.query("best_move", hands=hands, trump="H", leader=1, trick=["AC", "KC"])
+        self.assertIn(result["card"], hands[3])
+
+    def test_invalid_json(self) -> None:
+        with DaemonClient(self.path, timeout=10) as client:
+            client._file.write(b"{not json\n")
+            client._file.flush()
+            response = json.loads(client._file.readline())
+
+        self.assertTrue(response["error"].startswith("Invalid JSON"))
+
+    def test_concurrent_clients(self) -> None:
+        results = []
+
+        def run() -> None:
+            with DaemonClient(self.path, timeout=10) as client:
+                results.append(client.query("best_move", hands=HANDS, trump="S", leader=2)["points"])
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(4, len(results))
+        self.assertEqual(1, len(set(results)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 from unittest.mock import patch
 
-from models import Player, Deal, Suit
+from models import LEGALITY_RULES, Player, Deal, RuleSet, Suit
 
 
 class DealTestCase(unittest.TestCase):
@@ -71,6 +71,36 @@ class DealTestCase(unittest.TestCase):
         unknown_player = Player(name="5")
         self.assertRaises(ValueError, deal.get_teammate_index, [unknown_player])
 
+    def test_a_deal_seats_its_players(self) -> None:
+        players = [Player(), Player(), Player(), Player()]
+        Deal(players=players, bidder_index=0)
+
+        self.assertEqual([0, 1, 2, 3], [player.seat for player in players])
+
+    def test_the_teammate_of_a_seated_player_is_found_by_seat(self) -> None:
+        # These players cannot be told apart by their name and hand.
+        players = [Player(name="Twin"), Player(name="Twin"), Player(name="Twin"), Player(name="Twin")]
+        deal = Deal(players=players, bidder_index=0)
+
+        self.assertEqual([2, 3, 0, 1], [deal.get_teammate_index(player) for player in players])
+        self.assertNotEqual(players[0], players[1])
+
+    def test_teammates_and_opponents_follow_from_the_seat(self) -> None:
+        self.assertEqual([2, 3, 0, 1], [Deal.teammate_index(index) for index in range(4)])
+        self.assertEqual([(1, 3), (2, 0), (3, 1), (0, 2)], [Deal.opponent_indices(index) for index in range(4)])
+
+    def test_the_legality_rule_follows_the_rule_set(self) -> None:
+        players = [Player(), Player(), Player(), Player()]
+        deal = Deal(players=players, bidder_index=0, rules=RuleSet.AMSTERDAM)
+        self.assertIs(LEGALITY_RULES[RuleSet.AMSTERDAM], deal.legality)
+
+        deal.rules = RuleSet.ROTTERDAM
+        self.assertEqual(RuleSet.ROTTERDAM, deal.rules)
+        self.assertIs(LEGALITY_RULES[RuleSet.ROTTERDAM], deal.legality)
+
+    def test_every_rule_set_has_a_legality_rule(self) -> None:
+        self.assertEqual(set(RuleSet), set(LEGALITY_RULES))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,114 @@
+import random
+import unittest
+from math import comb
+
+import numpy as np
+
+from bitboard import FULL_DECK, cards_to_mask
+from deal_statistics import (
+    ROEM_KINDS,
+    SUIT_SPLITS,
+    DealStatistics,
+    Histogram,
+    collect,
+    deck_hands,
+    hand_roem,
+    popcount,
+    random_hands,
+    wilson_interval,
+)
+from game import new_deal
+from models import parse_card
+from scoring import mask_roem
+
+
+class DealStatisticsTestCase(unittest.TestCase):
+    def test_popcount(self) -> None:
+        rng = random.Random(1)
+        masks = [rng.getrandbits(32) for _ in range(100)] + [0, FULL_DECK]
+        self.assertEqual([bin(mask).count("1") for mask in masks], popcount(masks).tolist())
+
+    def test_hand_roem_matches_scoring(self) -> None:
+        hands = random_hands(np.random.default_rng(1), 500)
+        for trump_suit in range(4):
+            roem = hand_roem(hands, trump_suit)
+            for deal in range(len(hands)):
+                for seat in range(4):
+                    self.assertEqual(mask_roem(int(hands[deal, seat]), trump_suit), roem[deal, seat])
+
+    def test_random_hands_deal_the_whole_deck(self) -> None:
+        hands = random_hands(np.random.default_rng(1), 1000)
+        self.assertEqual((1000, 4), hands.shape)
+        self.assertTrue((popcount(hands) == 8).all())
+        self.assertTrue((np.bitwise_or.reduce(hands, axis=1) == FULL_DECK).all())
+
+    def test_deck_hands_match_new_deal(self) -> None:
+        hands = deck_hands(range(5))
+        for seed in range(5):
+            deal = new_deal(seed=seed)
+            self.assertEqual([cards_to_mask(player.hand) for player in deal.players], hands[seed].tolist())
+
+    def test_wilson_interval(self) -> None:
+        low, high = wilson_interval(50, 100)
+        self.assertAlmostEqual(0.4038, low, places=4)
+        self.assertAlmostEqual(0.5962, high, places=4)
+        self.assertEqual(0.0, wilson_interval(0, 10)[0])
+        self.assertEqual(1.0, wilson_interval(10, 10)[1])
+        self.assertEqual((0.0, 1.0), wilson_interval(0, 0))
+
+    def test_histogram_grows_and_accumulates(self) -> None:
+        histogram = Histogram()
+        histogram.add([0, 2, 2])
+        histogram.add(np.array([[5, 2]]))
+        self.assertEqual(5, histogram.total)
+        self.assertEqual([0, 2, 5], histogram.values())
+        self.assertEqual(3, histogram.count(2))
+        self.assertEqual(0, histogram.count(9))
+        self.assertAlmostEqual(0.6, histogram.probability(2))
+
+    def test_statistics_are_counted_per_hand_and_suit(self) -> None:
+        statistics = DealStatistics(trump_suit=1)
+        statistics.add(deck_hands(range(10)))
+        statistics.add(deck_hands(range(10, 30)))
+
+        self.assertEqual(30, statistics.deals)
+        self.assertEqual(120, statistics.trump_length.total)
+        self.assertEqual(120, statistics.roem.total)
+        self.assertEqual(120, statistics.suit_split.total)
+        self.assertEqual(8 * 30, sum(length * statistics.trump_length.count(length) for length in range(9)))
+        self.assertEqual(15, len(SUIT_SPLITS))
+        for split in SUIT_SPLITS:
+            self.assertEqual(8, sum(split))
+
+    def test_four_sevens_eights_or_nines_are_no_roem(self) -> None:
+        def ranks(*names: str) -> int:
+            return cards_to_mask(parse_card(name + suit) for name in names for suit in "CHDS")
+
+        hands = [ranks("7", "8"), ranks("K", "Q"), ranks("9", "10"), ranks("J", "A")]
+        statistics = DealStatistics(trump_suit=0)
+        statistics.add([hands])
+
+        self.assertEqual([0, 220, 100, 300], hand_roem(hands, trump_suit=0).tolist())
+        self.assertEqual(3, statistics.roem_kinds["four_of_a_kind"])
+        self.assertEqual(1, statistics.roem_kinds["four_jacks"])
+
+    def test_collect_matches_exact_probabilities(self) -> None:
+        statistics = collect(40000, trump_suit=0, seed=1, batch_size=15000)
+        self.assertEqual(40000, statistics.deals)
+        self.assertGreater(statistics.deals_per_second, 0)
+
+        # The probability of holding no trumps, and of holding every kind of roem, is known exactly.
+        low, high = statistics.trump_length.interval(0, z=4)
+        self.assertLess(low, comb(24, 8) / comb(32, 8))
+        self.assertGreater(high, comb(24, 8) / comb(32, 8))
+
+        low, high = statistics.roem_kind_interval("stuk", z=4)
+        self.assertLess(low, comb(30, 6) / comb(32, 8))
+        self.assertGreater(high, comb(30, 6) / comb(32, 8))
+
+        for kind in ROEM_KINDS:
+            self.assertGreater(statistics.roem_kinds[kind], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 import random
 
-from models import Card, Deck, Player, Suit, Rank
+from models import CARDS, Card, Deck, Player, Suit, Rank
 
 
 class DeckTestCase(unittest.TestCase):
@@ -14,6 +14,20 @@ class DeckTestCase(unittest.TestCase):
         # The collection of cards must be unique.
         self.assertEqual(len(set(deck.cards)), 32)
 
+    def test_a_fresh_deck_holds_the_shared_card_instances(self) -> None:
+        deck = Deck()
+
+        for index, card in enumerate(deck.cards):
+            self.assertIs(CARDS[index], card)
+            self.assertEqual(index, card.ordinal)
+
+    def test_cards_can_be_interned(self) -> None:
+        card = Card(suit=Suit.DIAMONDS, rank=Rank.QUEEN)
+
+        self.assertEqual(8 * 2 + 5, card.ordinal)
+        self.assertIsNot(CARDS[card.ordinal], card)
+        self.assertIs(CARDS[card.ordinal], card.intern())
+
     def test_deck_random_shuffle(self) -> None:
         deck_1, deck_2 = Deck(), Deck()
 
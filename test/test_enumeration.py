@@ -0,0 +1,141 @@
+import itertools
+import random
+import unittest
+from collections import Counter
+from typing import List
+
+from bitboard import cards_to_mask
+from enumeration import DealEnumerator, infer_exclusions
+from game import new_deal, random_policy
+from models import Card, Deal, Player, Rank, RuleSet, Suit, Trick
+
+
+def play(deal: Deal, cards: int, seed: int) -> List[Trick]:
+    """Play a number of cards of a deal at random, starting with the bidder."""
+    policy = random_policy(random.Random(seed))
+    tricks = [Trick(deal=deal, leading_player_index=deal.bidder_index)]
+    for _ in range(cards):
+        if None not in tricks[-1].played_cards:
+            winning_index = tricks[-1].winning_card_index
+            assert winning_index is not None
+            tricks.append(Trick(deal=deal, leading_player_index=winning_index))
+        tricks[-1].play(policy(tricks[-1]))
+
+    return tricks
+
+
+class InferExclusionsTestCase(unittest.TestCase):
+    def test_not_following_suit_reveals_a_void(self) -> None:
+        players = [Player(name=str(index)) for index in range(4)]
+        players[0].hand = {Card(suit=Suit.SPADES, rank=Rank.ACE)}
+        players[1].hand = {Card(suit=Suit.CLUBS, rank=Rank.SEVEN)}
+        players[2].hand = {Card(suit=Suit.HEARTS, rank=Rank.SEVEN)}
+        players[3].hand = {Card(suit=Suit.SPADES, rank=Rank.SEVEN)}
+        deal = Deal(players=players, bidder_index=0, trump_suit=Suit.HEARTS)
+        trick = Trick(deal=deal, leading_player_index=0)
+        trick.play(Card(suit=Suit.SPADES, rank=Rank.ACE))
+        trick.play(Card(suit=Suit.CLUBS, rank=Rank.SEVEN))
+        trick.play(Card(suit=Suit.HEARTS, rank=Rank.SEVEN))
+
+        spades = cards_to_mask(Card(suit=Suit.SPADES, rank=rank) for rank in Rank)
+        hearts = cards_to_mask(Card(suit=Suit.HEARTS, rank=rank) for rank in Rank)
+        excluded = infer_exclusions([trick])
+
+        self.assertEqual(0, excluded[0])
+        # Player 1 discarded, so holds neither spades nor trumps.
+        self.assertEqual(spades | hearts, excluded[1])
+        # Player 2 trumped, which is allowed with any trump.
+        self.assertEqual(spades, excluded[2])
+
+    def test_exclusions_are_sound(self) -> None:
+        for seed in range(100):
+            rules = list(RuleSet)[seed % 2]
+            deal = new_deal(seed=seed, bidder_index=seed % 4, trump_suit=list(Suit)[seed % 4], rules=rules)
+            policy = random_policy(random.Random(seed))
+            tricks = [Trick(deal=deal, leading_player_index=deal.bidder_index)]
+            for _ in range(31):
+                if None not in tricks[-1].played_cards:
+                    winning_index = tricks[-1].winning_card_index
+                    assert winning_index is not None
+                    tricks.append(Trick(deal=deal, leading_player_index=winning_index))
+                tricks[-1].play(policy(tricks[-1]))
+
+                for player, mask in zip(deal.players, infer_exclusions(tricks)):
+                    self.assertEqual(0, cards_to_mask(player.hand) & mask)
+
+
+class DealEnumeratorTestCase(unittest.TestCase):
+    def test_count_agrees_with_brute_force(self) -> None:
+        rng = random.Random(1)
+        for _ in range(50):
+            unseen = rng.sample(range(32), 6)
+            sizes = [0, 1, 2, 3]
+            rng.shuffle(sizes)
+            excluded = [sum(1 << card for card in rng.sample(unseen, rng.randint(0, 3))) for _ in range(4)]
+            enumerator = DealEnumerator([0, 0, 0, 0], sum(1 << card for card in unseen), sizes, excluded)
+
+            expected = set()
+            for owners in itertools.product(range(4), repeat=len(unseen)):
+                hands = [0, 0, 0, 0]
+                for card, owner in zip(unseen, owners):
+                    hands[owner] |= 1 << card
+                if all(bin(hand).count("1") == size for hand, size in zip(hands, sizes)) and not any(
+                    hand & mask for hand, mask in zip(hands, excluded)
+                ):
+                    expected.add(tuple(hands))
+
+            self.assertEqual(len(expected), enumerator.count)
+            listed = list(enumerator)
+            self.assertEqual(len(expected), len(listed))
+            self.assertEqual(expected, set(listed))
+
+    def test_late_positions_are_enumerated_exactly(self) -> None:
+        for seed in range(10):
+            rules = list(RuleSet)[seed % 2]
+            deal = new_deal(seed=seed, bidder_index=seed % 4, trump_suit=list(Suit)[seed % 4], rules=rules)
+            tricks = play(deal, 21, seed)
+            seat = (tricks[-1].player_index_to_play + seed) % 4
+            enumerator = DealEnumerator.from_tricks(tricks, seat)
+
+            actual = tuple(cards_to_mask(player.hand) for player in deal.players)
+            listed = list(enumerator)
+            self.assertEqual(enumerator.count, len(listed))
+            self.assertEqual(len(listed), len(set(listed)))
+            self.assertIn(actual, listed)
+            for hands in listed:
+                self.assertEqual(
+                    [len(player.hand) for player in deal.players], [bin(hand).count("1") for hand in hands]
+                )
+                self.assertEqual(actual[seat], hands[seat])
+
+    def test_early_positions_are_counted_without_listing(self) -> None:
+        deal = new_deal(seed=1, trump_suit=Suit.HEARTS)
+        enumerator = DealEnumerator.from_tricks([Trick(deal=deal, leading_player_index=0)], seat=0)
+
+        # 24 unseen cards dealt eight each to three players.
+        self.assertEqual(9465511770, enumerator.count)
+        self.assertEqual([8, 8, 8, 8], [bin(hand).count("1") for hand in next(iter(enumerator))])
+
+    def test_sampling_is_uniform(self) -> None:
+        enumerator = DealEnumerator([1, 0, 0, 0], 0b1111110, [0, 2, 2, 2], [0, 0b110, 0, 0])
+        self.assertEqual(36, enumerator.count)
+
+        rng = random.Random(2)
+        counts = Counter(enumerator.sample(rng) for _ in range(36000))
+        self.assertEqual(set(enumerator), set(counts))
+        for count in counts.values():
+            self.assertLess(abs(count - 1000), 150)
+
+    def test_sampling_respects_the_view(self) -> None:
+        deal = new_deal(seed=3, trump_suit=Suit.CLUBS, rules=RuleSet.AMSTERDAM)
+        tricks = play(deal, 13, 3)
+        enumerator = DealEnumerator.from_tricks(tricks, seat=2)
+        listed = set(enumerator)
+
+        rng = random.Random(3)
+        for _ in range(100):
+            self.assertIn(enumerator.sample(rng), listed)
+
+
+if __name__ == "__main__":
+    unittest.main()
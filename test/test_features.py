@@ -0,0 +1,129 @@
+import random
+import unittest
+from typing import List, Optional, Set
+
+import numpy as np
+
+from bitboard import card_index, cards_to_mask
+from features import (
+    BIDDER,
+    FEATURE_SIZE,
+    HAND,
+    LEADER,
+    PLAYED,
+    RULES,
+    TRICK,
+    TRUMP,
+    FeatureEncoder,
+    encode_position,
+    encode_trick,
+)
+from models import Card, Deal, Deck, Player, Rank, RuleSet, Suit, Trick
+
+
+class FeaturesTestCase(unittest.TestCase):
+    def test_a_position_is_encoded_relative_to_the_player_to_play(self) -> None:
+        players = [Player(name=str(index)) for index in range(4)]
+        players[0].hand = {Card(suit=Suit.SPADES, rank=Rank.ACE)}
+        players[1].hand = {Card(suit=Suit.SPADES, rank=Rank.KING), Card(suit=Suit.HEARTS, rank=Rank.SEVEN)}
+        deal = Deal(players=players, bidder_index=1, trump_suit=Suit.HEARTS, rules=RuleSet.AMSTERDAM)
+        trick = Trick(deal=deal, leading_player_index=0)
+        trick.play(Card(suit=Suit.SPADES, rank=Rank.ACE))
+
+        played: List[Set[Card]] = [set(), {Card(suit=Suit.CLUBS, rank=Rank.JACK)}, set(), set()]
+        features = encode_trick(trick, played)
+
+        self.assertEqual((FEATURE_SIZE,), features.shape)
+        self.assertEqual([8, 30], list(np.flatnonzero(features[HAND])))
+        # Player 1 is to play, so its own earlier cards are in the first block of played cards...
+        self.assertEqual([card_index(Card(suit=Suit.CLUBS, rank=Rank.JACK))], list(np.flatnonzero(features[PLAYED])))
+        # ...and the ace played by player 0 belongs to the last relative seat.
+        self.assertEqual([3 * 32 + 31], list(np.flatnonzero(features[TRICK])))
+        self.assertEqual([1], list(np.flatnonzero(features[TRUMP])))
+        self.assertEqual([3], list(np.flatnonzero(features[LEADER])))
+        self.assertEqual(1, features[BIDDER])
+        self.assertEqual(1, features[RULES])
+
+    def test_an_output_buffer_is_reused(self) -> None:
+        out = np.ones(FEATURE_SIZE, dtype=np.float32)
+        result = encode_position(
+            hand=set(),
+            played=[set(), set(), set(), set()],
+            trick_cards=[None, None, None, None],
+            trump_suit=Suit.CLUBS,
+            leading_player_index=2,
+            bidder_index=3,
+            rules=RuleSet.ROTTERDAM,
+            player_index=2,
+            out=out,
+        )
+
+        self.assertIs(out, result)
+        self.assertEqual([TRUMP.start, LEADER.start], list(np.flatnonzero(out)))
+
+    def test_batched_encoding_matches_single_positions(self) -> None:
+        rng = random.Random(2)
+        size = 200
+        hands = np.zeros(size, dtype=np.int64)
+        played = np.zeros((size, 4), dtype=np.int64)
+        trick_cards = np.full((size, 4), -1, dtype=np.int64)
+        trump_suits = np.zeros(size, dtype=np.int64)
+        leaders = np.zeros(size, dtype=np.int64)
+        bidders = np.zeros(size, dtype=np.int64)
+        player_indices = np.zeros(size, dtype=np.int64)
+        amsterdam = np.zeros(size, dtype=np.bool_)
+        expected = np.zeros((size, FEATURE_SIZE), dtype=np.float32)
+
+        for row in range(size):
+            deck = Deck()
+            deck.shuffle(seed=rng.randint(0, 100000000))
+            seats = [set(deck.cards[8 * seat : 8 * seat + 8]) for seat in range(4)]
+            leader, in_trick = rng.randint(0, 3), rng.randint(0, 3)
+            trick: List[Optional[Card]] = [None, None, None, None]
+            for offset in range(in_trick):
+                trick[(leader + offset) % 4] = seats[(leader + offset) % 4].pop()
+            history = [{seats[seat].pop() for _ in range(rng.randint(0, 4))} for seat in range(4)]
+
+            player_index = (leader + in_trick) % 4
+            trump_suit = rng.choice(list(Suit))
+            bidder = rng.randint(0, 3)
+            rules = rng.choice(list(RuleSet))
+
+            hands[row] = cards_to_mask(seats[player_index])
+            played[row] = [cards_to_mask(cards) for cards in history]
+            trick_cards[row] = [-1 if card is None else card_index(card) for card in trick]
+            trump_suits[row] = trump_suit.value - 1
+            leaders[row], bidders[row], player_indices[row] = leader, bidder, player_index
+            amsterdam[row] = rules == RuleSet.AMSTERDAM
+            encode_position(
+                seats[player_index], history, trick, trump_suit, leader, bidder, rules, player_index, expected[row]
+            )
+
+        out = np.empty((size, FEATURE_SIZE), dtype=np.float32)
+        encoder = FeatureEncoder(capacity=256)
+        encoder.encode_batch(out, hands, played, trick_cards, trump_suits, leaders, bidders, player_indices, amsterdam)
+
+        np.testing.assert_array_equal(expected, out)
+
+    def test_batches_larger_than_the_capacity_are_rejected(self) -> None:
+        encoder = FeatureEncoder(capacity=1)
+        out = np.empty((2, FEATURE_SIZE), dtype=np.float32)
+        zeros = np.zeros(2, dtype=np.int64)
+
+        self.assertRaises(
+            AssertionError,
+            encoder.encode_batch,
+            out,
+            zeros,
+            np.zeros((2, 4), dtype=np.int64),
+            np.zeros((2, 4), dtype=np.int64),
+            zeros,
+            zeros,
+            zeros,
+            zeros,
+            np.zeros(2, dtype=np.bool_),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import random
+import unittest
+from typing import List, Sequence
+
+from bitboard import card_index
+from fuzz import CHECKS, Check, FuzzCase, fuzz, make_trick, mismatches, random_case, shrink
+from models import Card, Rank, RuleSet, Suit
+
+
+def broken_legal(cases: Sequence[FuzzCase]) -> List[object]:
+    """The legal cards, except that the seven of clubs may never be played."""
+    seven_of_clubs = card_index(Card(suit=Suit.CLUBS, rank=Rank.SEVEN))
+    masks = CHECKS["legal_mask"].fast(cases)
+    return [mask & ~(1 << seven_of_clubs) if isinstance(mask, int) else mask for mask in masks]
+
+
+class FuzzTestCase(unittest.TestCase):
+    def test_fast_engines_match_the_reference(self) -> None:
+        report = fuzz(400, seed=1, batch_size=100)
+
+        self.assertEqual(400, report.cases)
+        self.assertEqual([], report.mismatches)
+        for name in CHECKS:
+            self.assertEqual(0, report.mismatch_counts[name])
+            self.assertEqual(400, report.statistics[name].cases)
+
+    def test_random_cases_are_valid(self) -> None:
+        rng = random.Random(1)
+        for rules in RuleSet:
+            for _ in range(200):
+                case = random_case(rng, rules)
+                self.assertEqual(rules, case.rules)
+                self.assertLessEqual(len(case.trick), 3)
+                self.assertTrue(case.hand)
+                self.assertFalse(any(case.hand >> card & 1 for card in case.trick))
+                self.assertEqual(len(case.trick), len(set(case.trick)))
+
+                trick = make_trick(case)
+                self.assertEqual(case.leader, trick.leading_player_index)
+                self.assertEqual(len(case.trick), 4 - trick.played_cards.count(None))
+
+    def test_reports_and_shrinks_a_mismatch(self) -> None:
+        check = Check(CHECKS["legal_mask"].reference, broken_legal)
+        report = fuzz(1000, seed=1, checks={"broken": check})
+
+        self.assertGreater(report.mismatch_counts["broken"], 0)
+        self.assertEqual(1, len(report.mismatches))
+        mismatch = report.mismatches[0]
+        self.assertEqual("broken", mismatch.check)
+        self.assertNotEqual(mismatch.expected, mismatch.actual)
+
+        # The minimal failing case is the seven of clubs alone, led into an empty trick.
+        seven_of_clubs = card_index(Card(suit=Suit.CLUBS, rank=Rank.SEVEN))
+        self.assertEqual(1 << seven_of_clubs, mismatch.case.hand)
+        self.assertEqual((), mismatch.case.trick)
+        self.assertEqual(0, mismatch.case.leader)
+        self.assertEqual(RuleSet.ROTTERDAM, mismatch.case.rules)
+
+    def test_shrink_keeps_the_case_failing(self) -> None:
+        check = Check(CHECKS["legal_mask"].reference, broken_legal)
+        seven_of_clubs = card_index(Card(suit=Suit.CLUBS, rank=Rank.SEVEN))
+        ace_of_clubs = card_index(Card(suit=Suit.CLUBS, rank=Rank.ACE))
+        case = FuzzCase(
+            hand=1 << seven_of_clubs | 1 << ace_of_clubs,
+            trick=(card_index(Card(suit=Suit.CLUBS, rank=Rank.KING)),),
+            leader=2,
+            trump_suit=3,
+            rules=RuleSet.AMSTERDAM,
+        )
+
+        shrunk = shrink(case, lambda candidate: mismatches(check, candidate))
+        self.assertTrue(mismatches(check, shrunk))
+        self.assertEqual(1 << seven_of_clubs, shrunk.hand)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import random
+import unittest
+
+from game import new_deal, play_deal, random_policy
+from models import Card, RuleSet, Suit, Trick
+
+
+class GameTestCase(unittest.TestCase):
+    def test_a_new_deal_gives_every_player_eight_cards(self) -> None:
+        deal = new_deal(seed=1, bidder_index=2, trump_suit=Suit.HEARTS)
+
+        self.assertEqual([8, 8, 8, 8], [len(player.hand) for player in deal.players])
+        self.assertEqual(32, len(set().union(*[player.hand for player in deal.players])))
+        self.assertEqual(2, deal.bidder_index)
+
+    def test_a_deal_is_played_out_in_eight_tricks(self) -> None:
+        for rules in RuleSet:
+            deal = new_deal(seed=2, bidder_index=1, trump_suit=Suit.SPADES, rules=rules)
+            tricks = play_deal(deal, random_policy(random.Random(3)))
+
+            self.assertEqual(8, len(tricks))
+            self.assertEqual(1, tricks[0].leading_player_index)
+            self.assertTrue(all(not player.hand for player in deal.players))
+            # Every trick is led by the winner of the previous trick.
+            for previous, trick in zip(tricks, tricks[1:]):
+                self.assertEqual(previous.winning_card_index, trick.leading_player_index)
+
+    def test_the_observer_sees_every_card_before_it_is_played(self) -> None:
+        deal = new_deal(seed=4, trump_suit=Suit.CLUBS)
+        observed = []
+
+        def observer(trick: Trick, card: Card) -> None:
+            self.assertIn(card, trick.legal_cards)
+            observed.append(card)
+
+        tricks = play_deal(deal, random_policy(random.Random(5)), observer=observer)
+
+        self.assertEqual(32, len(observed))
+        self.assertEqual({card for trick in tricks for card in trick.played_cards}, set(observed))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import random
+import tempfile
+import threading
+import unittest
+
+import instrumentation
+from game import new_deal, play_deal, random_policy
+from models import Suit, Trick
+
+
+class InstrumentationTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        instrumentation.reset()
+
+    def tearDown(self) -> None:
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_nothing_is_wrapped_or_counted_while_disabled(self) -> None:
+        play = Trick.play
+        instrumentation.count("cache_hits")
+        play_deal(new_deal(seed=1, trump_suit=Suit.HEARTS), random_policy(random.Random(1)))
+
+        self.assertIs(play, Trick.play)
+        self.assertEqual({}, instrumentation.snapshot()["events"])
+        self.assertEqual(0, sum(instrumentation.snapshot()["calls"].values()))
+
+    def test_calls_tricks_and_deals_are_counted_while_enabled(self) -> None:
+        play = Trick.play
+        instrumentation.enable()
+        self.assertTrue(instrumentation.enabled())
+        self.assertIsNot(play, Trick.play)
+
+        play_deal(new_deal(seed=2, trump_suit=Suit.CLUBS), random_policy(random.Random(2)))
+        instrumentation.count("cache_hits", 3)
+        values = instrumentation.snapshot()
+
+        self.assertEqual(32, values["calls"]["play"])
+        self.assertGreaterEqual(values["calls"]["legal_cards"], 64)
+        self.assertGreater(values["calls"]["winning_card_index"], 0)
+        self.assertGreater(values["seconds"]["play"], 0)
+        self.assertEqual({"cache_hits": 3, "deals_completed": 1, "tricks_completed": 8}, values["events"])
+
+        instrumentation.disable()
+        self.assertFalse(instrumentation.enabled())
+        self.assertIs(play, Trick.play)
+
+    def test_no_counts_are_lost_between_threads(self) -> None:
+        instrumentation.enable()
+
+        def work(seed: int) -> None:
+            for deal_seed in range(seed, seed + 5):
+                play_deal(new_deal(seed=deal_seed, trump_suit=Suit.SPADES), random_policy(random.Random(deal_seed)))
+            for _ in range(10_000):
+                instrumentation.count("cache_hits")
+
+        threads = [threading.Thread(target=work, args=(seed,)) for seed in range(0, 40, 5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        values = instrumentation.snapshot()
+
+        self.assertEqual(8 * 5 * 32, values["calls"]["play"])
+        self.assertEqual({"cache_hits": 80_000, "deals_completed": 40, "tricks_completed": 320}, values["events"])
+
+    def test_metrics_are_formatted_for_prometheus(self) -> None:
+        values = {"calls": {"play": 2.0}, "seconds": {"play": 0.5}, "events": {"cache_hits": 1.0}}
+        text = instrumentation.prometheus_text(values)
+
+        self.assertIn("# TYPE klaverjassen_calls_total counter\n", text)
+        self.assertIn('klaverjassen_calls_total{function="play"} 2\n', text)
+        self.assertIn('klaverjassen_call_seconds_total{function="play"} 0.5\n', text)
+        self.assertIn('klaverjassen_events_total{event="cache_hits"} 1\n', text)
+
+    def test_metrics_are_dumped_periodically(self) -> None:
+        instrumentation.enable()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics.prom")
+            dumper = instrumentation.PeriodicDump(path, interval=0.01)
+            instrumentation.count("cache_misses")
+            dumper.stop()
+
+            with open(path) as file:
+                self.assertIn('klaverjassen_events_total{event="cache_misses"} 1\n', file.read())
+            self.assertEqual(["metrics.prom"], os.listdir(directory))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+from typing import List
+
+from match import Match, strongest_suit
+from models import Card, Player, Rank, RuleSet, Suit
+from position import Position, encode_position
+
+
+def new_players() -> List[Player]:
+    return [Player(name=name) for name in ["North", "East", "South", "West"]]
+
+
+class MatchTestCase(unittest.TestCase):
+    def test_a_match_consists_of_sixteen_deals(self) -> None:
+        match = Match(new_players(), seed=1)
+        totals = match.play()
+
+        self.assertTrue(match.finished)
+        self.assertEqual(16, len(match.scores))
+        self.assertEqual(totals, match.totals)
+        self.assertEqual(sum(score.total(0) + score.total(1) for score in match.scores), sum(totals))
+        self.assertRaises(AssertionError, match.play_deal)
+
+    def test_the_dealer_and_bidder_rotate(self) -> None:
+        match = Match(new_players(), seed=2, first_dealer_index=3)
+
+        self.assertEqual((3, 0), (match.dealer_index, match.bidder_index))
+        match.play_deal()
+        self.assertEqual((0, 1), (match.dealer_index, match.bidder_index))
+        match.play_deal()
+        self.assertEqual((1, 2), (match.dealer_index, match.bidder_index))
+
+    def test_the_bidder_picks_the_suit_with_the_most_trump_points(self) -> None:
+        player = Player(name="Bidder")
+        player.hand = {Card(suit=Suit.SPADES, rank=Rank.JACK), Card(suit=Suit.HEARTS, rank=Rank.ACE)}
+
+        self.assertEqual(Suit.SPADES, strongest_suit(player))
+
+    def test_a_resumed_match_ends_the_same_as_an_uninterrupted_one(self) -> None:
+        expected = Match(new_players(), seed=3, rules=RuleSet.AMSTERDAM)
+        expected.play()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "match.bin")
+            interrupted = Match(new_players(), seed=3, rules=RuleSet.AMSTERDAM)
+            interrupted.play(checkpoint=path, deals=5)
+
+            resumed = Match.load(path)
+            self.assertEqual(5, len(resumed.scores))
+            self.assertEqual(interrupted.scores, resumed.scores)
+            self.assertEqual(RuleSet.AMSTERDAM, resumed.rules)
+            self.assertEqual(["North", "East", "South", "West"], [player.name for player in resumed.players])
+
+            resumed.play(checkpoint=path)
+            self.assertEqual(expected.scores, resumed.scores)
+            self.assertEqual(expected.scores, Match.load(path).scores)
+            # The checkpoint is compact: a small header and a few bytes per deal.
+            self.assertLess(os.path.getsize(path), 200)
+
+    def test_checkpoints_store_the_rule_set_like_encoded_positions(self) -> None:
+        position = Position(
+            hands=(0, 0, 0, 0), trick=(), leader=0, trump_suit=0, rules=RuleSet.AMSTERDAM, trick_number=0, points=(0, 0)
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "match.bin")
+            Match(new_players(), seed=4, rules=RuleSet.AMSTERDAM).save(path)
+            with open(path, "rb") as file:
+                data = file.read()
+
+        # The rule set follows the magic, the version and the seed in the checkpoint, and the trump suit in a position.
+        self.assertEqual(encode_position(position)[22], data[12])
+
+    def test_a_match_with_a_negative_seed_can_be_saved(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "match.bin")
+            match = Match(new_players(), seed=-5)
+            match.play(checkpoint=path, deals=1)
+
+            self.assertEqual(-5, Match.load(path).seed)
+            self.assertEqual(match.scores, Match.load(path).scores)
+
+    def test_seeds_and_names_that_do_not_fit_in_a_checkpoint_are_rejected(self) -> None:
+        self.assertRaises(ValueError, Match, new_players(), seed=1 << 63)
+        self.assertRaises(ValueError, Match, new_players(), seed=-(1 << 63) - 1)
+
+        players = new_players()
+        players[2].name = "é" * 128
+        self.assertRaises(ValueError, Match, players, seed=1)
+        players[2].name = "é" * 127
+        Match(players, seed=1)
+
+    def test_loading_something_other_than_a_checkpoint_fails(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "match.bin")
+            with open(path, "wb") as file:
+                file.write(b"\x00" * 64)
+
+            self.assertRaises(ValueError, Match.load, path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from bitboard import cards_to_mask
+from models import Card, Rank, Suit
+from ordering import MoveOrderer
+from test.helpers import index
+
+
+class MoveOrdererTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        # Hearts are trump.
+        self.orderer = MoveOrderer(trump_suit=1, killers=False, history=False)
+
+    def test_win_with_the_cheapest_winning_card(self) -> None:
+        trick = [index(Suit.SPADES, Rank.QUEEN)]
+        moves = cards_to_mask(
+            [Card(suit=Suit.SPADES, rank=rank) for rank in [Rank.SEVEN, Rank.KING, Rank.TEN, Rank.ACE]]
+        )
+        cards = self.orderer.order(moves, trick, False, 0, 8)
+
+        self.assertEqual(index(Suit.SPADES, Rank.KING), cards[0])
+
+    def test_discard_the_cheapest_card_when_the_trick_is_lost(self) -> None:
+        trick = [index(Suit.SPADES, Rank.ACE)]
+        moves = cards_to_mask(
+            [
+                Card(suit=Suit.CLUBS, rank=Rank.TEN),
+                Card(suit=Suit.CLUBS, rank=Rank.EIGHT),
+                Card(suit=Suit.DIAMONDS, rank=Rank.KING),
+            ]
+        )
+        cards = self.orderer.order(moves, trick, False, 0, 8)
+
+        self.assertEqual(index(Suit.CLUBS, Rank.EIGHT), cards[0])
+        self.assertEqual(index(Suit.CLUBS, Rank.TEN), cards[-1])
+
+    def test_give_points_to_a_winning_teammate_as_last_player(self) -> None:
+        trick = [index(Suit.SPADES, Rank.ACE), index(Suit.SPADES, Rank.SEVEN), index(Suit.SPADES, Rank.EIGHT)]
+        moves = cards_to_mask([Card(suit=Suit.CLUBS, rank=Rank.TEN), Card(suit=Suit.CLUBS, rank=Rank.EIGHT)])
+        cards = self.orderer.order(moves, trick, True, 0, 8)
+
+        self.assertEqual(index(Suit.CLUBS, Rank.TEN), cards[0])
+
+    def test_lead_a_card_that_is_certain_to_win(self) -> None:
+        moves = cards_to_mask([Card(suit=Suit.SPADES, rank=Rank.KING), Card(suit=Suit.CLUBS, rank=Rank.SEVEN)])
+        outstanding = cards_to_mask([Card(suit=Suit.SPADES, rank=Rank.QUEEN), Card(suit=Suit.CLUBS, rank=Rank.ACE)])
+        cards = self.orderer.order(moves, [], False, outstanding, 8)
+
+        self.assertEqual(index(Suit.SPADES, Rank.KING), cards[0])
+
+    def test_killer_moves_are_tried_first(self) -> None:
+        orderer = MoveOrderer(trump_suit=1)
+        trick = [index(Suit.SPADES, Rank.QUEEN)]
+        moves = cards_to_mask([Card(suit=Suit.SPADES, rank=Rank.SEVEN), Card(suit=Suit.SPADES, rank=Rank.ACE)])
+        self.assertEqual(index(Suit.SPADES, Rank.ACE), orderer.order(moves, trick, False, 0, 8)[0])
+
+        orderer.record_cutoff(index(Suit.SPADES, Rank.SEVEN), trick_length=1, tricks_left=8)
+        self.assertEqual(index(Suit.SPADES, Rank.SEVEN), orderer.order(moves, trick, False, 0, 8)[0])
+        # Killers are kept per number of remaining tricks.
+        self.assertEqual(index(Suit.SPADES, Rank.ACE), orderer.order(moves, trick, False, 0, 7)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,6 +23,12 @@ class PlayerTestCase(unittest.TestCase):
         player = Player(name="Foo")
         self.assertEqual(player.hand, set())
 
+    def test_players_do_not_hold_arbitrary_attributes(self) -> None:
+        player = Player(name="Foo")
+
+        self.assertFalse(hasattr(player, "__dict__"))
+        self.assertRaises(AttributeError, setattr, player, "score", 0)
+
 
 if __name__ == "__main__":
     unittest.main()
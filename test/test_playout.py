@@ -0,0 +1,129 @@
+import random
+import unittest
+from typing import List, Optional
+
+from bitboard import cards_to_mask, legal_mask, suit_index
+from game import new_deal, play_deal
+from models import Rank, RuleSet, Suit
+from playout import HeuristicPlayoutPolicy, PlayoutPolicy, RandomPlayoutPolicy, heuristic_policy, playout
+from test.helpers import index
+
+HEARTS = suit_index(Suit.HEARTS)
+
+
+class CheckingPolicy(PlayoutPolicy):
+    """Wraps a policy, checking that every card it plays is legal."""
+
+    def __init__(self, test_case: unittest.TestCase, policy: PlayoutPolicy, amsterdam: bool):
+        self.test_case = test_case
+        self.policy = policy
+        self.amsterdam = amsterdam
+        self.moves = 0
+
+    def choose(
+        self, moves: int, hands: List[int], seat: int, trick: List[int], length: int, winner: int, trump_suit: int
+    ) -> int:
+        if length:
+            expected = legal_mask(
+                hands[seat], trick[0] >> 3, trump_suit, trick[winner], winner == length - 2, self.amsterdam
+            )
+        else:
+            expected = hands[seat]
+        self.test_case.assertEqual(expected, moves)
+
+        card = self.policy.choose(moves, hands, seat, trick, length, winner, trump_suit)
+        self.test_case.assertTrue(moves >> card & 1)
+        self.moves += 1
+        return card
+
+
+class PlayoutTestCase(unittest.TestCase):
+    def test_playouts_play_legal_cards_and_score_every_point(self) -> None:
+        rng = random.Random(1)
+        for rules in RuleSet:
+            for seed in range(20):
+                deal = new_deal(seed=seed, trump_suit=Suit.HEARTS, rules=rules)
+                hands = [cards_to_mask(player.hand) for player in deal.players]
+                for policy in [HeuristicPlayoutPolicy(), RandomPlayoutPolicy(rng)]:
+                    checking = CheckingPolicy(self, policy, rules == RuleSet.AMSTERDAM)
+                    self.assertEqual(162, sum(playout(hands, seed % 4, (), HEARTS, rules, checking)))
+                    self.assertEqual(32, checking.moves)
+
+    def test_playout_continues_a_trick_in_progress(self) -> None:
+        hands = [
+            0,
+            1 << index(Suit.SPADES, Rank.SEVEN),
+            1 << index(Suit.SPADES, Rank.TEN),
+            1 << index(Suit.SPADES, Rank.EIGHT),
+        ]
+        trick = [index(Suit.SPADES, Rank.ACE)]
+
+        # The ace wins: 11 + 10 points and the last-trick bonus for team 0.
+        self.assertEqual((31, 0), playout(hands, 0, trick, HEARTS, RuleSet.ROTTERDAM, HeuristicPlayoutPolicy()))
+
+    def test_playout_does_not_modify_the_hands(self) -> None:
+        deal = new_deal(seed=1, trump_suit=Suit.HEARTS, rules=RuleSet.ROTTERDAM)
+        hands = [cards_to_mask(player.hand) for player in deal.players]
+        copy = list(hands)
+        playout(hands, 0, (), HEARTS, RuleSet.ROTTERDAM, HeuristicPlayoutPolicy())
+        self.assertEqual(copy, hands)
+
+
+class HeuristicPlayoutPolicyTestCase(unittest.TestCase):
+    def choose(self, hand: List[int], trick: List[int], winner: int, hands: Optional[List[int]] = None) -> int:
+        moves = 0
+        for card in hand:
+            moves |= 1 << card
+        length = len(trick)
+        if hands is None:
+            hands = [0, 0, 0, 0]
+            hands[length] = moves
+
+        return HeuristicPlayoutPolicy().choose(moves, hands, length, trick + [0] * (4 - length), length, winner, HEARTS)
+
+    def test_wins_with_the_lowest_winning_card(self) -> None:
+        hand = [index(Suit.SPADES, Rank.ACE), index(Suit.SPADES, Rank.TEN), index(Suit.SPADES, Rank.SEVEN)]
+        self.assertEqual(index(Suit.SPADES, Rank.TEN), self.choose(hand, [index(Suit.SPADES, Rank.KING)], 0))
+
+    def test_discards_the_cheapest_card_when_it_cannot_win(self) -> None:
+        hand = [index(Suit.SPADES, Rank.KING), index(Suit.SPADES, Rank.EIGHT), index(Suit.SPADES, Rank.TEN)]
+        trick = [index(Suit.SPADES, Rank.ACE)]
+        self.assertEqual(index(Suit.SPADES, Rank.EIGHT), self.choose(hand, trick, 0))
+
+    def test_does_not_overtake_a_winning_teammate(self) -> None:
+        hand = [index(Suit.SPADES, Rank.ACE), index(Suit.SPADES, Rank.SEVEN)]
+        trick = [index(Suit.SPADES, Rank.TEN), index(Suit.SPADES, Rank.EIGHT)]
+        self.assertEqual(index(Suit.SPADES, Rank.SEVEN), self.choose(hand, trick, 0))
+
+    def test_gives_points_to_a_winning_teammate_when_playing_last(self) -> None:
+        hand = [index(Suit.SPADES, Rank.TEN), index(Suit.SPADES, Rank.SEVEN)]
+        trick = [index(Suit.SPADES, Rank.EIGHT), index(Suit.SPADES, Rank.ACE), index(Suit.SPADES, Rank.NINE)]
+        self.assertEqual(index(Suit.SPADES, Rank.TEN), self.choose(hand, trick, 1))
+
+    def test_leads_a_card_that_cannot_be_beaten(self) -> None:
+        hand = [index(Suit.SPADES, Rank.ACE), index(Suit.CLUBS, Rank.SEVEN)]
+        hands = [(1 << hand[0]) | (1 << hand[1]), 1 << index(Suit.SPADES, Rank.TEN), 0, 0]
+        self.assertEqual(index(Suit.SPADES, Rank.ACE), self.choose(hand, [], 0, hands))
+
+    def test_leads_the_cheapest_card_without_a_card_that_cannot_be_beaten(self) -> None:
+        hand = [index(Suit.SPADES, Rank.KING), index(Suit.CLUBS, Rank.SEVEN)]
+        hands = [
+            (1 << hand[0]) | (1 << hand[1]),
+            1 << index(Suit.SPADES, Rank.ACE),
+            1 << index(Suit.CLUBS, Rank.ACE),
+            0,
+        ]
+        self.assertEqual(index(Suit.CLUBS, Rank.SEVEN), self.choose(hand, [], 0, hands))
+
+
+class HeuristicPolicyTestCase(unittest.TestCase):
+    def test_plays_a_full_deal(self) -> None:
+        for rules in RuleSet:
+            deal = new_deal(seed=2, trump_suit=Suit.SPADES, rules=rules)
+            tricks = play_deal(deal, heuristic_policy(random.Random(1)))
+            self.assertEqual(8, len(tricks))
+            self.assertFalse(any(player.hand for player in deal.players))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import random
+import unittest
+
+import numpy as np
+
+from game import new_deal
+from models import RuleSet, Suit, Trick
+from position import (
+    POSITION_SIZE,
+    Position,
+    decode_position,
+    decode_positions,
+    encode_position,
+    from_trick,
+    to_trick,
+)
+
+
+def random_position(rng: random.Random) -> Position:
+    deck = list(range(32))
+    rng.shuffle(deck)
+    length = rng.randint(0, 3)
+    hand_0, hand_1, hand_2, hand_3 = [sum(1 << card for card in deck[seat : 28 - length : 4]) for seat in range(4)]
+
+    return Position(
+        hands=(hand_0, hand_1, hand_2, hand_3),
+        trick=tuple(deck[28 - length : 28]),
+        leader=rng.randint(0, 3),
+        trump_suit=rng.randint(0, 3),
+        rules=rng.choice(list(RuleSet)),
+        trick_number=rng.randint(0, 7),
+        points=(rng.randint(0, 162), rng.randint(0, 362)),
+    )
+
+
+class PositionTestCase(unittest.TestCase):
+    def test_encoding_is_reversible(self) -> None:
+        rng = random.Random(1)
+        for _ in range(500):
+            position = random_position(rng)
+            encoded = encode_position(position)
+
+            self.assertEqual(POSITION_SIZE, len(encoded))
+            self.assertEqual(position, decode_position(encoded))
+
+    def test_size(self) -> None:
+        self.assertEqual(28, POSITION_SIZE)
+
+    def test_decode_at_an_offset(self) -> None:
+        rng = random.Random(2)
+        positions = [random_position(rng) for _ in range(10)]
+        buffer = memoryview(b"".join(encode_position(position) for position in positions))
+
+        for number, position in enumerate(positions):
+            self.assertEqual(position, decode_position(buffer, number * POSITION_SIZE))
+
+    def test_decode_many_without_copying(self) -> None:
+        rng = random.Random(3)
+        positions = [random_position(rng) for _ in range(10)]
+        buffer = bytearray(b"".join(encode_position(position) for position in positions))
+        array = decode_positions(buffer)
+
+        self.assertEqual(10, len(array))
+        for row, position in zip(array, positions):
+            self.assertEqual(list(position.hands), row["hands"].tolist())
+            self.assertEqual(position.leader, row["leader"])
+            self.assertEqual(list(position.points), row["points"].tolist())
+
+        # The array is a view on the buffer.
+        buffer[20] = 3
+        self.assertEqual(3, array[0]["leader"])
+        self.assertTrue(np.shares_memory(array, np.frombuffer(buffer, dtype=np.uint8)))
+
+    def test_a_trick_has_at_most_three_cards(self) -> None:
+        position = random_position(random.Random(4))._replace(trick=(1, 2, 3, 4))
+
+        with self.assertRaises(AssertionError):
+            encode_position(position)
+
+    def test_trick_conversion(self) -> None:
+        deal = new_deal(seed=5, trump_suit=Suit.DIAMONDS, rules=RuleSet.AMSTERDAM)
+        trick = Trick(deal=deal, leading_player_index=2)
+        trick.play(next(iter(trick.legal_cards)))
+        trick.play(next(iter(trick.legal_cards)))
+
+        position = from_trick(trick, trick_number=0, points=(0, 0))
+        self.assertEqual(2, position.leader)
+        self.assertEqual(2, position.trump_suit)
+        self.assertEqual(2, len(position.trick))
+        self.assertEqual(RuleSet.AMSTERDAM, position.rules)
+
+        copy = to_trick(decode_position(encode_position(position)))
+        self.assertEqual(trick.played_cards, copy.played_cards)
+        self.assertEqual(trick.legal_cards, copy.legal_cards)
+        self.assertEqual(trick.player_index_to_play, copy.player_index_to_play)
+        self.assertEqual([player.hand for player in deal.players], [player.hand for player in copy.deal.players])
+        self.assertEqual(position, from_trick(copy))
+
+
+if __name__ == "__main__":
+    unittest.main()
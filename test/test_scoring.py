@@ -0,0 +1,101 @@
+import random
+import unittest
+from typing import List
+
+from bitboard import FULL_DECK, cards_to_mask
+from game import new_deal, play_deal, random_policy
+from models import Card, Deal, Player, Rank, Suit, Trick, parse_card
+from scoring import (
+    TOTAL_POINTS,
+    card_points,
+    mask_points,
+    mask_roem,
+    score_deal,
+    trick_score,
+)
+
+
+def mask(*cards: str) -> int:
+    return cards_to_mask(parse_card(notation) for notation in cards)
+
+
+class ScoringTestCase(unittest.TestCase):
+    def test_card_points_depend_on_the_trump_suit(self) -> None:
+        self.assertEqual(20, card_points(Card(suit=Suit.HEARTS, rank=Rank.JACK), Suit.HEARTS))
+        self.assertEqual(2, card_points(Card(suit=Suit.HEARTS, rank=Rank.JACK), Suit.SPADES))
+        self.assertEqual(14, card_points(Card(suit=Suit.HEARTS, rank=Rank.NINE), Suit.HEARTS))
+        self.assertEqual(0, card_points(Card(suit=Suit.HEARTS, rank=Rank.NINE), Suit.SPADES))
+        self.assertEqual(11, card_points(Card(suit=Suit.CLUBS, rank=Rank.ACE), Suit.SPADES))
+
+    def test_the_points_of_a_full_deck_and_the_last_trick_add_up_to_the_total(self) -> None:
+        for trump_index in range(4):
+            self.assertEqual(TOTAL_POINTS - 10, mask_points(FULL_DECK, trump_index))
+
+    def test_sequences_are_roem(self) -> None:
+        self.assertEqual(20, mask_roem(mask("7C", "8C", "9C", "AH"), trump_index=3))
+        self.assertEqual(50, mask_roem(mask("9C", "10C", "JC", "QC"), trump_index=3))
+        # Ten, jack and queen are a sequence; the ranks do not follow the order of the trick.
+        self.assertEqual(20, mask_roem(mask("10D", "JD", "QD", "AD"), trump_index=3))
+        self.assertEqual(0, mask_roem(mask("7C", "8C", "10C", "JC"), trump_index=3))
+        self.assertEqual(0, mask_roem(mask("7C", "8H", "9C", "10D"), trump_index=3))
+
+    def test_four_of_a_kind_is_roem(self) -> None:
+        self.assertEqual(100, mask_roem(mask("KC", "KH", "KD", "KS"), trump_index=0))
+        self.assertEqual(200, mask_roem(mask("JC", "JH", "JD", "JS"), trump_index=0))
+        self.assertEqual(100, mask_roem(mask("10C", "10H", "10D", "10S"), trump_index=0))
+
+    def test_four_sevens_eights_or_nines_are_no_roem(self) -> None:
+        for rank in "789":
+            self.assertEqual(0, mask_roem(mask(rank + "C", rank + "H", rank + "D", rank + "S"), trump_index=0))
+
+    def test_king_and_queen_of_trumps_are_roem(self) -> None:
+        self.assertEqual(20, mask_roem(mask("KH", "QH", "7C", "8D"), trump_index=1))
+        self.assertEqual(0, mask_roem(mask("KH", "QH", "7C", "8D"), trump_index=0))
+        # Stuk counts on top of the sequence it is part of.
+        self.assertEqual(40, mask_roem(mask("KH", "QH", "JH", "8D"), trump_index=1))
+
+    def test_a_trick_can_be_scored(self) -> None:
+        players = [Player(name=str(index)) for index in range(4)]
+        for player, notation in zip(players, ["JS", "9S", "KS", "AS"]):
+            player.hand = {parse_card(notation)}
+        deal = Deal(players=players, bidder_index=0, trump_suit=Suit.SPADES)
+        trick = Trick(deal=deal, leading_player_index=0)
+        for player in players:
+            trick.play(next(iter(player.hand)))
+
+        self.assertEqual((49, 0), trick_score(trick))
+
+    def test_the_scores_of_a_deal_add_up(self) -> None:
+        for seed in range(50):
+            deal = new_deal(seed=seed, bidder_index=seed % 4, trump_suit=Suit.DIAMONDS)
+            tricks = play_deal(deal, random_policy(random.Random(seed)))
+            score = score_deal(deal, tricks)
+
+            self.assertEqual(TOTAL_POINTS, sum(score.points))
+            roem = sum(trick_score(trick)[1] for trick in tricks) + 100 * score.pit
+            self.assertEqual(roem, sum(score.roem))
+            if score.nat:
+                self.assertEqual(0, score.total(deal.bidder_index % 2))
+            else:
+                self.assertGreater(2 * score.total(deal.bidder_index % 2), TOTAL_POINTS + roem)
+
+    def test_a_deal_in_which_all_tricks_are_won_by_one_team_is_pit(self) -> None:
+        players = [Player(name=str(index)) for index in range(4)]
+        suits: List[Suit] = [Suit.HEARTS, Suit.CLUBS, Suit.DIAMONDS, Suit.SPADES]
+        for player, suit in zip(players, suits):
+            player.hand = {Card(suit=suit, rank=rank) for rank in Rank}
+        deal = Deal(players=players, bidder_index=0, trump_suit=Suit.HEARTS)
+
+        # The bidder holds all trumps and leads them from the top; the others discard.
+        tricks = play_deal(deal, random_policy(random.Random(0)))
+        score = score_deal(deal, tricks)
+
+        self.assertTrue(score.pit)
+        self.assertFalse(score.nat)
+        self.assertEqual((TOTAL_POINTS, 0), score.points)
+        self.assertEqual(0, score.roem[1])
+        self.assertGreaterEqual(score.roem[0], 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
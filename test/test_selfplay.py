@@ -0,0 +1,106 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from features import FEATURE_SIZE
+from game import Policy, random_policy
+from models import RuleSet
+from scoring import TOTAL_POINTS
+from selfplay import SAMPLE_BYTES, ShardWriter, generate, play_samples
+
+
+def failing_policy(rng: random.Random) -> Policy:
+    """A policy factory that fails for about a third of the deals, depending on their seeds."""
+    if rng.random() < 1 / 3:
+        raise RuntimeError("The policy failed")
+
+    return random_policy(rng)
+
+
+class SelfPlayTestCase(unittest.TestCase):
+    def test_a_deal_yields_a_sample_per_card(self) -> None:
+        samples = play_samples(seed=1, rules=RuleSet.AMSTERDAM)
+
+        self.assertEqual((32, FEATURE_SIZE), samples["features"].shape)
+        self.assertEqual((32, 32), samples["legal"].shape)
+        # Every chosen card was legal, and every card of the deck is played exactly once.
+        self.assertTrue(all(samples["legal"][row, card] for row, card in enumerate(samples["card"])))
+        self.assertEqual(list(range(32)), sorted(samples["card"]))
+        # The outcomes of both teams add up to at least all points of the deal.
+        self.assertGreaterEqual(samples["outcome"][0] + samples["outcome"][1], TOTAL_POINTS)
+
+    def test_shards_are_bounded_in_size(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            writer = ShardWriter(directory, max_shard_bytes=20 * SAMPLE_BYTES)
+            for seed in range(3):
+                writer.add(play_samples(seed=seed))
+            writer.close()
+
+            sizes = [len(np.load(path)["card"]) for path in writer.paths]
+            self.assertEqual([20, 20, 20, 20, 16], sizes)
+            self.assertEqual(sorted(os.listdir(directory)), [os.path.basename(path) for path in writer.paths])
+
+    def test_generated_data_does_not_depend_on_the_number_of_workers(self) -> None:
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            single = generate(first, deals=6, seed=10, workers=1, deals_per_task=2, max_shard_bytes=50 * SAMPLE_BYTES)
+            multiple = generate(second, deals=6, seed=10, workers=2, deals_per_task=1, max_pending=1)
+
+            expected = play_samples(seed=15)["card"]
+            self.assertEqual(4, len(single))
+            self.assertEqual(1, len(multiple))
+            np.testing.assert_array_equal(
+                np.concatenate([np.load(path)["card"] for path in single]), np.load(multiple[0])["card"]
+            )
+            np.testing.assert_array_equal(expected, np.load(multiple[0])["card"][-32:])
+
+    def test_every_deal_is_played_when_tasks_are_throttled(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            paths = generate(directory, deals=7, seed=3, workers=1, deals_per_task=3, max_pending=2)
+
+            cards = np.concatenate([np.load(path)["card"] for path in paths])
+            self.assertEqual(7 * 32, len(cards))
+            np.testing.assert_array_equal(play_samples(seed=9)["card"], cards[-32:])
+
+    def test_the_samples_before_a_failing_worker_are_written(self) -> None:
+        failing_seed = next(seed for seed in range(20, 1000) if not _plays(seed))
+        self.assertLess(20, failing_seed)
+
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(RuntimeError):
+                generate(
+                    directory,
+                    deals=failing_seed - 20 + 3,
+                    seed=20,
+                    policy_factory=failing_policy,
+                    workers=1,
+                    deals_per_task=1,
+                )
+
+            paths = sorted(os.path.join(directory, name) for name in os.listdir(directory))
+            cards = np.concatenate([np.load(path)["card"] for path in paths])
+            self.assertEqual((failing_seed - 20) * 32, len(cards))
+
+    def test_generating_stops_when_writing_fails(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            with patch.object(ShardWriter, "add", side_effect=OSError("No space left on device")):
+                # Playing all deals would take minutes; the run stops after the first task instead.
+                with self.assertRaises(OSError):
+                    generate(directory, deals=100_000, workers=1, deals_per_task=1, max_pending=1)
+
+
+def _plays(seed: int) -> bool:
+    """Whether a deal is played without failing by `failing_policy`."""
+    try:
+        play_samples(seed, failing_policy)
+    except RuntimeError:
+        return False
+
+    return True
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+import random
+import unittest
+from typing import List, Tuple
+
+from bitboard import legal_mask, position_from_trick, winning_position
+from game import new_deal
+from models import RuleSet, Suit, Trick
+from scoring import LAST_TRICK_BONUS, mask_points
+from solver import Solver, solve_trick
+
+
+def random_position(
+    rng: random.Random, cards_per_hand: int, amsterdam: bool, trump_suit: int
+) -> Tuple[List[int], int, List[int]]:
+    """Deal a few cards to every player and play a random number of legal cards to the first trick."""
+    deck = list(range(32))
+    rng.shuffle(deck)
+    hands = [sum(1 << card for card in deck[seat * cards_per_hand : (seat + 1) * cards_per_hand]) for seat in range(4)]
+    leader = rng.randint(0, 3)
+    trick: List[int] = []
+    for _ in range(rng.randint(0, 3)):
+        seat = (leader + len(trick)) % 4
+        winner = winning_position(trick, trump_suit) if trick else -1
+        moves = legal_mask(
+            hands[seat],
+            trick[0] >> 3 if trick else -1,
+            trump_suit,
+            trick[winner] if trick else -1,
+            bool(trick) and (leader + winner) % 4 == (seat + 2) % 4,
+            amsterdam,
+        )
+        card = rng.choice([index for index in range(32) if moves >> index & 1])
+        hands[seat] ^= 1 << card
+        trick.append(card)
+
+    return hands, leader, trick
+
+
+def brute_force(hands: List[int], leader: int, trick: List[int], trump_suit: int, amsterdam: bool) -> int:
+    """The score of team 0 by plain minimax, without any pruning."""
+    if len(trick) == 4:
+        winner = (leader + winning_position(trick, trump_suit)) % 4
+        points = mask_points(sum(1 << card for card in trick), trump_suit)
+        points += LAST_TRICK_BONUS if not any(hands) else 0
+        return (points if winner % 2 == 0 else 0) + brute_force(hands, winner, [], trump_suit, amsterdam)
+    if not trick and not any(hands):
+        return 0
+
+    seat = (leader + len(trick)) % 4
+    winner = winning_position(trick, trump_suit) if trick else -1
+    moves = legal_mask(
+        hands[seat],
+        trick[0] >> 3 if trick else -1,
+        trump_suit,
+        trick[winner] if trick else -1,
+        bool(trick) and (leader + winner) % 4 == (seat + 2) % 4,
+        amsterdam,
+    )
+    values = []
+    for card in [index for index in range(32) if moves >> index & 1]:
+        child = list(hands)
+        child[seat] ^= 1 << card
+        values.append(brute_force(child, leader, trick + [card], trump_suit, amsterdam))
+
+    return max(values) if seat % 2 == 0 else min(values)
+
+
+class SolverTestCase(unittest.TestCase):
+    def test_the_solver_agrees_with_plain_minimax(self) -> None:
+        rng = random.Random(1)
+        for _ in range(60):
+            rules = rng.choice(list(RuleSet))
+            trump_suit = rng.randint(0, 3)
+            hands, leader, trick = random_position(rng, 3, rules == RuleSet.AMSTERDAM, trump_suit)
+            expected = brute_force(list(hands), leader, list(trick), trump_suit, rules == RuleSet.AMSTERDAM)
+
+            for ordering, bounds in [(True, True), (True, False), (False, True), (False, False)]:
+                solver = Solver(trump_suit, rules, ordering=ordering, bounds=bounds)
+                self.assertEqual(expected, solver.solve(hands, leader, trick, team=0))
+                total = mask_points(sum(hands) | sum(1 << card for card in trick), trump_suit) + LAST_TRICK_BONUS
+                self.assertEqual(total - expected, solver.solve(hands, leader, trick, team=1))
+
+    def test_move_ordering_reduces_the_number_of_nodes(self) -> None:
+        rng = random.Random(2)
+        nodes = {True: 0, False: 0}
+        for _ in range(10):
+            trump_suit = rng.randint(0, 3)
+            hands, leader, trick = random_position(rng, 6, False, trump_suit)
+            values = set()
+            for ordering in [True, False]:
+                solver = Solver(trump_suit, RuleSet.ROTTERDAM, ordering=ordering)
+                values.add(solver.solve(hands, leader, trick))
+                nodes[ordering] += solver.statistics.nodes
+
+            self.assertEqual(1, len(values))
+
+        self.assertLess(4 * nodes[True], 3 * nodes[False])
+
+    def test_target_searches_agree_with_the_solution(self) -> None:
+        rng = random.Random(6)
+        for _ in range(20):
+            trump_suit = rng.randint(0, 3)
+            hands, leader, trick = random_position(rng, 4, False, trump_suit)
+            value = Solver(trump_suit).solve(hands, leader, trick, team=1)
+            solver = Solver(trump_suit)
+            self.assertTrue(solver.reaches(hands, leader, trick, 1, value))
+            self.assertFalse(solver.reaches(hands, leader, trick, 1, value + 1))
+
+    def test_bounds_reduce_the_number_of_nodes(self) -> None:
+        rng = random.Random(7)
+        nodes = {True: 0, False: 0}
+        for _ in range(10):
+            trump_suit = rng.randint(0, 3)
+            hands, leader, trick = random_position(rng, 6, False, trump_suit)
+            for bounds in [True, False]:
+                solver = Solver(trump_suit, RuleSet.ROTTERDAM, bounds=bounds)
+                solver.solve(hands, leader, trick)
+                nodes[bounds] += solver.statistics.nodes
+                self.assertEqual(bounds, solver.statistics.bound_cutoff_rate > 0)
+
+        self.assertLess(nodes[True], nodes[False])
+
+    def test_best_moves_reach_the_solution(self) -> None:
+        rng = random.Random(8)
+        for _ in range(30):
+            rules = rng.choice(list(RuleSet))
+            trump_suit = rng.randint(0, 3)
+            hands, leader, trick = random_position(rng, 3, rules == RuleSet.AMSTERDAM, trump_suit)
+            seat = (leader + len(trick)) % 4
+            solver = Solver(trump_suit, rules)
+
+            card, points = solver.best_move(hands, leader, trick)
+            self.assertTrue(solver.legal_moves(hands, leader, trick) >> card & 1)
+            self.assertEqual(solver.solve(hands, leader, trick, seat % 2), points)
+
+            child = list(hands)
+            child[seat] ^= 1 << card
+            self.assertEqual(points, Solver(trump_suit, rules).solve(child, leader, trick + [card], seat % 2))
+
+    def test_nothing_is_left_to_score_without_cards(self) -> None:
+        self.assertEqual(0, Solver(0).solve([0, 0, 0, 0], 0, team=0))
+        self.assertEqual(0, Solver(0).solve([0, 0, 0, 0], 0, team=1))
+
+    def test_statistics_are_collected(self) -> None:
+        rng = random.Random(3)
+        hands, leader, trick = random_position(rng, 4, False, 0)
+        solver = Solver(0)
+        solver.solve(hands, leader, trick)
+
+        self.assertGreater(solver.statistics.nodes, 0)
+        self.assertGreater(solver.statistics.cutoffs, 0)
+        self.assertGreater(solver.statistics.first_move_cutoff_rate, 0)
+        self.assertGreater(solver.statistics.transposition_probes, 0)
+
+        # Solving the same position again is answered by the transposition table.
+        nodes = solver.statistics.nodes
+        solver.solve(hands, leader, trick)
+        self.assertLess(solver.statistics.nodes - nodes, nodes)
+
+    def test_a_trick_in_progress_can_be_solved(self) -> None:
+        deal = new_deal(seed=4, trump_suit=Suit.HEARTS)
+        for player in deal.players:
+            player.hand = set(sorted(player.hand, key=lambda card: card.ordinal)[:3])
+        trick = Trick(deal=deal, leading_player_index=0)
+        trick.play(sorted(trick.legal_cards, key=lambda card: card.ordinal)[0])
+
+        hands, leader, cards = position_from_trick(trick)
+        self.assertEqual(0, leader)
+        self.assertEqual(1, len(cards))
+        self.assertEqual(11, sum(bin(hand).count("1") for hand in hands))
+
+        total = mask_points(sum(hands) | 1 << cards[0], 1) + LAST_TRICK_BONUS
+        self.assertEqual(total, solve_trick(trick, team=0) + solve_trick(trick, team=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
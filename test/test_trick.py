@@ -85,6 +85,34 @@ class TrickTestCase(unittest.TestCase):
         # The card resides within the played cards of the trick
         self.assertEqual(True, Card(suit=Suit.SPADES, rank=Rank.ACE) in trick.played_cards)
 
+    def test_the_turn_wraps_around_to_the_first_player(self) -> None:
+        players = [Player(), Player(), Player(), Player()]
+        deal = Deal(players=players, bidder_index=0)
+        trick = Trick(deal=deal, leading_player_index=3)
+
+        players[3].hand = {Card(suit=Suit.SPADES, rank=Rank.ACE)}
+        players[0].hand = {Card(suit=Suit.SPADES, rank=Rank.KING)}
+        trick.play(Card(suit=Suit.SPADES, rank=Rank.ACE))
+
+        # After the last player led, it is the turn of the first player.
+        self.assertEqual(0, trick.player_index_to_play)
+        trick.play(Card(suit=Suit.SPADES, rank=Rank.KING))
+        self.assertEqual(1, trick.player_index_to_play)
+
+    def test_the_player_to_play_is_a_seat_for_every_leader(self) -> None:
+        # Regression test: the number of played cards was reduced modulo 4 before adding the leader.
+        for leading_player_index in range(4):
+            players = [Player(), Player(), Player(), Player()]
+            deal = Deal(players=players, bidder_index=0)
+            trick = Trick(deal=deal, leading_player_index=leading_player_index)
+            for player, rank in zip(players, [Rank.SEVEN, Rank.EIGHT, Rank.NINE, Rank.TEN]):
+                player.hand = {Card(suit=Suit.SPADES, rank=rank)}
+
+            for offset in range(4):
+                player_index = trick.player_index_to_play
+                self.assertEqual((leading_player_index + offset) % 4, player_index)
+                trick.play(next(iter(players[player_index].hand)))
+
     def test_a_player_cannot_play_a_card_it_does_not_have(self) -> None:
         def play_bad_card() -> None:
             players = [Player(), Player(), Player(), Player()]
@@ -0,0 +1,63 @@
+import random
+import unittest
+from typing import List
+
+import numpy as np
+
+from bitboard import card_index, cards_to_mask, mask_to_cards
+from models import Card, Deal, Deck, Player, Rank, RuleSet, Suit, Trick
+from vectorized import legal_masks, trick_arrays, unpack_masks
+
+
+def random_tricks(rng: random.Random, rules: RuleSet, amount: int) -> List[Trick]:
+    """Generate tricks in which between zero and three cards have been played legally."""
+    tricks = []
+    for _ in range(amount):
+        players = [Player(name=str(index)) for index in range(4)]
+        deck = Deck()
+        deck.shuffle(seed=rng.randint(0, 100000000))
+        deck.deal(players)
+
+        deal = Deal(players=players, bidder_index=0, trump_suit=rng.choice(list(Suit)), rules=rules)
+        trick = Trick(deal=deal, leading_player_index=0)
+        for _ in range(rng.randint(0, 3)):
+            trick.play(rng.choice(sorted(trick.legal_cards, key=card_index)))
+        tricks.append(trick)
+
+    return tricks
+
+
+class VectorizedTestCase(unittest.TestCase):
+    def test_masks_can_be_unpacked_into_boolean_vectors(self) -> None:
+        unpacked = unpack_masks([0, 1 | (1 << 31)])
+
+        self.assertEqual((2, 32), unpacked.shape)
+        self.assertFalse(unpacked[0].any())
+        self.assertEqual([0, 31], list(np.flatnonzero(unpacked[1])))
+
+    def test_batched_legal_cards_match_the_reference_for_both_rule_sets(self) -> None:
+        rng = random.Random(1)
+        for rules in RuleSet:
+            tricks = random_tricks(rng, rules, 500)
+            result = legal_masks(*trick_arrays(tricks), rules=rules)
+
+            self.assertEqual((500, 32), result.shape)
+            for trick, row in zip(tricks, result):
+                mask = sum(1 << int(index) for index in np.flatnonzero(row))
+                self.assertEqual(trick.legal_cards, mask_to_cards(mask))
+
+    def test_teammate_winning_only_relaxes_the_amsterdam_rules(self) -> None:
+        # Spades are led and won by the teammate with the ace of spades. Hearts are trump.
+        # The player cannot follow suit, but holds the seven of hearts and the seven of clubs.
+        hand = cards_to_mask({Card(suit=Suit.HEARTS, rank=Rank.SEVEN), Card(suit=Suit.CLUBS, rank=Rank.SEVEN)})
+        arguments = ([hand], [3], [1], [31], [True])
+
+        rotterdam = legal_masks(*arguments, rules=RuleSet.ROTTERDAM)[0]
+        amsterdam = legal_masks(*arguments, rules=RuleSet.AMSTERDAM)[0]
+
+        self.assertEqual([8], list(np.flatnonzero(rotterdam)))
+        self.assertEqual([0, 8], list(np.flatnonzero(amsterdam)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Batched versions of the rules in `models`, operating on NumPy arrays of many positions at once.
+
+Cards and hands use the bitmask layout of `bitboard`: a hand is a 32-bit integer and a card is
+an index in 0..31. Suits are given by their index in 0..3, with -1 denoting "no suit".
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from bitboard import TRUMP_ORDER, card_index, cards_to_mask, suit_index
+from models import RuleSet, Trick
+
+BoolArray = npt.NDArray[np.bool_]
+IntArray = npt.NDArray[np.int64]
+
+_BITS = np.arange(32, dtype=np.uint32)
+_CARD_SUITS = np.arange(32) // 8
+_TRUMP_ORDER = np.array(TRUMP_ORDER, dtype=np.int64)
+_CARD_TRUMP_ORDER = np.tile(_TRUMP_ORDER, 4)
+
+
+def unpack_masks(masks: npt.ArrayLike) -> BoolArray:
+    """
+    Expand an array of 32-bit hand masks into boolean card vectors.
+
+    :param masks: An array of shape (N,) holding hand masks.
+    :return: A boolean array of shape (N, 32); entry [n, i] tells whether card index i is in mask n.
+    """
+    masks = np.asarray(masks, dtype=np.uint32)
+
+    return ((masks[:, None] >> _BITS) & 1).astype(np.bool_)
+
+
+def legal_masks(
+    hands: npt.ArrayLike,
+    led_suits: npt.ArrayLike,
+    trump_suits: npt.ArrayLike,
+    winning_cards: npt.ArrayLike,
+    teammate_winning: npt.ArrayLike,
+    rules: RuleSet = RuleSet.ROTTERDAM,
+) -> BoolArray:
+    """
+    Determine the legal cards of many positions at once. For every position, the result is
+    identical to `Trick.legal_cards` for the player that is to play.
+
+    :param hands: The hand masks of the players to play, shape (N,).
+    :param led_suits: The suit index that was led in each trick, or -1 if the player is leading.
+    :param trump_suits: The suit index of the trump suit of each position.
+    :param winning_cards: The card index of the card currently winning each trick, or -1 if none was played.
+    :param teammate_winning: Whether the teammate of the player to play is currently winning each trick.
+    :param rules: The rule set that applies to all positions.
+    :return: A boolean array of shape (N, 32) in which the legal cards of each position are set.
+    """
+    hand = unpack_masks(hands)
+    led = np.asarray(led_suits, dtype=np.int64)
+    trump = np.asarray(trump_suits, dtype=np.int64)
+    winner = np.asarray(winning_cards, dtype=np.int64)
+    teammate = np.asarray(teammate_winning, dtype=np.bool_)
+
+    # Trump cards are higher than the winning card if it is not a trump card (or if there is none);
+    # otherwise they must rank higher in the trump order.
+    winner_index = np.where(winner >= 0, winner, 0)
+    winner_is_trump = (winner >= 0) & (winner_index // 8 == trump)
+    winner_order = np.where(winner_is_trump, _TRUMP_ORDER[winner_index % 8], -1)
+
+    is_trump = _CARD_SUITS == trump[:, None]
+    follow_suit = hand & (_CARD_SUITS == led[:, None])
+    higher_trump = hand & is_trump & (_CARD_TRUMP_ORDER > winner_order[:, None])
+    non_trump = hand & ~is_trump
+
+    can_follow = follow_suit.any(axis=1)
+    can_overtrump = higher_trump.any(axis=1)
+    has_non_trump = non_trump.any(axis=1)
+
+    # The branches of `Trick.legal_cards` are applied from the last to the first, so that
+    # the first branch that applies to a position takes precedence.
+    result = np.where(has_non_trump[:, None], non_trump, hand)
+    if rules == RuleSet.ROTTERDAM:
+        result = np.where(can_overtrump[:, None], higher_trump, result)
+    elif rules == RuleSet.AMSTERDAM:
+        amsterdam = np.where(
+            teammate[:, None], higher_trump | non_trump, np.where(can_overtrump[:, None], higher_trump, non_trump)
+        )
+        result = np.where((has_non_trump | can_overtrump)[:, None], amsterdam, result)
+    result = np.where(can_follow[:, None], follow_suit, result)
+    result = np.where(((led == trump) & can_overtrump)[:, None], higher_trump, result)
+
+    return np.where((led < 0)[:, None], hand, result)
+
+
+def trick_arrays(tricks: Iterable[Trick]) -> Tuple[IntArray, IntArray, IntArray, IntArray, BoolArray]:
+    """
+    Collect the input arrays of `legal_masks` from a number of tricks in progress.
+
+    :param tricks: The tricks. Each must have a trump suit set on its deal.
+    :return: The hand masks, led suits, trump suits, winning cards and teammate-winning flags.
+    """
+    hands, led_suits, trump_suits, winning_cards, teammate_winning = [], [], [], [], []
+    for trick in tricks:
+        assert trick.deal.trump_suit is not None, "The trump suit of the deal must be known"
+        player_index = trick.player_index_to_play
+        winning_card = trick.winning_card
+
+        hands.append(cards_to_mask(trick.deal.players[player_index].hand))
+        led_suits.append(-1 if trick.led_suit is None else suit_index(trick.led_suit))
+        trump_suits.append(suit_index(trick.deal.trump_suit))
+        winning_cards.append(-1 if winning_card is None else card_index(winning_card))
+        teammate_winning.append(trick.winning_card_index == (player_index + 2) % 4)
+
+    return (
+        np.array(hands, dtype=np.int64),
+        np.array(led_suits, dtype=np.int64),
+        np.array(trump_suits, dtype=np.int64),
+        np.array(winning_cards, dtype=np.int64),
+        np.array(teammate_winning, dtype=np.bool_),
+    )